@@ -0,0 +1,145 @@
+import os
+from collections import OrderedDict
+
+import pygame
+
+
+class AssetCache:
+    """Every image the game draws, decoded once and packed into atlas pages.
+
+    Each PNG is read from disk the first time it is asked for (preload() does
+    that at startup), then smoothscaled for a tile size and blitted into a
+    shared atlas surface; get() hands out subsurfaces of the atlas, so
+    nothing is decoded, scaled or copied per frame. Scaled sets are cached
+    per tile size, so zooming to a size used before is free. Without a
+    display (headless simulations) there is nothing to convert images for,
+    and get() returns None.
+    """
+
+    PAGE_SIZE = 1024  # Atlas pages are PAGE_SIZE x PAGE_SIZE; bigger images stay standalone
+
+    def __init__(self, asset_dir, tile_size):
+        self.asset_dir = asset_dir
+        self.tile_size = tile_size
+        self.sources = {}  # filename -> decoded image at its original size, or None if missing
+        self.levels = {}  # tile size -> {(filename, span): atlas subsurface or None}
+        self.pages = []
+        self.cursor = (0, 0, 0)  # x, y and row height of the next free slot on the newest page
+
+    def source(self, filename):
+        if filename not in self.sources:
+            try:
+                image = pygame.image.load(os.path.join(self.asset_dir, filename)).convert_alpha()
+            except (pygame.error, FileNotFoundError):
+                image = None
+            self.sources[filename] = image
+        return self.sources[filename]
+
+    def get(self, filename, span=(1, 1), tile_size=None):
+        """The image scaled to span (columns, rows) tiles of tile_size pixels, or None if unavailable"""
+        if pygame.display.get_surface() is None:
+            return None
+        tile_size = tile_size or self.tile_size
+        level = self.levels.setdefault(tile_size, {})
+        key = (filename, span)
+        if key not in level:
+            image = self.source(filename)
+            if image is not None:
+                image = self.pack(pygame.transform.smoothscale(image, (span[0] * tile_size, span[1] * tile_size)))
+            level[key] = image
+        return level[key]
+
+    def preload(self, names, tile_size=None):
+        """Load and pack images up front; names are filenames or (filename, span) pairs"""
+        for name in names:
+            filename, span = name if isinstance(name, tuple) else (name, (1, 1))
+            self.get(filename, span, tile_size)
+
+    def pack(self, image):
+        """Copy an image into the atlas (shelf packing) and return the subsurface holding it"""
+        width, height = image.get_size()
+        size = self.PAGE_SIZE
+        if width > size or height > size:
+            return image
+        x, y, row_height = self.cursor
+        if x + width > size:  # Start a new shelf
+            x, y, row_height = 0, y + row_height, 0
+        if not self.pages or y + height > size:
+            page = pygame.Surface((size, size), pygame.SRCALPHA).convert_alpha()
+            page.fill((0, 0, 0, 0))
+            self.pages.append(page)
+            x, y, row_height = 0, 0, 0
+        page = self.pages[-1]
+        page.blit(image, (x, y))
+        self.cursor = (x + width, y, max(row_height, height))
+        return page.subsurface((x, y, width, height))
+
+
+class TextCache:
+    """Fonts opened once and rendered strings reused until they change.
+
+    render() is keyed by font, string and color, so a HUD line is only
+    re-rendered when its value actually changes; the least recently used
+    surfaces are dropped once max_entries is reached. SysFont lookups can
+    go through fontconfig on Linux, which is far too slow to do per frame.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.fonts = {}  # (name, size) -> Font
+        self.rendered = OrderedDict()  # (name, size, text, color) -> Surface, least recently used first
+
+    def font(self, size, name=None):
+        """The system font name (None for pygame's default) at size, created on first use"""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.SysFont(name, size)
+        return font
+
+    def render(self, text, size, color, name=None):
+        """Antialiased text surface; callers must not draw onto it, as it is shared"""
+        key = (name, size, text, color)
+        surface = self.rendered.get(key)
+        if surface is not None:
+            self.rendered.move_to_end(key)
+            return surface
+        surface = self.rendered[key] = self.font(size, name).render(text, True, color)
+        if len(self.rendered) > self.max_entries:
+            self.rendered.popitem(last=False)
+        return surface
+
+
+TEXT = TextCache()  # Shared by the HUD, menus and overlays
+
+
+class PanelCache:
+    """Solid and translucent fill surfaces (HUD bars, overlay backgrounds), built once.
+
+    Keyed by size, color and alpha, so a panel is only rebuilt when the
+    screen or the panel changes size; allocating and filling a full-screen
+    SRCALPHA surface every frame costs a noticeable slice of the frame.
+    """
+
+    def __init__(self):
+        self.panels = {}  # (size, color, alpha) -> Surface
+
+    def get(self, size, color, alpha=None):
+        """A size surface filled with color; a 4-tuple color gives per-pixel alpha, alpha a surface-wide one"""
+        key = (size, color, alpha)
+        panel = self.panels.get(key)
+        if panel is None:
+            if len(color) == 4:
+                panel = pygame.Surface(size, pygame.SRCALPHA)
+            else:
+                panel = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                panel = panel.convert_alpha() if len(color) == 4 else panel.convert()
+            panel.fill(color)
+            if alpha is not None:
+                panel.set_alpha(alpha)
+            self.panels[key] = panel
+        return panel
+
+
+PANELS = PanelCache()  # Shared by the HUD, overlays and planning markers
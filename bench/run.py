@@ -0,0 +1,420 @@
+"""Deadhold benchmark suite.
+
+Builds seeded worlds at several scales (see scenarios.py) and times each
+system in isolation, headless, so results are comparable between runs and
+machines. Every benchmark starts from a freshly built scenario.
+
+    python bench/run.py                                  # every scale, JSON on stdout
+    python bench/run.py --scales small medium --out bench/baseline.json
+    python bench/run.py --compare bench/baseline.json    # exits 1 on a regression
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from entities import Bullet, Campfire, TILE_SIZE, ASSETS
+from game_systems import CombatSystem, JobSystem, MinimapSystem
+from hud import draw_hud
+from rendering import TerrainCache, ScrollBuffer, LightingSystem, GROUND_COLOR, tile_states
+from savegame import SaveGame
+from scenarios import SCALES, build_scenario
+
+SCREEN_WIDTH = TILE_SIZE * 15
+SCREEN_HEIGHT = TILE_SIZE * 10
+WORK_DIR = tempfile.gettempdir()  # Save benchmarks write here; run_suite swaps in a private directory
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples):
+    """Timing summary of per-iteration durations given in seconds"""
+    total = sum(samples)
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "iterations": len(samples),
+        "total_s": round(total, 6),
+        "ops_per_sec": round(len(samples) / total, 3) if total > 0 else None,
+        "mean_ms": round(sum(ms) / len(ms), 4),
+        "p50_ms": round(percentile(ms, 50), 4),
+        "p95_ms": round(percentile(ms, 95), 4),
+        "p99_ms": round(percentile(ms, 99), 4),
+        "max_ms": round(ms[-1], 4),
+    }
+
+
+def camera_on(sim):
+    """Camera position main.py would use with the colonist centred"""
+    cam_x = sim.colonist.x * TILE_SIZE - SCREEN_WIDTH // 2 + TILE_SIZE // 2
+    cam_y = sim.colonist.y * TILE_SIZE - SCREEN_HEIGHT // 2 + TILE_SIZE // 2
+    cam_x = max(0, min(cam_x, sim.map_width * TILE_SIZE - SCREEN_WIDTH))
+    cam_y = max(0, min(cam_y, sim.map_height * TILE_SIZE - SCREEN_HEIGHT))
+    return cam_x, cam_y
+
+
+def make_terrain(sim):
+    terrain = TerrainCache(TILE_SIZE, sim.map_width, sim.map_height, ASSETS.get("grass.png"), ASSETS.get("floor.png"))
+    terrain.attach(sim.grid, sim.floors)
+    return terrain
+
+
+def make_minimap(sim, full_map=False):
+    minimap = MinimapSystem()
+    minimap.initialize(sim.map_width, sim.map_height)
+    minimap.attach(sim.grid, sim.chunks.resident_rect)
+    minimap.full_map = full_map
+    minimap.update(sim.colonist, sim.horde)
+    return minimap
+
+
+# --- Benchmarks: each takes a fresh scenario and returns the operation to time ---
+def bench_tick(sim, screen):
+    """One full logic tick (Simulation.step) with the colonist kept alive"""
+    def op():
+        sim.step()
+        sim.colonist.hp = 100
+        sim.game_over = False  # A crowd's bites can kill within one tick
+    return op
+
+
+def bench_zombie_update(sim, screen):
+    """Flow field upkeep plus the whole horde's move/attack for one tick"""
+    def op():
+        sim.flow_field.update(sim.colonist, sim.grid)
+        sim.horde.update(sim.colonist, sim.grid, sim.flow_field)
+    return op
+
+
+def bench_flow_field_rebuild(sim, screen):
+    """A whole Dijkstra rebuild of the zombie flow field at once (update() spreads one over several calls)"""
+    return lambda: sim.flow_field.rebuild(sim.colonist.x, sim.colonist.y, sim.grid)
+
+
+def bench_combat(sim, screen):
+    """Spatial hash rebuild plus turrets, bullets, spikes and trap pits for one tick"""
+    state = {"tick": 0}
+
+    def op():
+        state["tick"] += 1
+        now = state["tick"] * 1000 // sim.tick_rate
+        sim.zombie_index.rebuild_positions(*sim.horde.living())
+        CombatSystem.update_turrets(sim.turrets, sim.zombie_index, sim.bullets, Bullet, sim.tick_time)
+        CombatSystem.update_bullets(sim.bullets, sim.zombie_index, sim.map_width, sim.map_height, sim.tick_time)
+        CombatSystem.update_spikes(sim.spikes, sim.zombie_index, now)
+        CombatSystem.update_trap_pits(sim.trap_pits, sim.zombie_index, now)
+    return op
+
+
+def designate_all(sim, job_system):
+    for tree in sim.trees:
+        tree.designated = True
+        job_system.add_job("woodcutting", tree.x, tree.y)
+    for rock in sim.rocks:
+        rock.designated = True
+        job_system.add_job("mining", rock.x, rock.y)
+
+
+def bench_job_claim(sim, screen):
+    """Claiming and handing back the nearest top-priority job with every tree and rock designated"""
+    jobs = JobSystem()
+    designate_all(sim, jobs)
+    x, y = sim.colonist.x, sim.colonist.y
+    return lambda: jobs.release(jobs.claim(x, y))
+
+
+def bench_workers(sim, screen):
+    """Twenty AI colonists claiming, walking to and harvesting designated trees and rocks for one tick"""
+    designate_all(sim, sim.job_system)
+    for _ in range(20):
+        sim.add_worker()
+
+    def op():
+        sim.tick += 1
+        sim.update_workers()
+    return op
+
+
+def bench_paths(sim, screen):
+    """A batch of twenty colonist paths to one tree, with the cluster graph warm and the path cache cold"""
+    paths = sim.paths
+    x, y = sim.colonist.x, sim.colonist.y
+    tree = min(sim.trees, key=lambda t: abs(t.x - x - 40) + abs(t.y - y - 30))
+    starts = [(x + dx, y + dy) for dx in range(-20, 21, 4) for dy in range(-20, 21, 4)
+              if not paths.blocked(x + dx, y + dy)][:20]
+    requests = [(start, (tree.x, tree.y), True) for start in starts]
+    paths.find_paths(requests)
+
+    def op():
+        paths.cache.clear()
+        paths.find_paths(requests)
+    return op
+
+
+def bench_minimap_draw(sim, screen):
+    minimap = make_minimap(sim)
+
+    def op():
+        minimap.rendered_key = None  # Measure a frame where something on the minimap moved
+        minimap.draw(screen, SCREEN_WIDTH, SCREEN_HEIGHT, position="bottomright")
+    return op
+
+
+def bench_minimap_draw_full(sim, screen):
+    """The zoomed-out whole-map view"""
+    minimap = make_minimap(sim, full_map=True)
+
+    def op():
+        minimap.rendered_key = None
+        minimap.draw(screen, SCREEN_WIDTH, SCREEN_HEIGHT, position="bottomright")
+    return op
+
+
+def bench_terrain_draw(sim, screen):
+    """Ground drawing with the chunk cache warm (the steady state)"""
+    terrain = make_terrain(sim)
+    cam_x, cam_y = camera_on(sim)
+
+    def op():
+        screen.fill(GROUND_COLOR)
+        terrain.draw(screen, cam_x, cam_y)
+    return op
+
+
+def bench_terrain_draw_cold(sim, screen):
+    """Ground drawing with every visible chunk re-rendered (worst case after a scroll)"""
+    terrain = make_terrain(sim)
+    cam_x, cam_y = camera_on(sim)
+
+    def op():
+        terrain.chunks.clear()
+        screen.fill(GROUND_COLOR)
+        terrain.draw(screen, cam_x, cam_y)
+    return op
+
+
+def bench_scroll_draw(sim, screen):
+    """Smooth scrolling: ground and structures from the scroll buffer while the camera pans 4 pixels a frame"""
+    buffer = ScrollBuffer(TILE_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT, make_terrain(sim), sim.registry)
+    cam_x, cam_y = camera_on(sim)
+    state = {"offset": 0}
+    span = TILE_SIZE * 8
+
+    def op():
+        state["offset"] = (state["offset"] + 4) % (span * 2)
+        pan = min(state["offset"], span * 2 - state["offset"])  # Back and forth over eight tiles
+        x = max(0, cam_x - span // 2 + pan)
+        first_x, first_y = x // TILE_SIZE, cam_y // TILE_SIZE
+        visible = sim.registry.visible(first_x, first_y, first_x + SCREEN_WIDTH // TILE_SIZE + 2,
+                                       first_y + SCREEN_HEIGHT // TILE_SIZE + 2)
+        buffer.update(x, cam_y, tile_states(*visible.values()))
+        buffer.draw(screen, x, cam_y)
+    return op
+
+
+def bench_lighting(sim, screen):
+    """Rebuilding and drawing the night darkness map with a ring of campfires around the colonist"""
+    lighting = LightingSystem(TILE_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT)
+    for dx, dy in ((3, 0), (-3, 0), (0, 3), (0, -3), (5, 4), (-6, -3)):
+        x, y = sim.colonist.x + dx, sim.colonist.y + dy
+        if sim.grid.in_bounds(x, y) and not sim.grid.has_structure(x, y):
+            sim.registry.spawn(Campfire(x, y))
+    cam_x, cam_y = camera_on(sim)
+
+    def op():
+        lighting.key = None  # A rebuild, as when a light changes or the camera moves on a few tiles
+        lighting.update(cam_x, cam_y, 1.0, sim.registry.items("campfires"))
+        lighting.draw(screen, cam_x, cam_y)
+    return op
+
+
+def bench_entity_draw(sim, screen):
+    """Looking up and drawing every entity on screen, as main.py does it"""
+    cam_x, cam_y = camera_on(sim)
+    first_x, first_y = cam_x // TILE_SIZE, cam_y // TILE_SIZE
+    last_x = first_x + SCREEN_WIDTH // TILE_SIZE + 2
+    last_y = first_y + SCREEN_HEIGHT // TILE_SIZE + 2
+
+    def op():
+        visible = sim.registry.visible(first_x, first_y, last_x, last_y)
+        for entities in visible.values():
+            for entity in entities:
+                entity.draw(screen, cam_x, cam_y)
+        for zombie in sim.horde.in_rect(first_x, first_y, last_x, last_y):
+            zombie.draw(screen, cam_x, cam_y)
+        sim.colonist.draw(screen, cam_x, cam_y)
+    return op
+
+
+def bench_hud_draw(sim, screen):
+    """The HUD bar with its build preview, plus the statistics overlay"""
+    blueprint = sim.selected_blueprint()
+
+    def op():
+        draw_hud(screen, sim.colonist, sim.wood, sim.stone, ASSETS.get(blueprint["img"]))
+        sim.stats.draw_stats_overlay(screen, SCREEN_WIDTH, SCREEN_HEIGHT, sim.now)
+    return op
+
+
+def bench_save(sim, screen):
+    """Binary snapshot, compression and atomic write of the whole world"""
+    path = os.path.join(WORK_DIR, "bench.dhs")
+    return lambda: SaveGame.save_binary(sim.world_state(), path)
+
+
+def bench_load(sim, screen):
+    """Decoding a binary save back into entities"""
+    path = os.path.join(WORK_DIR, "bench.dhs")
+    SaveGame.save_binary(sim.world_state(), path)
+    return lambda: SaveGame.load_binary(path)
+
+
+# name -> (setup, fraction of --iterations to run; slow whole-map work runs fewer)
+BENCHMARKS = {
+    "tick": (bench_tick, 1),
+    "zombie_update": (bench_zombie_update, 1),
+    "flow_field_rebuild": (bench_flow_field_rebuild, 0.1),
+    "combat": (bench_combat, 1),
+    "job_claim": (bench_job_claim, 1),
+    "workers": (bench_workers, 1),
+    "paths": (bench_paths, 1),
+    "minimap_draw": (bench_minimap_draw, 1),
+    "minimap_draw_full": (bench_minimap_draw_full, 1),
+    "terrain_draw": (bench_terrain_draw, 1),
+    "terrain_draw_cold": (bench_terrain_draw_cold, 0.25),
+    "entity_draw": (bench_entity_draw, 1),
+    "scroll_draw": (bench_scroll_draw, 1),
+    "lighting": (bench_lighting, 1),
+    "hud_draw": (bench_hud_draw, 1),
+    "save": (bench_save, 0.25),
+    "load": (bench_load, 0.25),
+}
+
+
+def run_benchmark(name, scale, seed, iterations, warmup, screen):
+    setup, fraction = BENCHMARKS[name]
+    sim = build_scenario(scale, seed)
+    op = setup(sim, screen)
+    for _ in range(warmup):
+        op()
+    samples = []
+    perf_counter = time.perf_counter
+    for _ in range(max(3, int(iterations * fraction))):
+        started = perf_counter()
+        op()
+        samples.append(perf_counter() - started)
+    result = summarize(samples)
+    result["zombies"] = len(sim.zombies)
+    return result
+
+
+def run_suite(scales, names, seed, iterations, warmup, log=print):
+    global WORK_DIR
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    WORK_DIR = tempfile.mkdtemp(prefix="deadhold-bench-")
+    results = {}
+    try:
+        for scale in scales:
+            results[scale] = {}
+            for name in names:
+                result = run_benchmark(name, scale, seed, iterations, warmup, screen)
+                results[scale][name] = result
+                log(f"{scale:>7} {name:<20} p50 {result['p50_ms']:>10.3f} ms  p99 {result['p99_ms']:>10.3f} ms  "
+                    f"{result['ops_per_sec']:>10.1f} ops/s")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+        pygame.quit()
+    return {
+        "meta": {
+            "seed": seed,
+            "iterations": iterations,
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold, min_delta_ms=0.05, log=print):
+    """Report mean-time changes against a baseline run; returns the regressed (scale, benchmark) pairs.
+
+    Means are compared rather than p50 because several systems only do real
+    work every few ticks; differences below min_delta_ms are treated as noise.
+    """
+    regressions = []
+    for scale, benches in current["results"].items():
+        for name, result in benches.items():
+            base = baseline.get("results", {}).get(scale, {}).get(name)
+            if not base or not base.get("mean_ms"):
+                log(f"{scale:>7} {name:<20} (no baseline)")
+                continue
+            delta = result["mean_ms"] - base["mean_ms"]
+            change = delta / base["mean_ms"]
+            flag = ""
+            if abs(delta) >= min_delta_ms:
+                if change > threshold:
+                    flag = "  REGRESSION"
+                    regressions.append((scale, name))
+                elif change < -threshold:
+                    flag = "  faster"
+            log(f"{scale:>7} {name:<20} {base['mean_ms']:>10.3f} -> {result['mean_ms']:>10.3f} ms  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Deadhold's systems on seeded worlds")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES))
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="run only these benchmarks")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=100, help="timed iterations per benchmark")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed iterations before measuring")
+    parser.add_argument("--out", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier --out file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown of the mean counted as a regression (default 0.10)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="ignore mean changes smaller than this many milliseconds")
+    args = parser.parse_args()
+    out = os.path.abspath(args.out) if args.out else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    # Asset paths are relative to the repository root
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    log = lambda line: print(line, file=sys.stderr)
+    results = run_suite(args.scales, args.only, args.seed, args.iterations, args.warmup, log)
+
+    if out:
+        with open(out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        log(f"\nComparison against {args.compare} (mean per iteration):")
+        if compare(results, baseline, args.threshold, args.min_delta_ms, log):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
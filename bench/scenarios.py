@@ -0,0 +1,43 @@
+"""Seeded, reproducible worlds at several scales for the benchmark suite"""
+import random
+
+from entities import Turret, Spike, TrapPit
+from game_systems import MapGenerator
+from simulation import Simulation
+
+# name -> map size and populations; counts scale roughly with map area
+SCALES = {
+    "small": {"width": 200, "height": 150, "buildings": 10, "trees": 300, "rocks": 150, "zombies": 50, "turrets": 10},
+    "medium": {"width": 400, "height": 300, "buildings": 40, "trees": 1200, "rocks": 600, "zombies": 500, "turrets": 50},
+    "large": {"width": 1000, "height": 1000, "buildings": 330, "trees": 10000, "rocks": 5000, "zombies": 3000, "turrets": 50},
+}
+
+
+def build_scenario(scale, seed=1):
+    """A headless Simulation populated for the given scale, identical for the same seed"""
+    spec = SCALES[scale]
+    width, height = spec["width"], spec["height"]
+    sim = Simulation(width, height, seed=seed, verbose=False)
+    rng = random.Random(seed)
+
+    # Exact counts per scale, so results stay comparable across runs
+    walls, doors, floors = MapGenerator.generate_buildings(width, height, count=spec["buildings"], rng=rng)
+    trees, rocks = MapGenerator.generate_resources(width, height, walls, doors, floors,
+                                                   tree_count=spec["trees"], rock_count=spec["rocks"], rng=rng)
+    sim.registry.detach()
+    sim.walls, sim.doors, sim.floors = walls, doors, set(floors)
+    sim.trees, sim.rocks = trees, rocks
+    sim.zombies = []
+    sim.chunks.adopt()  # The whole map is populated; streamed scales page out what's far away
+    sim.rebuild_indexes()
+
+    # Zombies everywhere, and a defence line of turrets, spikes and trap pits north of the colonist
+    cx, cy = sim.colonist.x, sim.colonist.y
+    for _ in range(spec["zombies"]):
+        sim.spawn_zombie(rng.randrange(width), rng.randrange(height))
+    for i in range(spec["turrets"]):
+        x = min(max(cx - spec["turrets"] // 2 + i, 0), width - 1)
+        for kind, y in ((Turret, cy - 4), (Spike, cy - 6), (TrapPit, cy - 7)):
+            if not sim.grid.has_structure(x, y):
+                sim.registry.spawn(kind(x, y))
+    return sim
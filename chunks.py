@@ -0,0 +1,270 @@
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import weakref
+from itertools import chain
+
+from game_systems import MapGenerator
+from savegame import SaveGame
+
+CHUNK_SIZE = 32
+STREAMING_AREA = 512 * 512  # Maps with more tiles than this generate and page chunks on demand
+
+
+class Page:
+    """One paged-out chunk's page file.
+
+    The blob stays in memory until the pager thread has written it (write),
+    and is read back into memory ahead of time when the colonist heads
+    that way (fetch), so the game thread never waits on the disk. The file
+    is deleted once nothing holds the Page any more: normally when its
+    chunk is paged back in, but a save still reading it in the background
+    keeps it alive until the save is written.
+    """
+
+    def __init__(self, path, blob):
+        self.path = path
+        self.blob = blob  # In memory while unwritten or fetched; None once only on disk
+        self.written = False
+        weakref.finalize(self, _remove_quietly, path)
+
+    def write(self):
+        with open(self.path, "wb") as f:
+            f.write(self.blob)
+        self.written = True
+        self.blob = None  # Only dropped once the file is complete, so read() always finds one or the other
+
+    def fetch(self):
+        if self.blob is None:
+            self.blob = self.read()
+
+    def evict(self):
+        """Drop a fetched blob the colonist turned away from (it is safe on disk)"""
+        if self.written:
+            self.blob = None
+
+    def read(self):
+        """The page blob (see SaveGame.pack_page), from memory if it is there"""
+        blob = self.blob
+        if blob is not None:
+            return blob
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:  # Already gone with the whole page directory, or never written
+        pass
+
+
+class Pager:
+    """Worker thread running page file writes and read-aheads in order"""
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="chunk-pager", daemon=True)
+        self.thread.start()
+
+    def put(self, job):
+        self.jobs.put(job)
+
+    def stop(self):
+        """Finish the queued jobs and end the thread"""
+        self.jobs.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            try:
+                job()
+            except OSError as e:
+                print(f"Chunk paging failed: {e}")
+            job = None  # Don't keep the last Page (and its file) alive
+
+
+class ChunkManager:
+    """The map split into chunk_size x chunk_size chunks, generated and paged on demand.
+
+    Each chunk is generated (MapGenerator.generate_chunk) from the world seed
+    and its coordinates the first time it comes near the colonist, so the
+    world is the same whatever order it is explored in. Small maps are
+    generated up front and stay fully in memory. On streamed maps only chunks
+    within resident_radius of the colonist's chunk are loaded; chunks further
+    out (with one chunk of slack, so walking along a border doesn't thrash)
+    have their structures, resources and floors packed into page files and
+    dropped from the registry until the colonist returns. The files are
+    written and read ahead on a pager thread. Chunks within
+    active_radius get the full simulation: the flow field covers them, and
+    zombies elsewhere run on the far tier (see ZombieHorde.update).
+    """
+
+    def __init__(self, width, height, seed, registry, chunk_size=CHUNK_SIZE, streaming=None,
+                 active_radius=2, resident_radius=4):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.registry = registry
+        self.chunk_size = chunk_size
+        self.columns = -(-width // chunk_size)
+        self.rows = -(-height // chunk_size)
+        self.streaming = width * height > STREAMING_AREA if streaming is None else streaming
+        self.active_radius = active_radius
+        self.resident_radius = resident_radius
+        self.floors = set()  # Floor tiles of the resident chunks (paged with their chunk)
+        self.generated = set()  # (cx, cy) of every chunk that exists, loaded or paged
+        self.resident = set()  # Chunks whose entities are in the registry
+        self.pages = {}  # (cx, cy) -> Page, or None for a chunk with nothing in it
+        self.page_count = 0  # Page files written, numbering them so a new page never overwrites one a save still reads
+        self.page_dir = None
+        self.pager = None  # Started with the first page-out
+        self.fetched = set()  # Pages read ahead into memory
+        self.cleanup = None
+        self.centre = None  # Chunk the colonist was in at the last update
+
+    def chunk_of(self, x, y):
+        return x // self.chunk_size, y // self.chunk_size
+
+    def all_chunks(self):
+        return [(cx, cy) for cy in range(self.rows) for cx in range(self.columns)]
+
+    def chunks_around(self, radius):
+        """Chunks within radius (Chebyshev) of the centre; every chunk on small maps"""
+        if not self.streaming or self.centre is None:
+            return self.all_chunks()
+        ccx, ccy = self.centre
+        return [(cx, cy)
+                for cy in range(max(0, ccy - radius), min(self.rows, ccy + radius + 1))
+                for cx in range(max(0, ccx - radius), min(self.columns, ccx + radius + 1))]
+
+    def rect(self, radius):
+        """(x0, y0, x1, y1) tiles of the chunks within radius of the centre, clamped to the map"""
+        if not self.streaming or self.centre is None:
+            return 0, 0, self.width, self.height
+        size = self.chunk_size
+        cx, cy = self.centre
+        return (max(0, (cx - radius) * size), max(0, (cy - radius) * size),
+                min(self.width, (cx + radius + 1) * size), min(self.height, (cy + radius + 1) * size))
+
+    def active_rect(self):
+        return self.rect(self.active_radius)
+
+    def resident_rect(self):
+        return self.rect(self.resident_radius)
+
+    def update(self, x, y):
+        """Follow the colonist: load or generate nearby chunks and page out distant ones"""
+        centre = self.chunk_of(x, y)
+        if centre == self.centre:
+            return
+        self.centre = centre
+        for chunk in self.chunks_around(self.resident_radius):
+            if chunk not in self.resident:
+                if chunk in self.pages:
+                    self.page_in(chunk)
+                else:
+                    self.generate(*chunk)
+        if self.streaming:
+            limit = self.resident_radius + 1
+            far = [chunk for chunk in self.resident
+                   if max(abs(chunk[0] - centre[0]), abs(chunk[1] - centre[1])) > limit]
+            if far:
+                self.page_out(far)
+            # Read the ring just outside the resident area back into memory, ready for the next step this way
+            ahead = set()
+            for chunk in self.chunks_around(limit):
+                page = self.pages.get(chunk)
+                if page is not None:
+                    ahead.add(page)
+                    if page not in self.fetched:
+                        self.pager.put(page.fetch)
+            for page in self.fetched - ahead:
+                self.pager.put(page.evict)
+            self.fetched = ahead
+
+    def adopt(self, generated=None):
+        """Treat the registry's current contents as the given chunks (all by default), e.g. after a load"""
+        self.generated = set(generated) if generated is not None else set(self.all_chunks())
+        self.resident = set(self.generated)
+        self.centre = None  # The next update() pages out whatever is too far away
+
+    # --- Generation ---
+    def generate(self, cx, cy):
+        size = self.chunk_size
+        x0, y0 = cx * size, cy * size
+        walls, doors, floors, trees, rocks = MapGenerator.generate_chunk(
+            self.seed, cx, cy, x0, y0, min(size, self.width - x0), min(size, self.height - y0))
+        self.floors.update(floors)
+        self.registry.load(walls + doors + trees + rocks)
+        self.generated.add((cx, cy))
+        self.resident.add((cx, cy))
+
+    # --- Paging ---
+    def page_path(self, cx, cy):
+        if self.page_dir is None:
+            self.page_dir = tempfile.mkdtemp(prefix="deadhold-pages-")
+            self.cleanup = weakref.finalize(self, shutil.rmtree, self.page_dir, True)
+            self.pager = Pager()
+        self.page_count += 1
+        return os.path.join(self.page_dir, f"{cx}_{cy}_{self.page_count}.page")
+
+    def page_out(self, chunks):
+        """Pack the chunks' entities and floors into pages, drop them, and queue the file writes"""
+        contents = {chunk: {} for chunk in chunks}
+        size = self.chunk_size
+        for name, collection in self.registry.collections.items():
+            for entity in collection:
+                entities = contents.get((entity.x // size, entity.y // size))
+                if entities is not None:
+                    entities.setdefault(name, []).append(entity)
+        for floor in self.floors:
+            entities = contents.get((floor[0] // size, floor[1] // size))
+            if entities is not None:
+                entities.setdefault("floors", []).append(floor)
+        for (cx, cy), entities in contents.items():
+            self.resident.discard((cx, cy))
+            if not entities:
+                self.pages[(cx, cy)] = None
+                continue
+            page = self.pages[(cx, cy)] = Page(self.page_path(cx, cy), SaveGame.pack_page(entities))
+            self.pager.put(page.write)
+            self.floors.difference_update(entities.pop("floors", ()))
+            self.registry.unload(list(chain.from_iterable(entities.values())))
+
+    def page_in(self, chunk):
+        page = self.pages.pop(chunk)
+        if page is not None:
+            self.fetched.discard(page)
+            entities = SaveGame.unpack_page(page.read())  # Usually already fetched into memory
+            self.floors.update(entities.pop("floors", ()))
+            self.registry.load(list(chain.from_iterable(entities.values())))
+        self.resident.add(chunk)
+
+    def paged(self):
+        """Every page, for a save to read (on its own thread, if it likes)"""
+        return [page for page in self.pages.values() if page is not None]
+
+    def describe(self):
+        """Map size, seed and generated chunks, stored in saves so loading can carry on generating"""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "seed": self.seed,
+            "chunk_size": self.chunk_size,
+            "generated": sorted(self.generated),
+        }
+
+    def close(self):
+        """Delete the page files (the simulation is being replaced, e.g. by a load)"""
+        if self.pager is not None:
+            self.pager.stop()  # Let queued writes finish before their directory goes
+            self.pager = None
+        if self.cleanup is not None:
+            self.cleanup()
+        self.pages.clear()
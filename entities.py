@@ -1,8 +1,10 @@
 import pygame
 import os
 
+from assets import AssetCache, PANELS
+
 TILE_SIZE = 64
-MAP_WIDTH = 200
+MAP_WIDTH = 200  # Default map size; Simulation and main() take the actual size
 MAP_HEIGHT = 150
 
 # Ensure the assets folder exists at this path:
@@ -24,14 +26,14 @@ WALL_COLOR = (120, 120, 120)
 TREE_COLOR = (34, 139, 34)
 ROCK_COLOR = (100, 100, 100)
 
-def load_image(filename):
-    path = os.path.join(ASSET_DIR, filename)
-    try:
-        img = pygame.image.load(path).convert_alpha()
-        img = pygame.transform.smoothscale(img, (TILE_SIZE, TILE_SIZE))
-        return img
-    except Exception:
-        return None
+# Shared by every entity and the renderer; each image is decoded and scaled once
+ASSETS = AssetCache(ASSET_DIR, TILE_SIZE)
+
+# Entity sprites, for ASSETS.preload() at startup (trees are 1x2 tiles)
+SPRITES = ([f"colonist_{d}.png" for d in ("up", "down", "left", "right")] + ["colonist.png"]
+           + [f"zombie_{d}.png" for d in ("up", "down", "left", "right")] + ["zombie.png"]
+           + ["wall.png", "stone_wall.png", ("tree.png", (1, 2)), "rock.png", "spike.png", "turret.png",
+              "door.png", "door_open.png", "trap_pit.png", "workbench.png", "campfire.png", "campfire_off.png"])
 
 def get_direction_name(dx, dy):
     if dx == 0 and dy == -1:
@@ -61,26 +63,36 @@ class Entity:
 
 class Colonist(Entity):
     images = {}
+    STEP_TIME = 0.2  # Seconds per tile while a direction is held
+    TURN_TIME = 0.1  # Taps shorter than this only change facing
 
     def __init__(self, x, y):
         super().__init__(x, y, GREEN)
         self.facing = (0, -1)  # Default facing up (dx, dy)
+        self.prev_x, self.prev_y = x, y  # Tile the latest step started from, for smooth drawing
+        self.step_timer = 0.0  # Seconds until the next step is allowed
+        self.tick_time = 0.2  # Seconds per logic tick, from the latest update_movement
         self.movement_delay = 0  # Delay before movement starts
-        self.key_hold_time = {}  # Track how long each direction key is held
+        self.key_hold_time = {}  # Track how long (in seconds) each direction key is held
         # Load directional images once
         if not Colonist.images:
             for dir_name in ["up", "down", "left", "right"]:
-                img = load_image(f"colonist_{dir_name}.png")
+                img = ASSETS.get(f"colonist_{dir_name}.png")
                 if img:
                     Colonist.images[dir_name] = img
             # Fallback to colonist.png if directional missing
-            fallback = load_image("colonist.png")
+            fallback = ASSETS.get("colonist.png")
             for dir_name in ["up", "down", "left", "right"]:
                 if dir_name not in Colonist.images and fallback:
                     Colonist.images[dir_name] = fallback
 
-    def update_movement(self, keys):
-        """Update movement based on key states, allowing quick taps to change facing only"""
+    def update_movement(self, keys, dt=0.2):
+        """Update movement from the set of held direction keys, allowing quick taps to change facing only.
+
+        dt is the length of a logic tick in seconds; a held key steps once per STEP_TIME.
+        """
+        self.tick_time = dt
+        self.step_timer = max(0.0, self.step_timer - dt)
         # Check which direction keys are pressed
         directions = {
             pygame.K_UP: (0, -1),
@@ -91,43 +103,53 @@ class Colonist(Entity):
         
         pressed_direction = None
         for key, direction in directions.items():
-            if keys[key]:
+            if key in keys:
                 pressed_direction = direction
                 # Track how long this key has been held
                 if key not in self.key_hold_time:
-                    self.key_hold_time[key] = 0
-                self.key_hold_time[key] += 1
+                    self.key_hold_time[key] = 0.0
+                self.key_hold_time[key] += dt
                 break
         
         # Clear hold times for keys that aren't pressed
         for key in list(self.key_hold_time.keys()):
-            if not keys[key]:
+            if key not in keys:
                 del self.key_hold_time[key]
         
         if pressed_direction:
             # Always update facing direction immediately
             self.facing = pressed_direction
             
-            # Only move if key has been held for more than 1 frame (faster response)
+            # Only move once the key has been held past a tap, and the previous step is done
             for key, direction in directions.items():
-                if keys[key] and direction == pressed_direction:
-                    if self.key_hold_time[key] > 1:  # Reduced from 2 to 1 for faster movement
+                if key in keys and direction == pressed_direction:
+                    if self.key_hold_time[key] > self.TURN_TIME and self.step_timer <= 0:
                         return direction
             
         return (0, 0)  # No movement, just facing change
 
-    def move(self, dx, dy, walls, trees_and_rocks):
+    def move(self, dx, dy, grid):
         if dx == 0 and dy == 0:
             return
             
         nx, ny = self.x + dx, self.y + dy
-        if 0 <= nx < MAP_WIDTH and 0 <= ny < MAP_HEIGHT:
-            # Prevent moving into walls, uncut trees, or unmined rocks
-            if any(w.x == nx and w.y == ny for w in walls):
-                return
-            if any((t.x == nx and t.y == ny) for t in trees_and_rocks):
+        if grid.in_bounds(nx, ny):
+            # Prevent moving into walls, closed doors, uncut trees, or unmined rocks
+            if grid.blocks_colonist(nx, ny):
                 return
+            self.prev_x, self.prev_y = self.x, self.y
             self.x, self.y = nx, ny
+            self.step_timer = self.STEP_TIME
+
+    def draw_offset(self, alpha=1.0):
+        """Tile offset from (x, y) to where the colonist is drawn, alpha of the way through the latest tick.
+
+        A step is spread over STEP_TIME, so the colonist glides from prev to
+        its tile at walking pace instead of jumping in one tick.
+        """
+        progress = max(0.0, min((self.STEP_TIME - self.step_timer + alpha * self.tick_time) / self.STEP_TIME, 1.0))
+        remaining = 1.0 - progress
+        return (self.prev_x - self.x) * remaining, (self.prev_y - self.y) * remaining
 
     def draw(self, surface, cam_x=0, cam_y=0):
         # Draw directional image
@@ -138,63 +160,77 @@ class Colonist(Entity):
         else:
             super().draw(surface, cam_x, cam_y)
 
+class Worker(Colonist):
+    """An AI colonist that takes jobs from the JobSystem (see Simulation.update_workers).
+
+    Drawn like the player's colonist, with a badge to tell them apart.
+    """
+
+    WORK_TIME = 1.5  # Seconds to cut a tree, mine a rock or put up a building
+    DOOR_TIME = 0.4  # Extra seconds to open a closed door, step through and shut it (pathfinding.DOOR_COST steps in all)
+    BADGE_COLOR = (60, 140, 255)
+
+    def __init__(self, x, y):
+        super().__init__(x, y)
+        self.facing = (0, 1)
+        self.job = None  # Claimed job, or None while idle or delivering
+        self.path = []  # Tiles left to walk to the current goal
+        self.work_timer = None  # Seconds of work left once at the job, None while walking
+        self.carrying = {}  # resource -> amount on the way to the stockpile
+        self.idle_until = 0  # Simulated ms before an idle worker looks for work again
+
+    def tick(self, dt):
+        """Advance the step timer by one logic tick of dt seconds"""
+        self.tick_time = dt
+        self.step_timer = max(0.0, self.step_timer - dt)
+
+    def move(self, dx, dy, grid):
+        """Step like the colonist, except that a closed door is opened and shut again behind, which takes longer"""
+        nx, ny = self.x + dx, self.y + dy
+        door = grid.find(nx, ny, Door)
+        if door is None or door.open:
+            super().move(dx, dy, grid)
+            return
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x, self.y = nx, ny
+        self.step_timer = self.STEP_TIME + self.DOOR_TIME
+
+    def draw(self, surface, cam_x=0, cam_y=0):
+        super().draw(surface, cam_x, cam_y)
+        pygame.draw.rect(surface, self.BADGE_COLOR, (self.x * TILE_SIZE - cam_x + TILE_SIZE - 14, self.y * TILE_SIZE - cam_y + 4, 10, 10))
+
 class Zombie(Entity):
+    """A single zombie's state; the live horde is simulated by horde.ZombieHorde"""
     images = {}
 
     def __init__(self, x, y):
         super().__init__(x, y, RED)
         self.move_counter = 0
         self.facing = (0, 1)
+        Zombie.load_images()
+
+    @staticmethod
+    def load_images():
         # Load directional images once
-        if not Zombie.images:
-            for dir_name in ["up", "down", "left", "right"]:
-                img = load_image(f"zombie_{dir_name}.png")
-                if img:
+        if Zombie.images:
+            return
+        for dir_name in ["up", "down", "left", "right"]:
+            img = ASSETS.get(f"zombie_{dir_name}.png")
+            if img:
+                Zombie.images[dir_name] = img
+        fallback = ASSETS.get("zombie.png")
+        for dir_name in ["up", "down", "left", "right"]:
+            if dir_name not in Zombie.images and fallback:
+                Zombie.images[dir_name] = fallback
+        # If still missing any direction, use any loaded image as a last resort
+        for dir_name in ["up", "down", "left", "right"]:
+            if dir_name not in Zombie.images:
+                for img in Zombie.images.values():
                     Zombie.images[dir_name] = img
-            fallback = load_image("zombie.png")
-            for dir_name in ["up", "down", "left", "right"]:
-                if dir_name not in Zombie.images and fallback:
-                    Zombie.images[dir_name] = fallback
-            # If still missing any direction, use any loaded image as a last resort
-            for dir_name in ["up", "down", "left", "right"]:
-                if dir_name not in Zombie.images:
-                    for img in Zombie.images.values():
-                        Zombie.images[dir_name] = img
-                        break
-            # Print warning if no image loaded at all
-            if not Zombie.images:
-                print("Warning: No zombie images found. Zombies will be red squares.")
-
-    def update(self, target, walls):
-        self.move_counter += 1
-        if self.move_counter % 4 == 0:  # Move only every 4 frames
-            # Always calculate movement toward target (removed optimization that was breaking AI)
-            dx = target.x - self.x
-            dy = target.y - self.y
-            nx, ny = self.x, self.y
-            
-            # Determine facing direction for image
-            if abs(dx) > abs(dy):
-                if dx > 0:
-                    self.facing = (1, 0)
-                elif dx < 0:
-                    self.facing = (-1, 0)
-                nx += self.facing[0]
-            else:
-                if dy > 0:
-                    self.facing = (0, 1)
-                elif dy < 0:
-                    self.facing = (0, -1)
-                ny += self.facing[1]
-            
-            # Check for wall collision - NOTE: spikes removed from walls list in main.py
-            for wall in walls:
-                if wall.x == nx and wall.y == ny:
-                    wall.damage(25)
-                    return  # Don't move, just damage wall
-            
-            # Move if no collision (zombies now walk through spikes)
-            self.x, self.y = nx, ny
+                    break
+        # Print warning if no image loaded at all
+        if not Zombie.images and pygame.display.get_surface() is not None:
+            print("Warning: No zombie images found. Zombies will be red squares.")
 
     def draw(self, surface, cam_x=0, cam_y=0):
         dir_name = get_direction_name(*self.facing)
@@ -229,7 +265,7 @@ class Wall:
             img_name = "wall.png"
         # Load images for both wall types
         if img_name not in Wall.images:
-            Wall.images[img_name] = load_image(img_name)
+            Wall.images[img_name] = ASSETS.get(img_name)
         self.image = Wall.images[img_name]
 
     def draw(self, surface, cam_x=0, cam_y=0):
@@ -248,18 +284,16 @@ class Wall:
 
 class Tree:
     image = None
+    WOOD_YIELD = 2  # Wood per tree
 
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.color = TREE_COLOR
         self.cut_down = False
+        self.designated = False  # Marked for the workers to cut
         if Tree.image is None:
-            # Load a 1x2 tile image, or scale a 1x1 image to 1x2 tiles
-            img = load_image("tree.png")
-            if img and img.get_height() != TILE_SIZE * 2:
-                img = pygame.transform.smoothscale(img, (TILE_SIZE, TILE_SIZE * 2))
-            Tree.image = img
+            Tree.image = ASSETS.get("tree.png", (1, 2))  # Drawn 1x2 tiles, base on the tree's tile
 
     def draw(self, surface, cam_x=0, cam_y=0):
         if Tree.image:
@@ -275,7 +309,7 @@ class Tree:
 
     def cut(self):
         self.cut_down = True
-        return 2  # Amount of wood per tree
+        return self.WOOD_YIELD
 
     def damage(self, amount):
         # Trees are not damaged by zombies, so do nothing
@@ -283,17 +317,19 @@ class Tree:
 
 class Rock:
     image = None
+    STONE_YIELD = 2  # Stone per rock
 
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.color = ROCK_COLOR
         self.mined = False
+        self.designated = False  # Marked for the workers to mine
 
     def draw(self, surface, cam_x=0, cam_y=0):
         # Always try to load the image if not loaded yet
         if Rock.image is None and pygame.get_init():
-            Rock.image = load_image("rock.png")
+            Rock.image = ASSETS.get("rock.png")
         if Rock.image:
             surface.blit(Rock.image, (self.x * TILE_SIZE - cam_x, self.y * TILE_SIZE - cam_y))
         else:
@@ -312,7 +348,7 @@ class Rock:
 
     def mine(self):
         self.mined = True
-        return 2  # Amount of stone per rock
+        return self.STONE_YIELD
 
     def damage(self, amount):
         # Rocks are not damaged by zombies, so do nothing
@@ -320,6 +356,8 @@ class Rock:
 
 class Spike:
     image = None
+    DAMAGE = 10  # Damage per hit on a zombie standing on the spikes
+    HIT_INTERVAL = 200  # Simulated ms between hits (50 DPS)
 
     def __init__(self, x, y):
         self.x = x
@@ -327,7 +365,7 @@ class Spike:
         self.hp = 50
         self.last_damage_time = 0  # Track when spike last dealt damage
         if Spike.image is None:
-            Spike.image = load_image("spike.png")
+            Spike.image = ASSETS.get("spike.png")
 
     def draw(self, surface, cam_x=0, cam_y=0):
         if Spike.image:
@@ -360,14 +398,15 @@ class Spike:
 
 class Turret:
     image = None
+    COOLDOWN = 2.0  # Seconds between shots
 
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.hp = 100
-        self.cooldown = 0
+        self.cooldown = 0  # Seconds until the turret can fire again
         if Turret.image is None:
-            Turret.image = load_image("turret.png")
+            Turret.image = ASSETS.get("turret.png")
 
     def draw(self, surface, cam_x=0, cam_y=0):
         if Turret.image:
@@ -379,17 +418,35 @@ class Turret:
         self.hp -= amount
 
 class Bullet:
+    SPEED = 15  # Tiles per second
+    LIFETIME = 4 / 3  # Seconds before a bullet that hit nothing fizzles out (20 tiles)
+
     def __init__(self, x, y, dx, dy):
         self.x = x
         self.y = y
         self.dx = dx
         self.dy = dy
-        self.timer = 0  # For bullet lifetime
+        self.age = 0.0  # Seconds since the bullet was fired
+        self.moved = 0  # Tiles flown so far
 
-    def update(self):
+    def update(self, dt):
+        """Age the bullet by dt seconds; returns how many tiles it flies in that time.
+
+        The caller steps it with advance(), so hits are still checked on every tile.
+        """
+        self.age += dt
+        due = int(self.age * self.SPEED + 1e-6)  # Tolerates float drift in the summed tick lengths
+        steps = due - self.moved
+        self.moved = due
+        return steps
+
+    def advance(self):
         self.x += self.dx
         self.y += self.dy
-        self.timer += 1
+
+    @property
+    def expired(self):
+        return self.age > self.LIFETIME
 
     def draw(self, surface, cam_x=0, cam_y=0):
         pygame.draw.circle(surface, (255, 255, 0), (self.x * TILE_SIZE + TILE_SIZE // 2 - cam_x, self.y * TILE_SIZE + TILE_SIZE // 2 - cam_y), 8)
@@ -404,9 +461,9 @@ class Door:
         self.hp = 100
         self.open = False
         if Door.image_closed is None:
-            Door.image_closed = load_image("door.png")
+            Door.image_closed = ASSETS.get("door.png")
         if Door.image_open is None:
-            Door.image_open = load_image("door_open.png") or Door.image_closed
+            Door.image_open = ASSETS.get("door_open.png") or Door.image_closed
 
     def draw(self, surface, cam_x=0, cam_y=0):
         img = Door.image_open if self.open else Door.image_closed
@@ -428,6 +485,8 @@ class Door:
 
 class TrapPit:
     image = None
+    DAMAGE = 20  # Damage per hit on a zombie in the pit
+    HIT_INTERVAL = 200  # Simulated ms between hits (100 DPS)
 
     def __init__(self, x, y):
         self.x = x
@@ -435,7 +494,7 @@ class TrapPit:
         self.hp = 75  # More durable than spikes
         self.last_damage_time = 0
         if TrapPit.image is None:
-            TrapPit.image = load_image("trap_pit.png")
+            TrapPit.image = ASSETS.get("trap_pit.png")
 
     def draw(self, surface, cam_x=0, cam_y=0):
         if TrapPit.image:
@@ -464,15 +523,16 @@ class TrapPit:
 
 class Workbench:
     image = None
+    CRAFT_TIME = 6.0  # Seconds per craft
 
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.hp = 150
         self.in_use = False
-        self.craft_timer = 0
+        self.craft_timer = 0  # Seconds left on the current craft
         if Workbench.image is None:
-            Workbench.image = load_image("workbench.png")
+            Workbench.image = ASSETS.get("workbench.png")
 
     def draw(self, surface, cam_x=0, cam_y=0):
         if Workbench.image:
@@ -488,9 +548,7 @@ class Workbench:
         # Visual indicator when in use
         if self.in_use:
             # Glowing effect
-            glow_surface = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
-            glow_surface.fill((255, 255, 0, 60))
-            surface.blit(glow_surface, (self.x * TILE_SIZE - cam_x, self.y * TILE_SIZE - cam_y))
+            surface.blit(PANELS.get((TILE_SIZE, TILE_SIZE), (255, 255, 0, 60)), (self.x * TILE_SIZE - cam_x, self.y * TILE_SIZE - cam_y))
         
         # Draw HP bar if damaged
         if self.hp < 150:
@@ -504,14 +562,14 @@ class Workbench:
         """Start a crafting operation"""
         if not self.in_use:
             self.in_use = True
-            self.craft_timer = 30  # 6 seconds at 5 FPS
+            self.craft_timer = self.CRAFT_TIME
             return True
         return False
 
-    def update(self):
-        """Update crafting progress"""
+    def update(self, dt=0.2):
+        """Update crafting progress by dt seconds"""
         if self.in_use and self.craft_timer > 0:
-            self.craft_timer -= 1
+            self.craft_timer -= dt
             if self.craft_timer <= 0:
                 self.in_use = False
                 return True  # Crafting complete
@@ -520,6 +578,8 @@ class Workbench:
 class Campfire:
     image = None
     image_off = None
+    LIGHT_RADIUS = 4  # Tiles lit at full fuel
+    FUEL_BURN = 0.5  # Fuel used per second while lit (a full campfire burns for 200 seconds)
 
     def __init__(self, x, y):
         self.x = x
@@ -529,9 +589,9 @@ class Campfire:
         self.fuel = 100  # Fuel level
         self.last_heal_time = 0
         if Campfire.image is None:
-            Campfire.image = load_image("campfire.png")
+            Campfire.image = ASSETS.get("campfire.png")
         if Campfire.image_off is None:
-            Campfire.image_off = load_image("campfire_off.png")
+            Campfire.image_off = ASSETS.get("campfire_off.png")
 
     def draw(self, surface, cam_x=0, cam_y=0):
         # Choose appropriate image based on lit state and fuel
@@ -570,23 +630,28 @@ class Campfire:
     def damage(self, amount):
         self.hp -= amount
 
+    def light_radius(self):
+        """Tiles of light cast at night (0 when out); the glow shrinks as the fuel runs down"""
+        if not (self.lit and self.fuel > 0):
+            return 0
+        return max(2, round(self.LIGHT_RADIUS * self.fuel / 100))
+
     def add_fuel(self, amount):
         """Add fuel to keep fire burning"""
         self.fuel = min(100, self.fuel + amount)
 
-    def update(self):
-        """Update campfire - consumes fuel and can heal nearby colonist"""
+    def update(self, dt=0.2):
+        """Update campfire over dt seconds - consumes fuel and can heal nearby colonist"""
         if self.lit and self.fuel > 0:
-            self.fuel -= 0.1  # Slowly consume fuel
+            self.fuel -= self.FUEL_BURN * dt  # Slowly consume fuel
             if self.fuel <= 0:
                 self.lit = False
 
-    def heal_nearby(self, colonist):
-        """Heal colonist if they're nearby and fire is lit"""
+    def heal_nearby(self, colonist, current_time):
+        """Heal colonist if they're nearby and fire is lit (current_time in simulated ms)"""
         if self.lit and self.fuel > 0:
             distance = abs(self.x - colonist.x) + abs(self.y - colonist.y)
             if distance <= 2:  # Within 2 tiles
-                current_time = pygame.time.get_ticks()
                 if current_time - self.last_heal_time > 2000:  # Heal every 2 seconds
                     if colonist.hp < 100:
                         colonist.hp = min(100, colonist.hp + 5)
@@ -1,26 +1,155 @@
+import heapq
 import random
+from collections import deque
+import numpy as np
 import pygame
-from entities import Tree, Rock, Wall, Door
+from entities import Tree, Rock, Wall, Door, Zombie
+from assets import TEXT, PANELS
+
+
+def _mix(h):
+    """splitmix64 finalizer over uint64s: a well-spread hash, identical on every platform"""
+    with np.errstate(over="ignore"):  # Wrapping multiplication is the point
+        h = h + np.uint64(0x9E3779B97F4A7C15)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return h ^ (h >> np.uint64(31))
+
+
+def value_noise(seed, xs, ys, scale):
+    """Smooth 0..1 noise at world tiles (xs, ys), with features about scale tiles across.
+
+    Lattice values are hashed from the seed and world coordinates, so chunks
+    generated separately still join up seamlessly.
+    """
+    fx = xs / scale
+    fy = ys / scale
+    ix = np.floor(fx).astype(np.int64)
+    iy = np.floor(fy).astype(np.int64)
+    tx = fx - ix
+    ty = fy - iy
+    tx = tx * tx * (3 - 2 * tx)  # Smoothstep, so lattice lines don't show
+    ty = ty * ty * (3 - 2 * ty)
+    salt = _mix(np.uint64(seed))
+
+    def corner(cx, cy):
+        h = _mix(salt ^ _mix(cx.astype(np.uint64) * np.uint64(0x100000001B3) ^ cy.astype(np.uint64)))
+        return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+    top = corner(ix, iy) * (1 - tx) + corner(ix + 1, iy) * tx
+    bottom = corner(ix, iy + 1) * (1 - tx) + corner(ix + 1, iy + 1) * tx
+    return top * (1 - ty) + bottom * ty
+
 
 class MapGenerator:
+    """Seeded world generation.
+
+    generate_chunk() fills one rectangle of the map from (seed, chunk
+    coordinates) alone, so the same seed always produces the same world,
+    entity for entity, whichever order chunks are generated in. Occupancy is
+    a NumPy mask per chunk and trees and rocks are placed in one vectorized
+    pass, with value-noise biomes clustering them into forests and quarries.
+    generate_buildings() and generate_resources() scatter a fixed number of
+    each over a whole area (the benchmark scenarios use them).
+    """
+
+    # Expected counts per tile, matching the classic 200x150 map (10 buildings, 300 trees, 150 rocks)
+    BUILDING_DENSITY = 10 / (200 * 150)
+    TREE_DENSITY = 300 / (200 * 150)
+    ROCK_DENSITY = 150 / (200 * 150)
+    FOREST_SCALE = 40  # Rough size of forests and clearings, in tiles
+    QUARRY_SCALE = 24
+
+    @staticmethod
+    def biome_weight(noise):
+        """Density multiplier for a noise value: sparse below 0.5, up to 3.5x in the densest cores.
+
+        Averages out to about 1, so the densities still give the expected totals.
+        """
+        return 0.2 + 3.25 * np.clip((noise - 0.5) / 0.25, 0, 1) ** 2
+
+    @classmethod
+    def generate_chunk(cls, seed, cx, cy, x0, y0, width, height, building_density=None,
+                       tree_density=None, rock_density=None):
+        """Buildings, trees and rocks for the width x height tiles at (x0, y0).
+
+        Returns (walls, doors, floors, trees, rocks). Everything random comes
+        from a generator seeded with (seed, cx, cy) or from the seeded noise.
+        """
+        building_density = cls.BUILDING_DENSITY if building_density is None else building_density
+        tree_density = cls.TREE_DENSITY if tree_density is None else tree_density
+        rock_density = cls.ROCK_DENSITY if rock_density is None else rock_density
+        rng = np.random.default_rng([seed, cx, cy])
+        occupied = np.zeros((height, width), dtype=bool)  # Building footprints, floors included
+        walls = []
+        doors = []
+        floors = []
+
+        # Buildings never overlap, and keep 5 tiles from the chunk edges so they never straddle two chunks
+        count = int(rng.poisson(building_density * width * height)) if width >= 16 and height >= 16 else 0
+        for _ in range(count):
+            bw, bh = (int(v) for v in rng.integers(3, 8, size=2))
+            lx = int(rng.integers(5, width - 9))
+            ly = int(rng.integers(5, height - 9))
+            stone = rng.random() < 0.5
+            door_rolls = rng.random((bh, bw)) < 0.08
+            footprint = occupied[ly:ly + bh, lx:lx + bw]
+            if footprint.any():
+                continue
+            footprint[:] = True
+            wall_type = "stone" if stone else "wood"
+            for y in range(bh):
+                for x in range(bw):
+                    wx, wy = x0 + lx + x, y0 + ly + y
+                    if 0 < x < bw - 1 and y < bh - 1:
+                        floors.append((wx, wy))  # Interior and under the top row
+                    if x in (0, bw - 1) or y in (0, bh - 1):
+                        corner = x in (0, bw - 1) and y in (0, bh - 1)
+                        if door_rolls[y, x] and not corner:
+                            doors.append(Door(wx, wy))
+                        else:
+                            walls.append(Wall(wx, wy, wall_type=wall_type))
+
+        # Trees and rocks: one roll per free tile, weighted by the forest and quarry noise
+        ys, xs = np.mgrid[y0:y0 + height, x0:x0 + width]
+        forest = cls.biome_weight(value_noise(seed, xs, ys, cls.FOREST_SCALE))
+        quarry = cls.biome_weight(value_noise(seed + 1, xs, ys, cls.QUARRY_SCALE))
+        rolls = rng.random((2, height, width))
+        tree_mask = (rolls[0] < tree_density * forest) & ~occupied
+        rock_mask = (rolls[1] < rock_density * quarry) & ~occupied & ~tree_mask
+        trees = [Tree(x0 + x, y0 + y) for y, x in zip(*(a.tolist() for a in np.nonzero(tree_mask)))]
+        rocks = [Rock(x0 + x, y0 + y) for y, x in zip(*(a.tolist() for a in np.nonzero(rock_mask)))]
+        return walls, doors, floors, trees, rocks
+
     @staticmethod
-    def generate_buildings(MAP_WIDTH, MAP_HEIGHT, count=10):
-        """Generate random buildings with walls, doors, and floors"""
+    def generate_buildings(MAP_WIDTH, MAP_HEIGHT, count=10, seed=None, rng=None, origin=(0, 0)):
+        """Generate random buildings with walls, doors, and floors.
+
+        MAP_WIDTH x MAP_HEIGHT is the area to fill, starting at origin. The
+        random source is rng if given, otherwise a random.Random(seed).
+        """
+        rng = rng or random.Random(seed)
         walls = []
         doors = []
         floors = []
+        # Occupancy sets keep placement checks O(1) instead of scanning the lists
+        wall_positions = set()
+        door_positions = set()
+        floor_positions = set()
         
+        ox, oy = origin
         for _ in range(count):
-            bx = random.randint(5, MAP_WIDTH - 10)
-            by = random.randint(5, MAP_HEIGHT - 10)
-            bw = random.randint(3, 7)
-            bh = random.randint(3, 7)
-            wall_type = "stone" if random.random() < 0.5 else "wood"
+            bx = ox + rng.randint(5, MAP_WIDTH - 10)
+            by = oy + rng.randint(5, MAP_HEIGHT - 10)
+            bw = rng.randint(3, 7)
+            bh = rng.randint(3, 7)
+            wall_type = "stone" if rng.random() < 0.5 else "wood"
             
             # Place floor tiles (interior and under top row)
             for x in range(bx + 1, bx + bw - 1):
                 for y in range(by, by + bh - 1):
-                    if (x, y) not in floors:
+                    if (x, y) not in floor_positions:
+                        floor_positions.add((x, y))
                         floors.append((x, y))
             
             # Place walls and doors on perimeter
@@ -32,48 +161,52 @@ class MapGenerator:
                                    (y == by or y == by + bh - 1))
                         
                         # Random door placement (only if not a corner)
-                        if (not is_corner and random.random() < 0.08 and 
+                        if (not is_corner and rng.random() < 0.08 and 
                             ((y == by or y == by + bh - 1) or (x == bx or x == bx + bw - 1))):
-                            if not any(d.x == x and d.y == y for d in doors):
+                            if (x, y) not in door_positions:
+                                door_positions.add((x, y))
                                 doors.append(Door(x, y))
                         else:
-                            if (not any(w.x == x and w.y == y for w in walls) and 
-                                not any(d.x == x and d.y == y for d in doors)):
+                            if (x, y) not in wall_positions and (x, y) not in door_positions:
+                                wall_positions.add((x, y))
                                 walls.append(Wall(x, y, wall_type=wall_type))
         
         return walls, doors, floors
 
     @staticmethod
-    def generate_resources(MAP_WIDTH, MAP_HEIGHT, walls, doors, floors, tree_count=300, rock_count=150):
-        """Generate trees and rocks scattered across the map"""
+    def generate_resources(MAP_WIDTH, MAP_HEIGHT, walls, doors, floors, tree_count=300, rock_count=150,
+                           seed=None, rng=None, origin=(0, 0), margin=1):
+        """Generate trees and rocks scattered across the area, keeping margin tiles from its edges"""
+        rng = rng or random.Random(seed)
         trees = []
         rocks = []
+        blocked = {(w.x, w.y) for w in walls} | {(d.x, d.y) for d in doors} | set(floors)
+        tree_positions = set()
+        ox, oy = origin
         
         # Generate trees
         for _ in range(tree_count):
-            tx = random.randint(1, MAP_WIDTH - 2)
-            ty = random.randint(1, MAP_HEIGHT - 2)
-            if (not any(w.x == tx and w.y == ty for w in walls) and
-                not any(d.x == tx and d.y == ty for d in doors) and
-                (tx, ty) not in floors):
+            tx = ox + rng.randint(margin, MAP_WIDTH - 1 - margin)
+            ty = oy + rng.randint(margin, MAP_HEIGHT - 1 - margin)
+            if (tx, ty) not in blocked:
+                tree_positions.add((tx, ty))
                 trees.append(Tree(tx, ty))
 
         # Generate rocks
         for _ in range(rock_count):
-            rx = random.randint(1, MAP_WIDTH - 2)
-            ry = random.randint(1, MAP_HEIGHT - 2)
-            if (not any(w.x == rx and w.y == ry for w in walls) and
-                not any(d.x == rx and d.y == ry for d in doors) and
-                not any(t.x == rx and t.y == ry for t in trees) and
-                (rx, ry) not in floors):
+            rx = ox + rng.randint(margin, MAP_WIDTH - 1 - margin)
+            ry = oy + rng.randint(margin, MAP_HEIGHT - 1 - margin)
+            if (rx, ry) not in blocked and (rx, ry) not in tree_positions:
                 rocks.append(Rock(rx, ry))
         
         return trees, rocks
 
 class TimeSystem:
-    def __init__(self, minutes_per_step=15):
+    SECONDS_PER_STEP = 2  # Real seconds per step of the clock
+
+    def __init__(self, minutes_per_step=15, tick_rate=5):
         self.minutes_per_step = minutes_per_step
-        self.ticks_per_step = 10  # 5 FPS * 2
+        self.ticks_per_step = max(1, round(self.SECONDS_PER_STEP * tick_rate))
         self.total_steps = 24 * 60 // minutes_per_step
         self.current_step = (6 * 60) // minutes_per_step  # Start at 6:00 AM
         self.ticks = 0
@@ -92,16 +225,26 @@ class TimeSystem:
         hour, _ = self.get_time()
         return not (6 <= hour < 21)
 
+    def darkness(self):
+        """0.0 by day, 1.0 at night, fading over the hours before 21:00 and before 6:00"""
+        minutes = self.current_step * self.minutes_per_step
+        if 20 * 60 <= minutes < 21 * 60:
+            return (minutes - 20 * 60) / 60
+        if 5 * 60 <= minutes < 6 * 60:
+            return 1.0 - (minutes - 5 * 60) / 60
+        return 1.0 if self.is_night() else 0.0
+
     def is_new_day(self):
         hour, minute = self.get_time()
         return hour == 6 and minute == 0 and self.ticks % self.ticks_per_step == 0
 
 class WaveSystem:
-    def __init__(self, fps=5, wave_interval_minutes=2, base_zombies=5):
+    def __init__(self, tick_rate=5, wave_interval_minutes=2, base_zombies=5):
         self.wave_timer = 0
-        self.wave_interval = fps * 60 * wave_interval_minutes
+        self.wave_interval = tick_rate * 60 * wave_interval_minutes
         self.base_zombies = base_zombies
         self.day_count = 1
+        self.day_listeners = []  # Callbacks taking the new day number
 
     def update(self, time_system):
         self.wave_timer += 1
@@ -109,6 +252,8 @@ class WaveSystem:
         # New day wave
         if time_system.is_new_day():
             self.day_count += 1
+            for callback in self.day_listeners:
+                callback(self.day_count)
             return self.base_zombies + self.day_count - 1
         
         # Timed wave
@@ -131,29 +276,22 @@ class ExperienceSystem:
         return xp, level, skill_points, xp_to_next, leveled
 
 class CombatSystem:
+    # All combat queries go through a SpatialHash of living zombies that the
+    # caller rebuilds once per tick (see world.SpatialHash)
+
     @staticmethod
-    def update_turrets(turrets, zombies, bullets, Bullet):
-        """Optimized turret AI with spatial optimization"""
-        # Pre-filter zombies that are alive
-        alive_zombies = [z for z in zombies if z.hp > 0]
-        
+    def update_turrets(turrets, zombie_index, bullets, Bullet, dt=0.2):
+        """Turret AI: fire at the nearest zombie within 5 tiles (dt is the tick length in seconds)"""
         for turret in turrets:
             if turret.hp <= 0 or turret.cooldown > 0:
                 if turret.cooldown > 0:
-                    turret.cooldown -= 1
+                    turret.cooldown -= dt
                 continue
             
-            # Quick distance check - only consider zombies within rough range first
-            nearby_zombies = [z for z in alive_zombies 
-                            if abs(z.x - turret.x) <= 5 and abs(z.y - turret.y) <= 5]
-            
-            if not nearby_zombies:
-                continue
-                
-            # Find nearest zombie in exact range
+            # Find nearest zombie in exact range among the few buckets around the turret
             min_dist = 999
             target_z = None
-            for z in nearby_zombies:
+            for z in zombie_index.query(turret.x, turret.y, 5):
                 dist = abs(z.x - turret.x) + abs(z.y - turret.y)
                 if dist <= 5 and dist < min_dist:
                     min_dist = dist
@@ -170,186 +308,301 @@ class CombatSystem:
                     dy = 1 if dy > 0 else -1
                     dx = 0
                 bullets.append(Bullet(turret.x, turret.y, dx, dy))
-                turret.cooldown = 10
+                turret.cooldown = turret.COOLDOWN
 
     @staticmethod
-    def update_bullets(bullets, zombies, MAP_WIDTH, MAP_HEIGHT):
-        """Optimized bullet collision detection"""
-        alive_zombies = [z for z in zombies if z.hp > 0]
-        
-        for bullet in bullets[:]:
-            bullet.update()
-            
-            # Remove if out of bounds or expired
-            if (bullet.x < 0 or bullet.y < 0 or 
-                bullet.x >= MAP_WIDTH or bullet.y >= MAP_HEIGHT or 
-                bullet.timer > 20):
-                bullets.remove(bullet)
-                continue
-            
-            # Optimized collision - only check nearby zombies
-            hit = False
-            for z in alive_zombies:
-                if z.x == bullet.x and z.y == bullet.y:
-                    z.hp -= 50
-                    bullets.remove(bullet)
-                    hit = True
+    def update_bullets(bullets, zombie_index, MAP_WIDTH, MAP_HEIGHT, dt=0.2):
+        """Fly bullets for dt seconds and hit the first living zombie on a tile they cross"""
+        remaining = []
+        for bullet in bullets:
+            for _ in range(bullet.update(dt)):
+                bullet.advance()
+                # Remove if out of bounds
+                if (bullet.x < 0 or bullet.y < 0 or
+                        bullet.x >= MAP_WIDTH or bullet.y >= MAP_HEIGHT):
                     break
-            
-            if hit:
-                break
+                zombie = zombie_index.first_at(bullet.x, bullet.y)
+                if zombie:
+                    zombie.hp -= 50
+                    break
+            else:
+                if not bullet.expired:
+                    remaining.append(bullet)
+        bullets[:] = remaining
 
     @staticmethod
-    def update_spikes(spikes, zombies):
-        """Spikes damage zombies and slowly degrade when stepped on"""
-        alive_zombies = [z for z in zombies if z.hp > 0]
-        
-        # Create a position lookup for faster collision detection
-        zombie_positions = {(z.x, z.y): z for z in alive_zombies}
-        
+    def update_spikes(spikes, zombie_index, current_time=0):
+        """Spikes damage zombies and slowly degrade when stepped on; returns the spikes that fired.
+
+        current_time is in simulated ms; a spike hits at most once per HIT_INTERVAL,
+        so its damage per second doesn't depend on the tick rate.
+        """
+        fired = []
         for spike in spikes:
-            if spike.hp <= 0:
+            if spike.hp <= 0 or current_time - spike.last_damage_time < spike.HIT_INTERVAL:
                 continue
-            zombie = zombie_positions.get((spike.x, spike.y))
+            zombie = zombie_index.first_at(spike.x, spike.y)
             if zombie:
                 # Deal damage to zombie standing on spike
-                zombie.hp -= 10
+                zombie.hp -= spike.DAMAGE
                 
-                # Slowly degrade the spike from use (1 damage per frame a zombie is on it)
+                # Slowly degrade the spike from use (1 damage per hit)
                 spike.hp -= 1
                 
                 # Visual feedback when spike deals damage
-                spike.last_damage_time = pygame.time.get_ticks()
+                spike.last_damage_time = current_time
+                fired.append(spike)
+        return fired
 
     @staticmethod
-    def update_trap_pits(trap_pits, zombies):
-        """Trap pits deal heavy damage and slow zombies, plus degrade slowly"""
-        alive_zombies = [z for z in zombies if z.hp > 0]
-        
-        # Create a position lookup for faster collision detection
-        zombie_positions = {(z.x, z.y): z for z in alive_zombies}
-        
+    def update_trap_pits(trap_pits, zombie_index, current_time=0):
+        """Trap pits deal heavy damage and slow zombies, plus degrade slowly; returns the pits that fired"""
+        fired = []
         for trap_pit in trap_pits:
             if trap_pit.hp <= 0:
                 continue
-            zombie = zombie_positions.get((trap_pit.x, trap_pit.y))
+            zombie = zombie_index.first_at(trap_pit.x, trap_pit.y)
             if zombie:
-                # Deal heavy damage every frame (20 damage per frame at 5 FPS = 100 DPS)
-                zombie.hp -= 20
-                # Slow down zombie movement by resetting move counter
+                # Slow down zombie movement by resetting move counter (every tick it is in the pit)
                 zombie.move_counter = 0
+                if current_time - trap_pit.last_damage_time < trap_pit.HIT_INTERVAL:
+                    continue
+                # Deal heavy damage every hit (20 damage every 0.2 seconds = 100 DPS)
+                zombie.hp -= trap_pit.DAMAGE
                 
-                # Trap pits degrade slower than spikes (0.5 damage per frame)
+                # Trap pits degrade slower than spikes (0.5 damage per hit)
                 trap_pit.hp -= 0.5
                 
                 # Visual feedback when trap pit deals damage
-                trap_pit.last_damage_time = pygame.time.get_ticks()
+                trap_pit.last_damage_time = current_time
+                fired.append(trap_pit)
+        return fired
 
 class MinimapSystem:
-    def __init__(self, minimap_size=150):
+    """Minimap and zoomed-out full-map view over an event-driven tile buffer.
+
+    tiles holds one pixel per tile of the area worth keeping live (the
+    whole map, or the resident chunks on streamed maps; see attach) and is
+    patched through the grid's listeners. Whatever scrolls out of that area
+    is pasted into overview, a full-map picture at the full-map view's own
+    scale, so explored ground stays on the map without a buffer the size of
+    the world.
+    """
+
+    BACKGROUND = (20, 40, 20)
+    TREE_COLOR = (0, 150, 0)
+    ROCK_COLOR = (100, 100, 100)
+    WALL_COLOR = (120, 120, 120)
+    ZOMBIE_COLOR = (200, 0, 0)
+    COLONIST_COLOR = (0, 255, 0)
+
+    def __init__(self, minimap_size=150, full_map_scale=2, full_map_size=480):
         self.size = minimap_size
         self.scale = 3  # 3x zoom: each minimap pixel = 3x3 world tiles
-        self.surface = None
-        self.update_counter = 0  # Only update every few frames
-    
+        self.full_map_scale = full_map_scale  # Pixels per tile in the zoomed-out full-map view
+        self.full_map_size = full_map_size  # Largest side of the full-map view; big maps get less than a pixel per tile
+        self.full_map = False
+        self.map_width = self.map_height = None
+        self.surface = None  # Scaled minimap, reused every frame
+        self.tiles = None  # One pixel per tile of area, patched only where the world changes
+        self.area = None  # pygame.Rect of the tiles tiles covers
+        self.region = None  # Returns the (x0, y0, x1, y1) tiles to keep in tiles
+        self.overview = None  # Explored ground at the full-map view's scale
+        self.grid = None
+        self.colonist = None
+        self.horde = None
+        self.rendered_key = None  # content_key() of what self.surface currently shows
+
     def initialize(self, MAP_WIDTH, MAP_HEIGHT):
-        minimap_w = self.size
-        minimap_h = self.size
-        self.surface = pygame.Surface((minimap_w, minimap_h))
-    
-    def update(self, MAP_WIDTH, MAP_HEIGHT, colonist, zombies, walls, trees, rocks):
-        # Store latest state for draw()
-        self.last_map_width = MAP_WIDTH
-        self.last_map_height = MAP_HEIGHT
-        self.last_colonist = colonist
-        self.last_zombies = zombies
-        self.last_walls = walls
-        self.last_trees = trees
-        self.last_rocks = rocks
-        # No need to update self.surface anymore (draw handles rendering)
-        self.update_counter += 1
-        # Optionally, skip some updates for performance
-        # if self.update_counter % 5 != 0:
-        #     return
-        # self.surface.fill((20, 40, 20))
-        # ...old code removed...
+        self.map_width = MAP_WIDTH
+        self.map_height = MAP_HEIGHT
+        self.tiles = None
+        self.area = None
+        scale = self.overview_scale()
+        self.overview = pygame.Surface((max(1, int(MAP_WIDTH * scale)), max(1, int(MAP_HEIGHT * scale))))
+        self.overview.fill(self.BACKGROUND)
+        self.surface = pygame.Surface((self.size, self.size))
+        self.rendered_key = None
+
+    def attach(self, grid, region=None):
+        """Paint the color buffer from a (new) world and follow its changes.
+
+        region returns the (x0, y0, x1, y1) tiles to keep live, e.g. the
+        resident chunks' ChunkManager.resident_rect; the whole map if None.
+        """
+        if (grid.width, grid.height) != (self.map_width, self.map_height):
+            self.initialize(grid.width, grid.height)
+        self.grid = grid
+        self.region = region or (lambda: (0, 0, self.map_width, self.map_height))
+        self.overview.fill(self.BACKGROUND)
+        self.tiles = None
+        self.area = None
+        self.cover()
+        grid.listeners.append(self.paint_tile)
+        self.rendered_key = None
+
+    def cover(self):
+        """Move the tile buffer to the current region, archiving what leaves it in the overview"""
+        x0, y0, x1, y1 = self.region()
+        area = pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+        if area == self.area:
+            return
+        old, old_area = self.tiles, self.area
+        self.tiles = pygame.Surface(area.size)
+        self.tiles.fill(self.BACKGROUND)
+        self.area = area
+        if old is not None:
+            self.archive(old, old_area)
+            self.tiles.blit(old, (old_area.x - area.x, old_area.y - area.y))
+        for (x, y) in list(self.grid.cells):
+            if area.collidepoint(x, y) and not (old_area and old_area.collidepoint(x, y)):
+                self.paint_tile(x, y)
+        self.rendered_key = None
+
+    def archive(self, tiles, area):
+        """Paste a tile buffer covering area into the overview"""
+        scale = self.overview_scale()
+        size = (max(1, round(area.width * scale)), max(1, round(area.height * scale)))
+        self.overview.blit(pygame.transform.scale(tiles, size), (round(area.x * scale), round(area.y * scale)))
+
+    def paint_tile(self, x, y):
+        if not self.area.collidepoint(x, y):
+            return
+        color = self.BACKGROUND
+        for occupant in self.grid.at(x, y):
+            if isinstance(occupant, Wall):
+                color = self.WALL_COLOR
+                break
+            if isinstance(occupant, Rock) and not occupant.mined:
+                color = self.ROCK_COLOR
+            elif isinstance(occupant, Tree) and not occupant.cut_down and color == self.BACKGROUND:
+                color = self.TREE_COLOR
+        self.tiles.set_at((x - self.area.x, y - self.area.y), color)
+
+    def toggle_full_map(self):
+        self.full_map = not self.full_map
+
+    def update(self, colonist, horde):
+        # Moving things are drawn as an overlay each frame; the tile buffer is event-driven
+        self.colonist = colonist
+        self.horde = horde
+
+    def view_rect(self):
+        """World-tile rectangle shown by the minimap, clamped to the map"""
+        if self.full_map:
+            return pygame.Rect(0, 0, self.map_width, self.map_height)
+        view_size = max(1, self.size // self.scale)  # e.g. 150//3 = 50
+        view_w = min(view_size, self.map_width)
+        view_h = min(view_size, self.map_height)
+        min_x = min(max(self.colonist.x - view_size // 2, 0), self.map_width - view_w)
+        min_y = min(max(self.colonist.y - view_size // 2, 0), self.map_height - view_h)
+        return pygame.Rect(min_x, min_y, view_w, view_h)
+
+    def overview_scale(self):
+        return min(self.full_map_scale, self.full_map_size / max(self.map_width, self.map_height))
+
+    def view_scale(self):
+        if self.full_map:
+            return self.overview_scale()
+        return self.scale
+
+    def content_key(self):
+        """Changes whenever the rendered minimap would: view, colonist, world or zombie positions"""
+        n = len(self.horde) if self.horde is not None else 0
+        return (tuple(self.view_rect()), self.full_map, self.colonist.x, self.colonist.y,
+                self.grid.version if self.grid else 0, tuple(self.area) if self.area else None,
+                self.horde.x[:n].tobytes() if n else b"", self.horde.y[:n].tobytes() if n else b"")
+
+    def render(self):
+        """Redraw self.surface, unless nothing it shows has changed since the last render"""
+        self.cover()
+        key = self.content_key()
+        if key == self.rendered_key:
+            return
+        self.rendered_key = key
+        view = self.view_rect()
+        scale = self.view_scale()
+        size = (int(view.width * scale), int(view.height * scale))
+        if self.surface.get_size() != size:
+            self.surface = pygame.Surface(size)
+        if self.full_map:
+            # Explored ground from the overview, with the live tiles on top
+            self.surface.blit(self.overview, (0, 0))
+            live = (round(self.area.width * scale), round(self.area.height * scale))
+            if live[0] and live[1]:
+                self.surface.blit(pygame.transform.scale(self.tiles, live),
+                                  (round(self.area.x * scale), round(self.area.y * scale)))
+        elif self.area.contains(view):
+            pygame.transform.scale(self.tiles.subsurface(view.move(-self.area.x, -self.area.y)), size, self.surface)
+        else:
+            # The view reaches past the live tiles (only while the region catches up): show what is there
+            self.surface.fill(self.BACKGROUND)
+            inside = view.clip(self.area)
+            if inside.width and inside.height:
+                part = (int(inside.width * scale), int(inside.height * scale))
+                self.surface.blit(pygame.transform.scale(self.tiles.subsurface(inside.move(-self.area.x, -self.area.y)), part),
+                                  (int((inside.x - view.x) * scale), int((inside.y - view.y) * scale)))
+
+        # Dynamic overlay: zombies and the colonist on top of the cached tiles
+        if self.horde is not None:
+            xs, ys = self.horde.positions_in_rect(view.x, view.y, view.right, view.bottom)
+            dot = max(1, int(scale))
+            for zx, zy in zip(xs, ys):
+                self.surface.fill(self.ZOMBIE_COLOR, (int((zx - view.x) * scale), int((zy - view.y) * scale), dot, dot))
+        dot = max(2, int(scale))
+        self.surface.fill(self.COLONIST_COLOR, (int((self.colonist.x - view.x) * scale), int((self.colonist.y - view.y) * scale), dot, dot))
+
+    def screen_rect(self, SCREEN_WIDTH, SCREEN_HEIGHT, position="topright"):
+        """Where blit() puts the minimap, including its 1-pixel border"""
+        width, height = self.surface.get_size()
+        x = SCREEN_WIDTH - width - 10
+        y = SCREEN_HEIGHT - height - 10 if position == "bottomright" else 10
+        return pygame.Rect(x - 1, y - 1, width + 2, height + 2)
+
+    def blit(self, screen, SCREEN_WIDTH, SCREEN_HEIGHT, position="topright"):
+        """Put the last rendered minimap on screen"""
+        rect = self.screen_rect(SCREEN_WIDTH, SCREEN_HEIGHT, position)
+        screen.blit(self.surface, (rect.x + 1, rect.y + 1))
+        pygame.draw.rect(screen, (255, 255, 255), rect, 1)
 
     def draw(self, screen, SCREEN_WIDTH, SCREEN_HEIGHT, position="topright"):
-        if self.surface:
-            # --- Begin new zoomed minimap scaling logic ---
-            # The minimap surface is always self.size x self.size
-            # But the zoomed-in area (view) is smaller, then scaled up to fill the minimap
-            view_size = self.size // self.scale  # e.g. 150//3 = 50
-            if view_size < 1:
-                view_size = 1
-            # Create a temp surface for the zoomed-in area
-            temp_surface = pygame.Surface((view_size, view_size))
-            temp_surface.fill((20, 40, 20))
-            # Center view on colonist
-            colonist = getattr(self, 'last_colonist', None)
-            map_width = getattr(self, 'last_map_width', None)
-            map_height = getattr(self, 'last_map_height', None)
-            trees = getattr(self, 'last_trees', [])
-            rocks = getattr(self, 'last_rocks', [])
-            walls = getattr(self, 'last_walls', [])
-            zombies = getattr(self, 'last_zombies', [])
-            if colonist and map_width and map_height:
-                min_x = colonist.x - view_size // 2
-                min_y = colonist.y - view_size // 2
-                for px in range(view_size):
-                    for py in range(view_size):
-                        world_x = min(max(min_x + px, 0), map_width - 1)
-                        world_y = min(max(min_y + py, 0), map_height - 1)
-                        color = (20, 40, 20)
-                        for tree in trees:
-                            if not tree.cut_down and tree.x == world_x and tree.y == world_y:
-                                color = (0, 150, 0)
-                        for rock in rocks:
-                            if not rock.mined and rock.x == world_x and rock.y == world_y:
-                                color = (100, 100, 100)
-                        for wall in walls:
-                            if wall.x == world_x and wall.y == world_y:
-                                color = (120, 120, 120)
-                        for zombie in zombies:
-                            if zombie.x == world_x and zombie.y == world_y:
-                                color = (200, 0, 0)
-                        temp_surface.set_at((px, py), color)
-                # Draw colonist last (always on top, center)
-                colonist_px = view_size // 2
-                colonist_py = view_size // 2
-                if 0 <= colonist_px < view_size and 0 <= colonist_py < view_size:
-                    temp_surface.set_at((colonist_px, colonist_py), (0, 255, 0))
-            # Scale temp_surface to minimap size
-            scaled_surface = pygame.transform.scale(temp_surface, (self.size, self.size))
-            # Draw at correct position
-            if position == "bottomright":
-                x = SCREEN_WIDTH - self.size - 10
-                y = SCREEN_HEIGHT - self.size - 10
-            else:
-                x = SCREEN_WIDTH - self.size - 10
-                y = 10
-            screen.blit(scaled_surface, (x, y))
-            pygame.draw.rect(screen, (255, 255, 255), (x-1, y-1, self.size+2, self.size+2), 1)
-            # --- End new minimap logic ---
+        if not self.surface or not self.colonist:
+            return
+        self.render()
+        self.blit(screen, SCREEN_WIDTH, SCREEN_HEIGHT, position)
 
 class ConstructionPlanningSystem:
-    def __init__(self):
+    def __init__(self, job_system=None):
         self.planning_mode = False
         self.planned_buildings = []  # List of (x, y, blueprint_name)
+        self.job_system = job_system  # If set, every plan is a construction job for the workers
         
     def toggle_planning_mode(self):
         self.planning_mode = not self.planning_mode
         
     def add_planned_building(self, x, y, blueprint_name):
         # Remove existing plan at this location
-        self.planned_buildings = [(px, py, bp) for px, py, bp in self.planned_buildings if px != x or py != y]
+        self.remove_planned_building(x, y)
         self.planned_buildings.append((x, y, blueprint_name))
+        if self.job_system is not None:
+            self.job_system.add_job("construction", x, y, blueprint=blueprint_name)
         
     def remove_planned_building(self, x, y):
         self.planned_buildings = [(px, py, bp) for px, py, bp in self.planned_buildings if px != x or py != y]
+        if self.job_system is not None:
+            self.job_system.cancel_job(x, y, "construction")
         
     def clear_all_plans(self):
+        if self.job_system is not None:
+            for x, y, _ in self.planned_buildings:
+                self.job_system.cancel_job(x, y, "construction")
         self.planned_buildings.clear()
+
+    def attach(self, job_system):
+        """Queue a construction job per plan in a (new) job system"""
+        self.job_system = job_system
+        for x, y, blueprint_name in self.planned_buildings:
+            job_system.add_job("construction", x, y, blueprint=blueprint_name)
         
     def get_plan_at(self, x, y):
         for px, py, bp in self.planned_buildings:
@@ -361,86 +614,259 @@ class ConstructionPlanningSystem:
         if not self.planning_mode:
             return
             
-        # Simple fallback for now - just draw colored rectangles
+        # Simple fallback for now - just draw colored rectangles, all sharing one marker surface
+        marker = PANELS.get((TILE_SIZE, TILE_SIZE), (100, 100, 255), 128)
         for x, y, blueprint_name in self.planned_buildings:
             screen_x = x * TILE_SIZE - cam_x
             screen_y = y * TILE_SIZE - cam_y
             
             # Only draw if on screen
             if -TILE_SIZE <= screen_x <= screen.get_width() and -TILE_SIZE <= screen_y <= screen.get_height():
-                # Draw semi-transparent colored rectangle
-                s = pygame.Surface((TILE_SIZE, TILE_SIZE))
-                s.fill((100, 100, 255))
-                s.set_alpha(128)
-                screen.blit(s, (screen_x, screen_y))
+                screen.blit(marker, (screen_x, screen_y))
 
 class JobSystem:
-    def __init__(self):
-        self.job_queue = []  # List of jobs to be done
+    """Work for the AI colonists: a priority heap over a spatial index of open jobs.
+
+    A job is a dict with its type, tile, priority and whatever the worker
+    needs to do it (a construction job's blueprint, a hauling job's
+    resources); there is at most one job per (type, x, y). Open jobs sit in
+    per-priority buckets of cell_size x cell_size tiles, and a heap of
+    (-priority, seq) entries says which priority to serve next, so claim()
+    hands a worker the nearest job of the highest priority on offer after a
+    heap pop or two and a search of the buckets around it, however many jobs
+    are queued. Heap entries are dropped lazily once their job is claimed or
+    gone. Jobs a worker gave up on (no path, missing materials) are held
+    back in a second heap until their retry time.
+    """
+
+    def __init__(self, cell_size=8):
         self.priorities = {
             "mining": 3,
             "woodcutting": 3,
             "construction": 2,
             "hauling": 1
         }
-        
-    def add_job(self, job_type, x, y, priority=None):
+        self.cell_size = cell_size
+        self.jobs = {}  # (type, x, y) -> job, open or assigned
+        self.buckets = {}  # priority -> {(cx, cy): {key: job}} of open jobs
+        self.heap = []  # (-priority, seq, key) per open job, plus stale entries
+        self.deferred = []  # (not_before, seq, key) of jobs waiting to be retried
+        self.seq = 0
+        self.version = 0  # Bumped whenever a job is added or removed, for redrawing markers
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def get(self, job_type, x, y):
+        return self.jobs.get((job_type, x, y))
+
+    def add_job(self, job_type, x, y, priority=None, **details):
+        """Queue a job (or return the one already queued for this type and tile)"""
+        key = (job_type, x, y)
+        job = self.jobs.get(key)
+        if job is not None:
+            return job
         if priority is None:
             priority = self.priorities.get(job_type, 1)
-        self.job_queue.append({
-            "type": job_type,
-            "x": x,
-            "y": y,
-            "priority": priority,
-            "assigned": False
-        })
-        # Sort by priority (higher first)
-        self.job_queue.sort(key=lambda j: j["priority"], reverse=True)
-        
-    def get_next_job(self):
-        for job in self.job_queue:
-            if not job["assigned"]:
-                job["assigned"] = True
-                return job
-        return None
-        
+        job = dict(details, type=job_type, x=x, y=y, priority=priority, assigned=False)
+        self.jobs[key] = job
+        self.version += 1
+        self.open(key, job)
+        return job
+
+    def open(self, key, job):
+        self.seq += 1
+        job["seq"] = self.seq
+        job["assigned"] = False
+        cell = (job["x"] // self.cell_size, job["y"] // self.cell_size)
+        self.buckets.setdefault(job["priority"], {}).setdefault(cell, {})[key] = job
+        heapq.heappush(self.heap, (-job["priority"], self.seq, key))
+
+    def close(self, key, job):
+        """Take an open job out of the buckets (its heap entry goes stale)"""
+        buckets = self.buckets[job["priority"]]
+        cell = (job["x"] // self.cell_size, job["y"] // self.cell_size)
+        bucket = buckets[cell]
+        del bucket[key]
+        if not bucket:
+            del buckets[cell]
+
+    def claim(self, x, y, now=0):
+        """Assign the nearest open job of the highest priority to a worker at (x, y), or None"""
+        deferred = self.deferred
+        while deferred and deferred[0][0] <= now:
+            _, seq, key = heapq.heappop(deferred)
+            job = self.jobs.get(key)
+            if job is not None and job["seq"] == seq:
+                self.open(key, job)
+        heap = self.heap
+        while heap:
+            _, seq, key = heap[0]
+            job = self.jobs.get(key)
+            if job is not None and job["seq"] == seq and not job["assigned"]:
+                break
+            heapq.heappop(heap)
+        else:
+            return None
+        job = self.nearest(self.buckets[job["priority"]], x, y)
+        key = (job["type"], job["x"], job["y"])
+        self.close(key, job)
+        job["assigned"] = True
+        return job
+
+    def nearest(self, buckets, x, y):
+        """Closest job (Manhattan distance) in one priority's buckets, searching rings of cells outward"""
+        size = self.cell_size
+        cx, cy = x // size, y // size
+        best = None
+        best_dist = None
+        radius = 0
+        while True:
+            # Once the ring outgrows the index, looking at every occupied cell is cheaper
+            exhaustive = (2 * radius + 1) ** 2 >= 4 * len(buckets)
+            if exhaustive:
+                cells = buckets.values()
+            else:
+                cells = [buckets[cell] for cell in self.ring(cx, cy, radius) if cell in buckets]
+            for bucket in cells:
+                for job in bucket.values():
+                    dist = abs(job["x"] - x) + abs(job["y"] - y)
+                    if best is None or (dist, job["seq"]) < (best_dist, best["seq"]):
+                        best = job
+                        best_dist = dist
+            # Jobs in the next ring are more than radius cells (radius * size tiles) away
+            if exhaustive or (best is not None and best_dist <= radius * size):
+                return best
+            radius += 1
+
+    @staticmethod
+    def ring(cx, cy, radius):
+        """Cells at Chebyshev distance radius from (cx, cy)"""
+        if radius == 0:
+            yield cx, cy
+            return
+        for dx in range(-radius, radius + 1):
+            yield cx + dx, cy - radius
+            yield cx + dx, cy + radius
+        for dy in range(-radius + 1, radius):
+            yield cx - radius, cy + dy
+            yield cx + radius, cy + dy
+
+    def release(self, job, retry_at=None):
+        """Give a claimed job back, to be offered again now or once the simulation reaches retry_at (ms)"""
+        key = (job["type"], job["x"], job["y"])
+        if self.jobs.get(key) is not job or not job["assigned"]:
+            return
+        if retry_at is None:
+            self.open(key, job)
+            return
+        self.seq += 1
+        job["seq"] = self.seq  # Stays assigned (off offer) until claim() reopens it
+        heapq.heappush(self.deferred, (retry_at, self.seq, key))
+
     def complete_job(self, job):
-        if job in self.job_queue:
-            self.job_queue.remove(job)
-            
-    def cancel_job(self, x, y):
-        self.job_queue = [j for j in self.job_queue if j["x"] != x or j["y"] != y]
+        key = (job["type"], job["x"], job["y"])
+        if self.jobs.get(key) is not job:
+            return
+        if not job["assigned"]:
+            self.close(key, job)
+        del self.jobs[key]
+        job["cancelled"] = True  # Whoever holds it drops it
+        self.version += 1
+
+    def cancel_job(self, x, y, job_type=None):
+        """Remove the jobs at a tile (only the given type, if set), claimed or not"""
+        if job_type is not None:
+            job = self.jobs.get((job_type, x, y))
+            if job is not None:
+                self.complete_job(job)
+            return
+        for job in [job for key, job in self.jobs.items() if key[1] == x and key[2] == y]:
+            self.complete_job(job)
+
+    def draw_jobs(self, screen, cam_x, cam_y, TILE_SIZE):
+        """Outline the trees and rocks marked for harvesting and the resources waiting to be hauled"""
+        width, height = screen.get_size()
+        for (job_type, x, y), job in self.jobs.items():
+            screen_x = x * TILE_SIZE - cam_x
+            screen_y = y * TILE_SIZE - cam_y
+            if not (-TILE_SIZE <= screen_x <= width and -TILE_SIZE <= screen_y <= height):
+                continue
+            if job_type == "hauling":
+                color = (150, 100, 40) if job.get("wood") else (150, 150, 150)
+                pygame.draw.rect(screen, color, (screen_x + TILE_SIZE // 4, screen_y + TILE_SIZE // 2, TILE_SIZE // 2, TILE_SIZE // 3))
+            elif job_type in ("woodcutting", "mining"):
+                pygame.draw.rect(screen, (255, 220, 0), (screen_x + 2, screen_y + 2, TILE_SIZE - 4, TILE_SIZE - 4), 2)
 
 class GameStatistics:
-    def __init__(self):
+    """Run totals, updated only when something happens.
+
+    Counters change in response to game events (tree cut, rock mined,
+    zombie killed, building built, day passed) rather than by rescanning the
+    world, and sample() keeps a short history of them for the overlay graph.
+    """
+
+    SAMPLED = ("zombies_killed", "buildings_built", "wood_gathered", "stone_gathered")
+
+    def __init__(self, start_time=0, sample_interval=10000, history=360):
         self.stats = {
             "zombies_killed": 0,
             "trees_cut": 0,
             "rocks_mined": 0,
             "buildings_built": 0,
-            "wood_gathered": 0,
+            "wood_gathered": 0,  # Counted as it reaches the stockpile (Simulation.stock), not when cut
             "stone_gathered": 0,
             "days_survived": 0,
             "damage_taken": 0,
-            "start_time": pygame.time.get_ticks()
+            "start_time": start_time  # Simulated ms, so headless runs report game time
         }
-        
+        self.sample_interval = sample_interval  # Simulated ms between history samples
+        self.next_sample = start_time
+        self.history = deque(maxlen=history)  # (time, zombies alive, *SAMPLED counters)
+
+    def subscribe(self, registry, wave_system):
+        """Follow the world's events instead of recounting it"""
+        registry.subscribe("cut", self.on_tree_cut)
+        registry.subscribe("mine", self.on_rock_mined)
+        registry.subscribe("death", self.on_death)
+        registry.subscribe("build", self.on_building_built)
+        wave_system.day_listeners.append(self.on_day_passed)
+
+    def on_tree_cut(self, tree):
+        self.stats["trees_cut"] += 1
+
+    def on_rock_mined(self, rock):
+        self.stats["rocks_mined"] += 1
+
+    def on_death(self, entity):
+        if isinstance(entity, Zombie):
+            self.stats["zombies_killed"] += 1
+
+    def on_building_built(self, building):
+        self.stats["buildings_built"] += 1
+
+    def on_day_passed(self, day):
+        self.stats["days_survived"] += 1
+
     def increment(self, stat_name, amount=1):
         if stat_name in self.stats:
             self.stats[stat_name] += amount
+
+    def sample(self, current_time, zombies_alive=0):
+        """Record the counters into the history every sample_interval ms (cheap to call every tick)"""
+        if current_time < self.next_sample:
+            return
+        self.next_sample = current_time + self.sample_interval
+        self.history.append((current_time, zombies_alive) + tuple(self.stats[name] for name in self.SAMPLED))
             
-    def get_playtime_minutes(self):
-        return (pygame.time.get_ticks() - self.stats["start_time"]) // 60000
+    def get_playtime_minutes(self, current_time):
+        return (current_time - self.stats["start_time"]) // 60000
         
-    def draw_stats_overlay(self, screen, SCREEN_WIDTH, SCREEN_HEIGHT):
-        font = pygame.font.SysFont(None, 24)
+    def draw_stats_overlay(self, screen, SCREEN_WIDTH, SCREEN_HEIGHT, current_time):
         y_offset = 100
         
-        # Create semi-transparent background
-        overlay = pygame.Surface((250, 200))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(180)
-        screen.blit(overlay, (SCREEN_WIDTH - 260, y_offset))
+        # Semi-transparent background
+        screen.blit(PANELS.get((250, 270), (0, 0, 0), 180), (SCREEN_WIDTH - 260, y_offset))
         
         stats_to_show = [
             ("Days Survived", self.stats["days_survived"]),
@@ -448,9 +874,22 @@ class GameStatistics:
             ("Trees Cut", self.stats["trees_cut"]),
             ("Rocks Mined", self.stats["rocks_mined"]),
             ("Buildings Built", self.stats["buildings_built"]),
-            ("Playtime", f"{self.get_playtime_minutes()}m")
+            ("Playtime", f"{self.get_playtime_minutes(current_time)}m")
         ]
         
         for i, (label, value) in enumerate(stats_to_show):
-            text = font.render(f"{label}: {value}", True, (255, 255, 255))
+            text = TEXT.render(f"{label}: {value}", 24, (255, 255, 255))
             screen.blit(text, (SCREEN_WIDTH - 250, y_offset + 10 + i * 25))
+
+        # History graph: zombies alive (red) and total kills (yellow), each scaled to its own peak
+        graph = pygame.Rect(SCREEN_WIDTH - 250, y_offset + 175, 230, 80)
+        pygame.draw.rect(screen, (80, 80, 80), graph, 1)
+        label = TEXT.render("Zombies alive / killed", 18, (180, 180, 180))
+        screen.blit(label, (graph.x, graph.y - 14))
+        if len(self.history) > 1:
+            for column, color in ((1, (220, 60, 60)), (2, (240, 220, 80))):
+                peak = max(sample[column] for sample in self.history) or 1
+                step = graph.width / (self.history.maxlen - 1)
+                points = [(graph.x + i * step, graph.bottom - 1 - sample[column] * (graph.height - 2) / peak)
+                          for i, sample in enumerate(self.history)]
+                pygame.draw.lines(screen, color, False, points)
@@ -0,0 +1,346 @@
+import numpy as np
+
+from entities import Zombie, RED
+from pathfinding import ZOMBIE_ATTACK_DAMAGE
+
+STEP_TIME = 0.8  # Seconds between zombie steps
+BITE_INTERVAL = 200  # Simulated ms between bites of a zombie standing on a colonist's tile
+BITE_DAMAGE = 3  # HP per bite (15 DPS per zombie)
+
+
+class ZombieView(Zombie):
+    """A Zombie backed by one slot of a ZombieHorde.
+
+    Reads and writes go straight to the horde's arrays, so drawing, combat
+    and save code can keep treating zombies as objects. A view is only valid
+    until the next ZombieHorde.cull(), which renumbers the slots.
+    """
+
+    color = RED
+
+    def __init__(self, horde, slot):
+        self.horde = horde
+        self.slot = slot
+
+    @property
+    def x(self):
+        return int(self.horde.x[self.slot])
+
+    @x.setter
+    def x(self, value):
+        self.horde.x[self.slot] = value
+
+    @property
+    def y(self):
+        return int(self.horde.y[self.slot])
+
+    @y.setter
+    def y(self, value):
+        self.horde.y[self.slot] = value
+
+    @property
+    def hp(self):
+        return int(self.horde.hp[self.slot])
+
+    @hp.setter
+    def hp(self, value):
+        self.horde.hp[self.slot] = value
+
+    @property
+    def facing(self):
+        fx, fy = self.horde.facing[self.slot]
+        return int(fx), int(fy)
+
+    @facing.setter
+    def facing(self, value):
+        self.horde.facing[self.slot] = value
+
+    @property
+    def move_counter(self):
+        return int(self.horde.move_counter[self.slot])
+
+    @move_counter.setter
+    def move_counter(self, value):
+        self.horde.move_counter[self.slot] = value
+
+
+class ZombieHorde:
+    """Every zombie in the world, stored as a struct of NumPy arrays.
+
+    Slots 0..count-1 of x, y, hp, facing (dx, dy) and move_counter hold the
+    living horde; prev_x and prev_y are where each zombie's last step
+    started, so drawing can slide it between tiles (in_rect_smooth).
+    update() moves, turns and attacks for all zombies at once against a
+    boolean blocker grid kept in sync with the WorldGrid over the area it
+    covers (the resident chunks on streamed maps, see cover()), and
+    cull() drops the dead in one compaction. views holds one ZombieView per
+    slot for code that wants individual zombies.
+    """
+
+    def __init__(self, width, height, capacity=64, tick_rate=5):
+        self.width = width
+        self.height = height
+        self.move_interval = max(1, round(STEP_TIME * tick_rate))  # Ticks between steps
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.facing = np.zeros((capacity, 2), dtype=np.int8)
+        self.move_counter = np.zeros(capacity, dtype=np.int32)
+        self.prev_x = np.zeros(capacity, dtype=np.int32)
+        self.prev_y = np.zeros(capacity, dtype=np.int32)
+        self.views = []
+        self.area = (0, 0, 0, 0)  # (x0, y0, x1, y1) tiles the blocker grid covers
+        self.blocked = np.zeros((0, 0), dtype=bool)  # Tiles of area a zombie has to break into
+        self.grid = None
+        self.field_source = None  # FlowField.next_tile list the cached array was built from
+        self.field = None
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.views)
+
+    # --- Blocker grid ---
+    def attach(self, grid, area=None):
+        """Build the blocker grid over area (the whole map by default) from a (new) world and follow its changes"""
+        self.grid = grid
+        self.area = None
+        self.cover(area or (0, 0, self.width, self.height))
+        grid.listeners.append(self.refresh_tile)
+
+    def cover(self, area):
+        """Move the blocker grid to another (x0, y0, x1, y1) rectangle, keeping the overlap"""
+        if area == self.area:
+            return
+        x0, y0, x1, y1 = area
+        blocked = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+        if self.area is not None:
+            ox0, oy0, ox1, oy1 = self.area
+            ix0, iy0, ix1, iy1 = max(x0, ox0), max(y0, oy0), min(x1, ox1), min(y1, oy1)
+            if ix0 < ix1 and iy0 < iy1:
+                blocked[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0] = self.blocked[iy0 - oy0:iy1 - oy0, ix0 - ox0:ix1 - ox0]
+        else:
+            ox0 = oy0 = ox1 = oy1 = 0
+        self.area = area
+        self.blocked = blocked
+        for (x, y) in list(self.grid.cells):
+            if x0 <= x < x1 and y0 <= y < y1 and not (ox0 <= x < ox1 and oy0 <= y < oy1):
+                self.refresh_tile(x, y)
+
+    def refresh_tile(self, x, y):
+        x0, y0, x1, y1 = self.area
+        if x0 <= x < x1 and y0 <= y < y1:
+            self.blocked[y - y0, x - x0] = self.grid.zombie_blocker(x, y) is not None
+
+    # --- Membership ---
+    def grow(self, needed):
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("x", "y", "hp", "facing", "move_counter", "prev_x", "prev_y"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, hp=100, facing=(0, 1), move_counter=0):
+        """Add a zombie and return its view"""
+        Zombie.load_images()
+        self.grow(self.count + 1)
+        slot = self.count
+        self.x[slot] = x
+        self.y[slot] = y
+        self.hp[slot] = hp
+        self.facing[slot] = facing
+        self.move_counter[slot] = move_counter
+        self.prev_x[slot] = x
+        self.prev_y[slot] = y
+        self.count += 1
+        view = ZombieView(self, slot)
+        self.views.append(view)
+        return view
+
+    def replace(self, zombies):
+        """Make the horde exactly the given zombies (plain Zombie objects or views)"""
+        records = [(z.x, z.y, z.hp, tuple(getattr(z, "facing", (0, 1))), getattr(z, "move_counter", 0))
+                   for z in zombies]
+        self.count = 0
+        self.views = []
+        self.grow(len(records))
+        for record in records:
+            self.spawn(*record)
+
+    def first_at(self, x, y):
+        """View of the first living zombie at (x, y), or None"""
+        n = self.count
+        hits = np.flatnonzero((self.x[:n] == x) & (self.y[:n] == y) & (self.hp[:n] > 0))
+        return self.views[hits[0]] if hits.size else None
+
+    def slots_in_rect(self, x0, y0, x1, y1):
+        n = self.count
+        xs = self.x[:n]
+        ys = self.y[:n]
+        return np.flatnonzero((xs >= x0) & (xs < x1) & (ys >= y0) & (ys < y1))
+
+    def in_rect(self, x0, y0, x1, y1):
+        """Views of the zombies with x0 <= x < x1 and y0 <= y < y1"""
+        views = self.views
+        return [views[i] for i in self.slots_in_rect(x0, y0, x1, y1).tolist()]
+
+    def in_rect_smooth(self, x0, y0, x1, y1, alpha=1.0):
+        """(view, dx, dy) for the zombies in the rectangle, with the tile offset to draw each at.
+
+        A step is spread over the move_interval ticks until the next one, so
+        zombies glide from prev to their tile instead of jumping. alpha is
+        how far rendering is from the previous tick to the latest one.
+        """
+        inside = self.slots_in_rect(x0, y0, x1, y1)
+        interval = self.move_interval
+        progress = np.minimum((self.move_counter[inside] % interval + alpha) / interval, 1.0)
+        remaining = 1.0 - progress
+        dxs = ((self.prev_x[inside] - self.x[inside]) * remaining).tolist()
+        dys = ((self.prev_y[inside] - self.y[inside]) * remaining).tolist()
+        views = self.views
+        return [(views[i], dx, dy) for i, dx, dy in zip(inside.tolist(), dxs, dys)]
+
+    def positions_in_rect(self, x0, y0, x1, y1):
+        """(xs, ys) lists of the zombies inside the rectangle, without building views"""
+        inside = self.slots_in_rect(x0, y0, x1, y1)
+        return self.x[inside].tolist(), self.y[inside].tolist()
+
+    def living(self):
+        """(views, xs, ys) of every zombie with HP left"""
+        alive = np.flatnonzero(self.hp[:self.count] > 0)
+        views = self.views
+        return [views[i] for i in alive.tolist()], self.x[alive].tolist(), self.y[alive].tolist()
+
+    def columns(self):
+        """Whole columns for the binary save, copied so they can be encoded on another thread"""
+        n = self.count
+        return {
+            "x": self.x[:n].tolist(),
+            "y": self.y[:n].tolist(),
+            "hp": self.hp[:n].tolist(),
+            "facing_x": self.facing[:n, 0].tolist(),
+            "facing_y": self.facing[:n, 1].tolist(),
+        }
+
+    def count_at(self, x, y):
+        n = self.count
+        return int(np.count_nonzero((self.x[:n] == x) & (self.y[:n] == y)))
+
+    def dead(self):
+        """Views of every zombie with no HP left, before cull() removes them"""
+        views = self.views
+        return [views[i] for i in np.flatnonzero(self.hp[:self.count] <= 0).tolist()]
+
+    def cull(self):
+        """Drop dead zombies, compacting the arrays; returns how many died"""
+        n = self.count
+        alive = self.hp[:n] > 0
+        survivors = int(np.count_nonzero(alive))
+        if survivors == n:
+            return 0
+        for name in ("x", "y", "hp", "facing", "move_counter", "prev_x", "prev_y"):
+            array = getattr(self, name)
+            array[:survivors] = array[:n][alive]
+        views = [view for view, keep in zip(self.views, alive.tolist()) if keep]
+        for slot, view in enumerate(views):
+            view.slot = slot
+        self.views = views
+        self.count = survivors
+        return n - survivors
+
+    # --- Movement ---
+    def field_array(self, flow_field):
+        """The flow field's next-tile table as an array, converted once per rebuild"""
+        if flow_field.next_tile is not self.field_source:
+            self.field_source = flow_field.next_tile
+            self.field = np.asarray(flow_field.next_tile, dtype=np.int64)
+        return self.field
+
+    def update(self, target, grid, flow_field=None, active=None):
+        """One tick for the whole horde: follow the flow field, turn, and attack or move.
+
+        Equivalent to updating each zombie in turn: blockers damaged this
+        tick stay in place until the simulation reaps them, so no zombie's
+        move depends on another's. Returns the blockers that were attacked.
+
+        active is the (x0, y0, x1, y1) tile rectangle of loaded chunks near
+        the target. Zombies stepping to a tile outside it are on the cheap
+        far tier: they chase directly and pass through whatever stands in
+        their way, since those chunks may not even be in memory.
+        """
+        n = self.count
+        if not n:
+            return []
+        counter = self.move_counter[:n]
+        counter += 1
+        movers = np.flatnonzero(counter % self.move_interval == 0)
+        if not movers.size:
+            return []
+        width, height = self.width, self.height
+        x = self.x[movers]
+        y = self.y[movers]
+        fx = self.facing[movers, 0].astype(np.int32)
+        fy = self.facing[movers, 1].astype(np.int32)
+        nx = x.copy()
+        ny = y.copy()
+
+        # Follow the shared flow field when it has a route from this tile
+        greedy = np.ones(movers.size, dtype=bool)
+        if flow_field is not None and flow_field.next_tile is not None:
+            ox, oy = flow_field.origin
+            field_width = flow_field.field_width
+            lx = x - ox
+            ly = y - oy
+            inside = (lx >= 0) & (lx < field_width) & (ly >= 0) & (ly < flow_field.field_height)
+            step = np.full(movers.size, -1, dtype=np.int64)
+            step[inside] = self.field_array(flow_field)[ly[inside] * field_width + lx[inside]]
+            follow = step >= 0
+            nx[follow] = ox + step[follow] % field_width
+            ny[follow] = oy + step[follow] // field_width
+            fx[follow] = nx[follow] - x[follow]
+            fy[follow] = ny[follow] - y[follow]
+            greedy = ~follow
+
+        # Off the field or standing on its target: chase directly along the larger axis
+        if greedy.any():
+            dx = target.x - x[greedy]
+            dy = target.y - y[greedy]
+            horizontal = np.abs(dx) > np.abs(dy)
+            vertical = ~horizontal & (dy != 0)
+            gfx = np.where(horizontal, np.sign(dx), np.where(vertical, 0, fx[greedy]))
+            gfy = np.where(horizontal, 0, np.where(vertical, np.sign(dy), fy[greedy]))
+            fx[greedy] = gfx
+            fy[greedy] = gfy
+            nx[greedy] = x[greedy] + np.where(horizontal, gfx, 0)
+            ny[greedy] = y[greedy] + np.where(horizontal, 0, gfy)
+
+        self.facing[movers, 0] = fx
+        self.facing[movers, 1] = fy
+
+        # Walls, closed doors, turrets, trees and rocks block; spikes and trap pits don't
+        x0, y0, x1, y1 = active or (0, 0, width, height)
+        ax0, ay0, ax1, ay1 = self.area
+        in_bounds = ((nx >= max(x0, ax0)) & (nx < min(x1, ax1)) &
+                     (ny >= max(y0, ay0)) & (ny < min(y1, ay1)))
+        blocked = np.zeros(movers.size, dtype=bool)
+        blocked[in_bounds] = self.blocked[ny[in_bounds] - ay0, nx[in_bounds] - ax0]
+        attacked = []
+        for bx, by in zip(nx[blocked].tolist(), ny[blocked].tolist()):
+            blocker = grid.zombie_blocker(bx, by)
+            if blocker:
+                blocker.damage(ZOMBIE_ATTACK_DAMAGE)
+                attacked.append(blocker)
+
+        free = ~blocked
+        self.prev_x[movers] = x
+        self.prev_y[movers] = y
+        self.x[movers[free]] = nx[free]
+        self.y[movers[free]] = ny[free]
+        return attacked
@@ -1,247 +1,97 @@
+import math
+import time
 import pygame
-import random
-from entities import Colonist, Zombie, Wall, Tree, Rock, Spike, Turret, Bullet, Door, TrapPit, Workbench, Campfire
 from hud import draw_hud
-from game_systems import (MapGenerator, TimeSystem, WaveSystem, ExperienceSystem, 
-                         CombatSystem, MinimapSystem, ConstructionPlanningSystem, 
-                         JobSystem, GameStatistics)
+from game_systems import MinimapSystem
+from simulation import Simulation, SimInput, DIRECTION_KEYS, TICK_RATE, get_all_blueprints
+from rendering import TerrainCache, ScrollBuffer, LightingSystem, DirtyRects, tile_states
+from savegame import BackgroundSaver, BINARY_SAVE_FILE, SAVE_FILE
+from profiler import FrameProfiler
+from timestep import GameSpeed
+from entities import TILE_SIZE, MAP_WIDTH, MAP_HEIGHT, ASSETS, SPRITES
+from assets import TEXT, PANELS
 import os
 import sys
 sys.path.insert(0, os.path.dirname(__file__))
 
-try:
-    from savegame import save_game, load_game
-except ImportError:
-    import importlib.util
-    savegame_path = os.path.join(os.path.dirname(__file__), "savegame.py")
-    spec = importlib.util.spec_from_file_location("savegame", savegame_path)
-    savegame = importlib.util.module_from_spec(spec)
-    sys.modules["savegame"] = savegame
-    spec.loader.exec_module(savegame)
-    save_game = savegame.save_game
-    load_game = savegame.load_game
-
 # Game settings
-TILE_SIZE = 64
-MAP_WIDTH = 200
-MAP_HEIGHT = 150
 SCREEN_WIDTH = TILE_SIZE * 15
 SCREEN_HEIGHT = TILE_SIZE * 10
-FPS = 60
+FPS = 60  # Render frame cap; the game logic runs at its own fixed tick rate
+MAX_FRAME_TIME = 0.25  # Longest frame the logic catches up on; a longer stall slows the game instead of piling up ticks
+TURBO_FPS = 20  # Frame cap while fast-forwarding at GameSpeed.TURBO or more, leaving the CPU to the logic
+TURBO_MINIMAP_INTERVAL = 1.0  # Real seconds between minimap refreshes while fast-forwarding
+SPEED_KEYS = dict(zip((pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4), GameSpeed.SPEEDS))
+CAMERA_FOLLOW = 20  # How fast the camera closes on the colonist (per second; about 0.3 of the way per frame at 60 FPS)
+COLONISTS = 3  # AI colonists joining the player in a new game
+CAMERA_SNAP = TILE_SIZE * 4  # Jump straight there when further behind than this (loads, teleports)
 
 pygame.init()
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Deadhold Prototype")
 clock = pygame.time.Clock()
 
-ASSET_DIR = os.path.join(os.path.dirname(__file__), "assets")
-def load_image(filename):
-    path = os.path.join(ASSET_DIR, filename)
-    try:
-        img = pygame.image.load(path).convert_alpha()
-        img = pygame.transform.smoothscale(img, (TILE_SIZE, TILE_SIZE))
-        return img
-    except Exception:
-        return None
-
-grass_img = load_image("grass.png")
-floor_img = load_image("floor.png")
-
-# --- Modular: Blueprints ---
-def get_all_blueprints():
-    return [
-        {"name": "wood_wall", "display": "Wood Wall", "img": "wall.png", "cost": {"wood": 1}, "required": set()},
-        {"name": "stone_wall", "display": "Stone Wall", "img": "stone_wall.png", "cost": {"stone": 2}, "required": set()},
-        {"name": "spike", "display": "Spike Trap", "img": "spike.png", "cost": {"wood": 2, "stone": 1}, "required": set()},
-        {"name": "turret", "display": "Turret", "img": "turret.png", "cost": {"stone": 5}, "required": set()},
-        {"name": "door", "display": "Door", "img": "door.png", "cost": {"wood": 2}, "required": set()},
-        {"name": "campfire", "display": "Campfire", "img": "campfire.png", "cost": {"wood": 1, "stone": 1}, "required": set()},
-        {"name": "workbench", "display": "Workbench", "img": "workbench.png", "cost": {"wood": 3}, "required": set()},
-        {"name": "trap_pit", "display": "Trap Pit", "img": "trap_pit.png", "cost": {"stone": 3}, "required": set()},
-    ]
+# Decode, scale and pack every image once, before the first frame
+ASSETS.preload(SPRITES + ["grass.png", "floor.png"] + [bp["img"] for bp in get_all_blueprints()])
+grass_img = ASSETS.get("grass.png")
+floor_img = ASSETS.get("floor.png")
 
-def get_unlocked_blueprints(all_blueprints, unlocked_set):
-    return [bp for bp in all_blueprints if bp["name"] in unlocked_set]
-
-# --- Modular: Save/Load State ---
-def get_game_state(colonist, zombies, walls, trees, wood, rocks, stone, xp, level, skill_points, xp_to_next, unlocked_blueprints, selected_blueprint_idx):
-    return {
-        "colonist": colonist,
-        "zombies": zombies,
-        "walls": walls,
-        "trees": trees,
-        "wood": wood,
-        "rocks": rocks,
-        "stone": stone,
-        "xp": xp,
-        "level": level,
-        "skill_points": skill_points,
-        "xp_to_next": xp_to_next,
-        "unlocked_blueprints": list(unlocked_blueprints),
-        "selected_blueprint_idx": selected_blueprint_idx
-    }
-
-def set_game_state(data, all_blueprints):
-    colonist = Colonist(data["colonist"]["x"], data["colonist"]["y"])
-    colonist.hp = data["colonist"]["hp"]
-    colonist.facing = tuple(data["colonist"].get("facing", (0, -1)))
-    zombies = []
-    for z in data["zombies"]:
-        zombie = Zombie(z["x"], z["y"])
-        zombie.hp = z["hp"]
-        zombie.facing = tuple(z.get("facing", (0, 1)))
-        zombies.append(zombie)
-    walls = []
-    for w in data["walls"]:
-        wall_type = w.get("type", "wood")
-        wall = Wall(w["x"], w["y"], wall_type=wall_type)
-        wall.hp = w["hp"]
-        walls.append(wall)
-    trees = []
-    for t in data["trees"]:
-        tree = Tree(t["x"], t["y"])
-        tree.cut_down = t.get("cut_down", False)
-        trees.append(tree)
-    rocks = []
-    for r in data.get("rocks", []):
-        rock = Rock(r["x"], r["y"])
-        rock.mined = r.get("mined", False)
-        rocks.append(rock)
-    spikes = []
-    for s in data.get("spikes", []):
-        spike = Spike(s["x"], s["y"])
-        spike.hp = s.get("hp", 1)
-        spikes.append(spike)
-    turrets = []
-    for t in data.get("turrets", []):
-        turret = Turret(t["x"], t["y"])
-        turret.hp = t.get("hp", 1)
-        turret.cooldown = t.get("cooldown", 0)
-        turrets.append(turret)
-    doors = []
-    for d in data.get("doors", []):
-        door = Door(d["x"], d["y"])
-        door.hp = d.get("hp", 1)
-        door.open = d.get("open", False)
-        doors.append(door)
-    trap_pits = []
-    for tp in data.get("trap_pits", []):
-        trap_pit = TrapPit(tp["x"], tp["y"])
-        trap_pit.hp = tp.get("hp", 1)
-        trap_pits.append(trap_pit)
-    workbenches = []
-    for wb in data.get("workbenches", []):
-        workbench = Workbench(wb["x"], wb["y"])
-        workbench.hp = wb.get("hp", 1)
-        workbenches.append(workbench)
-    campfires = []
-    for cf in data.get("campfires", []):
-        campfire = Campfire(cf["x"], cf["y"])
-        campfire.hp = cf.get("hp", 1)
-        campfire.lit = cf.get("lit", False)
-        campfires.append(campfire)
-    wood = data.get("wood", 5)  # Default to 5 if not present
-    stone = data.get("stone", 0)
-    xp = data.get("xp", 0)
-    level = data.get("level", 1)
-    skill_points = data.get("skill_points", 0)
-    xp_to_next = data.get("xp_to_next", 10)
-    unlocked_blueprints = set(data.get("unlocked_blueprints", ["wood_wall"]))
-    selected_blueprint_idx = data.get("selected_blueprint_idx", 0)
-    return colonist, zombies, walls, trees, wood, rocks, stone, xp, level, skill_points, xp_to_next, unlocked_blueprints, selected_blueprint_idx
-
-def main():
-    # Initialize game objects
-    colonist = Colonist(MAP_WIDTH // 2, MAP_HEIGHT // 2)
-    zombies = [Zombie(random.randint(0, MAP_WIDTH-1), random.randint(0, MAP_HEIGHT-1)) for _ in range(10)]
-    
-    # Initialize game systems
-    time_system = TimeSystem()
-    wave_system = WaveSystem(FPS)
+def main(map_width=MAP_WIDTH, map_height=MAP_HEIGHT, seed=None, dirty_rects=False, tick_rate=TICK_RATE, fps=FPS,
+         colonists=COLONISTS):
+    # The simulation owns all world state; this loop only gathers input and renders it
+    sim = Simulation(map_width, map_height, seed=seed, tick_rate=tick_rate, colonists=colonists)
+    print(f"World seed: {sim.world_seed} (pass --seed {sim.world_seed} to play this map again)")
     minimap = MinimapSystem()  # Use default zoom (hardcoded in MinimapSystem)
-    construction_planner = ConstructionPlanningSystem()
-    job_system = JobSystem()
-    stats = GameStatistics()
-    
-    minimap.initialize(MAP_WIDTH, MAP_HEIGHT)
-    
-    # Generate world
-    walls, doors, floors = MapGenerator.generate_buildings(MAP_WIDTH, MAP_HEIGHT)
-    trees, rocks = MapGenerator.generate_resources(MAP_WIDTH, MAP_HEIGHT, walls, doors, floors)
-    
-    # Initialize other game objects
-    spikes = []
-    turrets = []
-    bullets = []
-    trap_pits = []
-    workbenches = []
-    campfires = []
-    wood = 5
-    stone = 0
+    minimap.initialize(sim.map_width, sim.map_height)
+    terrain = TerrainCache(TILE_SIZE, sim.map_width, sim.map_height, grass_img, floor_img)
+    terrain.attach(sim.grid, sim.floors)
+    buffer = ScrollBuffer(TILE_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT, terrain, sim.registry)
+    lighting = LightingSystem(TILE_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT)
+    minimap.attach(sim.grid, sim.chunks.resident_rect)
+    profiler = FrameProfiler()  # F3 overlay; its hooks are no-ops while hidden
+    sim.profiler = profiler
+    # Optional: redraw and update only what changed, for battery-powered devices
+    dirty = DirtyRects(TILE_SIZE) if dirty_rects else None
     
     # UI state
     show_stats = False
     pause_game = False
     show_controls = False  # New: controls popup
-    auto_save_timer = 0
-    AUTO_SAVE_INTERVAL = FPS * 300  # Auto-save every 5 minutes
-    
-    # XP/Research system
-    xp = 0
-    level = 1
-    skill_points = 0
-    xp_to_next = 10
-    unlocked_blueprints = {"wood_wall"}
-    all_blueprints = get_all_blueprints()
+    auto_save_timer = 0  # Counted in logic ticks
+    saver = BackgroundSaver()  # Saves are written on a worker thread, never stalling a frame
+    AUTO_SAVE_INTERVAL = sim.tick_rate * 300  # Auto-save every 5 minutes
     research_menu = False
-    selected_blueprint_idx = 0
 
-    # Tracking sets for XP
-    last_tree_cut = set()
-    last_rock_mined = set()
-    last_zombie_killed = set()
-    last_build_positions = set()
+    # Fixed-timestep loop: each frame runs as many logic ticks as the time since the last one
+    # covers (times the fast-forward multiplier), and rendering interpolates the rest of a tick
+    game_speed = GameSpeed(sim.tick_time)
+    minimap_age = 0.0  # Real seconds since the minimap was last refreshed
+    actions = []  # Discrete commands waiting for the next logic tick
 
     running = True
 
-    # Camera variables must be initialized before the loop
-    cam_x = colonist.x * TILE_SIZE - SCREEN_WIDTH // 2 + TILE_SIZE // 2
-    cam_y = colonist.y * TILE_SIZE - SCREEN_HEIGHT // 2 + TILE_SIZE // 2
+    # Camera position in pixels; cam_fx/cam_fy keep the fraction between frames while easing
+    cam_fx = cam_fy = None
+    cam_x = cam_y = 0
     
     # Pre-calculate screen tile dimensions
     SCREEN_TILES_X = SCREEN_WIDTH // TILE_SIZE + 2  # +2 for partial tiles
     SCREEN_TILES_Y = SCREEN_HEIGHT // TILE_SIZE + 2
 
-    # --- Precompute visible tile set for quick lookup (performance) ---
-    visible_tile_set = set()
-
     while running:
-        if not pause_game:
-            # Update game systems
-            time_system.update()
-            
-            # Auto-save
-            auto_save_timer += 1
-            if auto_save_timer >= AUTO_SAVE_INTERVAL:
-                auto_save_timer = 0
-                # Auto-save logic here
-                print("Auto-saving...")
-            
-            # Zombie wave spawning
-            new_zombies = wave_system.update(time_system)
-            for _ in range(new_zombies):
-                zx, zy = random.randint(0, MAP_WIDTH-1), random.randint(0, MAP_HEIGHT-1)
-                zombies.append(Zombie(zx, zy))
-
-        hour, minute = time_system.get_time()
-        is_night = time_system.is_night()
-        impassable = [t for t in trees if not t.cut_down] + [r for r in rocks if not r.mined]
+        # Seconds since the previous frame
+        elapsed = min(clock.tick(TURBO_FPS if game_speed.turbo else fps) / 1000, MAX_FRAME_TIME)
+        profiler.begin_frame()
+        redraw_all = False  # Key presses may toggle overlays or menus, so they force a full redraw
 
         # Event handling with QoL improvements
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                redraw_all = True
             elif event.type == pygame.KEYDOWN:
+                redraw_all = True
                 # Quality of Life hotkeys
                 if event.key == pygame.K_p:  # Pause
                     pause_game = not pause_game
@@ -249,10 +99,16 @@ def main():
                     show_stats = not show_stats
                 elif event.key == pygame.K_h:  # Show/hide controls popup
                     show_controls = not show_controls
+                elif event.key == pygame.K_m:  # Zoom the minimap out to the whole map
+                    minimap.toggle_full_map()
+                elif event.key == pygame.K_F3:  # Performance overlay
+                    profiler.toggle()
+                elif event.key in SPEED_KEYS:  # Fast-forward: 1x, 2x, 4x, 16x
+                    game_speed.set_speed(SPEED_KEYS[event.key])
                 elif event.key == pygame.K_b:  # Toggle construction planning
-                    construction_planner.toggle_planning_mode()
-                elif event.key == pygame.K_c and construction_planner.planning_mode:  # Clear all plans
-                    construction_planner.clear_all_plans()
+                    sim.construction_planner.toggle_planning_mode()
+                elif event.key == pygame.K_c and sim.construction_planner.planning_mode:  # Clear all plans
+                    actions.append("clear_plans")
                 # --- Global keys ---
                 elif event.key == pygame.K_ESCAPE:
                     if research_menu:
@@ -262,449 +118,311 @@ def main():
                 elif event.key == pygame.K_r:
                     research_menu = not research_menu
                 elif event.key == pygame.K_F5:
-                    state = get_game_state(
-                        colonist, zombies, walls, trees, wood, rocks, stone,
-                        xp, level, skill_points, xp_to_next, unlocked_blueprints, selected_blueprint_idx
-                    )
-                    # Update to match savegame.py function signature
-                    result = save_game(colonist, zombies, walls, trees, wood, rocks, stone,
-                                     xp, level, skill_points, xp_to_next, unlocked_blueprints, selected_blueprint_idx)
-                    if result:
-                        print("Game saved.")
+                    if event.mod & pygame.KMOD_SHIFT:
+                        # Shift+F5 writes readable JSON instead of the compact binary format
+                        saver.save(sim.world_state(), SAVE_FILE, binary=False)
                     else:
-                        print("Failed to save game.")
+                        saver.save(sim.world_state(), BINARY_SAVE_FILE)
                 elif event.key == pygame.K_F9:
-                    data = load_game()
-                    if data:
-                        colonist, zombies, walls, trees, wood, rocks, stone, xp, level, skill_points, xp_to_next, unlocked_blueprints, selected_blueprint_idx = set_game_state(data, all_blueprints)
-                        # Reload the world data if available
-                        if 'spikes' in data:
-                            spikes = []
-                            for s in data['spikes']:
-                                spike = Spike(s["x"], s["y"])
-                                spike.hp = s.get("hp", 50)
-                                spikes.append(spike)
-                        if 'turrets' in data:
-                            turrets = []
-                            for t in data['turrets']:
-                                turret = Turret(t["x"], t["y"])
-                                turret.hp = t.get("hp", 100)
-                                turret.cooldown = t.get("cooldown", 0)
-                                turrets.append(turret)
-                        if 'doors' in data:
-                            doors = []
-                            for d in data['doors']:
-                                door = Door(d["x"], d["y"])
-                                door.hp = d.get("hp", 100)
-                                door.open = d.get("open", False)
-                                doors.append(door)
-                        if 'floors' in data:
-                            floors = data['floors']
+                    saver.wait()  # Never load a save that is still being written
+                    if sim.load():
+                        terrain.attach(sim.grid, sim.floors)
+                        buffer.attach(terrain, sim.registry)
+                        minimap.attach(sim.grid, sim.chunks.resident_rect)
                         print("Game loaded.")
                     else:
                         print("No save file found.")
                 # --- Research menu navigation ---
                 elif research_menu:
                     if event.key == pygame.K_UP:
-                        selected_blueprint_idx = (selected_blueprint_idx - 1) % len(all_blueprints)
+                        sim.selected_blueprint_idx = (sim.selected_blueprint_idx - 1) % len(sim.all_blueprints)
                     elif event.key == pygame.K_DOWN:
-                        selected_blueprint_idx = (selected_blueprint_idx + 1) % len(all_blueprints)
+                        sim.selected_blueprint_idx = (sim.selected_blueprint_idx + 1) % len(sim.all_blueprints)
                     elif event.key == pygame.K_RETURN:
-                        bp = all_blueprints[selected_blueprint_idx]
-                        if bp["name"] not in unlocked_blueprints and skill_points > 0:
-                            unlocked_blueprints.add(bp["name"])
-                            skill_points -= 1
-                # --- Construction planning mode ---
-                elif construction_planner.planning_mode and event.key == pygame.K_SPACE:
-                    # Add building to plan instead of building immediately
-                    unlocked_list = get_unlocked_blueprints(all_blueprints, unlocked_blueprints)
-                    if unlocked_list:
-                        bp = unlocked_list[selected_blueprint_idx % len(unlocked_list)]
-                        construction_planner.add_planned_building(colonist.x, colonist.y, bp["name"])
+                        sim.unlock_blueprint(sim.selected_blueprint_idx)
                 # --- Game controls ---
                 else:
                     if event.key == pygame.K_TAB:
-                        unlocked_list = get_unlocked_blueprints(all_blueprints, unlocked_blueprints)
-                        selected_blueprint_idx = (selected_blueprint_idx + 1) % len(unlocked_list)
+                        actions.append("cycle_blueprint")
                     elif event.key == pygame.K_SPACE:
-                        unlocked_list = get_unlocked_blueprints(all_blueprints, unlocked_blueprints)
-                        if unlocked_list:
-                            bp = unlocked_list[selected_blueprint_idx % len(unlocked_list)]
-                            can_build = all((wood if res == "wood" else stone) >= amt for res, amt in bp["cost"].items())
-                            build_pos = (colonist.x, colonist.y, bp["name"])
-                            blocked = any(w.x == colonist.x and w.y == colonist.y for w in walls) \
-                                      or any(t.x == colonist.x and t.y == colonist.y for t in trees) \
-                                      or any(s.x == colonist.x and s.y == colonist.y for s in spikes) \
-                                      or any(tu.x == colonist.x and tu.y == colonist.y for tu in turrets) \
-                                      or any(d.x == colonist.x and d.y == colonist.y for d in doors) \
-                                      or any(tp.x == colonist.x and tp.y == colonist.y for tp in trap_pits) \
-                                      or any(wb.x == colonist.x and wb.y == colonist.y for wb in workbenches) \
-                                      or any(cf.x == colonist.x and cf.y == colonist.y for cf in campfires)
-                            if can_build and not blocked:
-                                if bp["name"] == "wood_wall":
-                                    walls.append(Wall(colonist.x, colonist.y, wall_type="wood"))
-                                elif bp["name"] == "stone_wall":
-                                    walls.append(Wall(colonist.x, colonist.y, wall_type="stone"))
-                                elif bp["name"] == "spike":
-                                    spikes.append(Spike(colonist.x, colonist.y))
-                                elif bp["name"] == "turret":
-                                    turrets.append(Turret(colonist.x, colonist.y))
-                                elif bp["name"] == "door":
-                                    doors.append(Door(colonist.x, colonist.y))
-                                elif bp["name"] == "trap_pit":
-                                    trap_pits.append(TrapPit(colonist.x, colonist.y))
-                                elif bp["name"] == "workbench":
-                                    workbenches.append(Workbench(colonist.x, colonist.y))
-                                elif bp["name"] == "campfire":
-                                    campfires.append(Campfire(colonist.x, colonist.y))
-                                # Add more buildables as needed
-                                if "wood" in bp["cost"]:
-                                    wood -= bp["cost"]["wood"]
-                                if "stone" in bp["cost"]:
-                                    stone -= bp["cost"]["stone"]
-                                if build_pos not in last_build_positions:
-                                    xp += 1
-                                    last_build_positions.add(build_pos)
+                        # Builds, or adds to the plan while in construction planning mode
+                        actions.append("build")
                     elif event.key == pygame.K_e:
-                        # Interact with doors, workbenches, or campfires
-                        interacted = False
-                        for door in doors:
-                            if door.x == colonist.x and door.y == colonist.y:
-                                door.toggle()
-                                interacted = True
-                                break
-                        if not interacted:
-                            for workbench in workbenches:
-                                if workbench.x == colonist.x and workbench.y == colonist.y:
-                                    if workbench.start_crafting():
-                                        print("Started crafting at workbench...")
-                                    interacted = True
-                                    break
-                        if not interacted:
-                            for campfire in campfires:
-                                if campfire.x == colonist.x and campfire.y == colonist.y:
-                                    campfire.toggle_light()
-                                    print(f"Campfire {'lit' if campfire.lit else 'extinguished'}")
-                                    break
-
+                        actions.append("use")
                     elif event.key == pygame.K_a:
-                        fx, fy = colonist.facing
-                        target_x = colonist.x + fx
-                        target_y = colonist.y + fy
-                        # Attack or harvest anything 1 tile away (zombie, tree, rock), or open/close door
-                        for zombie in zombies:
-                            if zombie.x == target_x and zombie.y == target_y and zombie.hp > 0:
-                                zombie.hp -= 50
-                                break
-                        # Try to harvest tree or rock even if no zombie was found
-                        harvested = False
-                        for tree in trees:
-                            if tree.x == target_x and tree.y == target_y and not tree.cut_down:
-                                wood += tree.cut()
-                                if (tree.x, tree.y) not in last_tree_cut:
-                                    xp += 1
-                                    last_tree_cut.add((tree.x, tree.y))
-                                harvested = True
-                                break
-                        if not harvested:
-                            for rock in rocks:
-                                if rock.x == target_x and rock.y == target_y and not rock.mined:
-                                    stone += rock.mine()
-                                    if (rock.x, rock.y) not in last_rock_mined:
-                                        xp += 1
-                                        last_rock_mined.add((rock.x, rock.y))
-                                    harvested = True
-                                    break
-                            if not harvested:
-                                # Open/close door if present
-                                for door in doors:
-                                    if door.x == target_x and door.y == target_y:
-                                        door.toggle()
-                                        break
+                        actions.append("action")
+                    elif event.key == pygame.K_x:  # Mark (or unmark) nearby trees and rocks for the colonists
+                        actions.append("designate")
+        profiler.mark("events")
 
         if research_menu:
             # ...existing research menu rendering code...
             screen.fill((30, 30, 60))
-            font = pygame.font.SysFont(None, 36)
-            title = font.render("Research Menu", True, (255, 255, 0))
+            title = TEXT.render("Research Menu", 36, (255, 255, 0))
             screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 30))
-            font2 = pygame.font.SysFont(None, 28)
             y = 80
-            for idx, bp in enumerate(all_blueprints):
-                unlocked = bp["name"] in unlocked_blueprints
-                prereq_met = bp["required"].issubset(unlocked_blueprints)
-                color = (180, 255, 180) if unlocked else ((255, 255, 255) if prereq_met and skill_points > 0 else (120, 120, 120))
-                prefix = "-> " if idx == selected_blueprint_idx else "   "
+            for idx, bp in enumerate(sim.all_blueprints):
+                unlocked = bp["name"] in sim.unlocked_blueprints
+                prereq_met = bp["required"].issubset(sim.unlocked_blueprints)
+                color = (180, 255, 180) if unlocked else ((255, 255, 255) if prereq_met and sim.skill_points > 0 else (120, 120, 120))
+                prefix = "-> " if idx == sim.selected_blueprint_idx else "   "
                 line = f"{prefix}{bp['display']} ({'Unlocked' if unlocked else 'Locked'})"
-                text = font2.render(line, True, color)
+                text = TEXT.render(line, 28, color)
                 screen.blit(text, (80, y))
                 y += 36
-                if idx == selected_blueprint_idx:
+                if idx == sim.selected_blueprint_idx:
                     cost_str = "Cost: " + ", ".join(f"{k}:{v}" for k, v in bp["cost"].items())
-                    prereq_str = "Requires: " + (", ".join(allb['display'] for allb in all_blueprints if allb["name"] in bp["required"]) if bp["required"] else "None")
-                    screen.blit(font2.render(cost_str, True, (200, 200, 0)), (100, y))
+                    prereq_str = "Requires: " + (", ".join(allb['display'] for allb in sim.all_blueprints if allb["name"] in bp["required"]) if bp["required"] else "None")
+                    screen.blit(TEXT.render(cost_str, 28, (200, 200, 0)), (100, y))
                     y += 28
-                    screen.blit(font2.render(prereq_str, True, (200, 200, 0)), (100, y))
+                    screen.blit(TEXT.render(prereq_str, 28, (200, 200, 0)), (100, y))
                     y += 28
-                    img = load_image(bp["img"])
+                    img = ASSETS.get(bp["img"])
                     if img:
                         screen.blit(img, (SCREEN_WIDTH - 120, 100))
-            sp_text = font2.render(f"Skill Points: {skill_points}", True, (255, 255, 0))
+            sp_text = TEXT.render(f"Skill Points: {sim.skill_points}", 28, (255, 255, 0))
             screen.blit(sp_text, (80, 50))
             pygame.display.flip()
-            clock.tick(FPS)
+            actions = []
             continue
 
-        # Movement (walls, closed doors, rocks, and trees block; open doors do not)
-        keys = pygame.key.get_pressed()
-        
-        # Use the new movement system that handles quick taps vs held keys
-        dx, dy = colonist.update_movement(keys)
-        
-        if dx != 0 or dy != 0:
-            # Block by walls, closed doors, uncut trees, and unmined rocks
-            block_walls = [w for w in walls]
-            block_doors = [d for d in doors if not d.open]
-            block_trees = [t for t in trees if not t.cut_down]
-            block_rocks = [r for r in rocks if not r.mined]
-            colonist.move(dx, dy, block_walls + block_doors + block_trees + block_rocks, [])
-
-        # Skip game updates if paused
+        # Skip game updates if paused (the game clock doesn't run, so nothing is owed on resume)
         if pause_game:
-            pause_text = FONT_28.render("PAUSED (P to resume)", True, (255, 255, 0))
+            pause_text = TEXT.render("PAUSED (P to resume)", 28, (255, 255, 0))
             screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2, SCREEN_HEIGHT // 2))
             pygame.display.flip()
-            clock.tick(FPS)
+            actions = []
             continue
 
-        # Optimize camera calculations - only update when colonist moves
-        new_cam_x = colonist.x * TILE_SIZE - SCREEN_WIDTH // 2 + TILE_SIZE // 2
-        new_cam_y = colonist.y * TILE_SIZE - SCREEN_HEIGHT // 2 + TILE_SIZE // 2
-        if new_cam_x != cam_x or new_cam_y != cam_y:
-            cam_x = max(0, min(new_cam_x, MAP_WIDTH * TILE_SIZE - SCREEN_WIDTH))
-            cam_y = max(0, min(new_cam_y, MAP_HEIGHT * TILE_SIZE - SCREEN_HEIGHT))
+        # Advance the world by whole logic ticks; a fast frame may run none, a slow or fast-forwarded one several
+        keys = pygame.key.get_pressed()
+        held = [key for key in DIRECTION_KEYS if keys[key]]
+        ticks = game_speed.advance(elapsed)
+        for run in range(1, ticks + 1):
+            started = time.perf_counter()
+            speed = game_speed.speed
+            sim.step(SimInput(held, actions))
+            slowed = game_speed.charge(time.perf_counter() - started)
+            if slowed:
+                print(f"Logic ticks over budget, slowing down to {game_speed.speed}x")
+                redraw_all = True
+                game_speed.defer(ticks - run, speed)  # The rest are owed at the new speed, from the next frame
+            if actions:  # Key presses act once, on the first tick after them, and may change what's drawn
+                redraw_all = True
+                actions = []
+
+            # Auto-save
+            auto_save_timer += 1
+            if auto_save_timer >= AUTO_SAVE_INTERVAL:
+                auto_save_timer = 0
+                print(f"Auto-saving to {os.path.basename(saver.save(sim.world_state()))}...")
+            if slowed:
+                break
+
+        colonist = sim.colonist
+        hour, minute = sim.time_system.get_time()
+        is_night = sim.time_system.is_night()
+
+        # Moving things glide between tiles, except in dirty-rect mode, which tracks whole tiles
+        smooth = dirty is None
+        alpha = game_speed.alpha  # How far this frame is from the latest tick towards the next
+        turbo = game_speed.turbo  # Fast-forwarding: skip render-only extras to leave the CPU to the logic
+        colonist_dx, colonist_dy = colonist.draw_offset(alpha) if smooth else (0, 0)
+
+        # The camera eases after the colonist's drawn position, so steps scroll instead of jumping
+        target_x = (colonist.x + colonist_dx) * TILE_SIZE - SCREEN_WIDTH // 2 + TILE_SIZE // 2
+        target_y = (colonist.y + colonist_dy) * TILE_SIZE - SCREEN_HEIGHT // 2 + TILE_SIZE // 2
+        target_x = max(0, min(target_x, sim.map_width * TILE_SIZE - SCREEN_WIDTH))
+        target_y = max(0, min(target_y, sim.map_height * TILE_SIZE - SCREEN_HEIGHT))
+        if cam_fx is None or max(abs(target_x - cam_fx), abs(target_y - cam_fy)) > CAMERA_SNAP:
+            cam_fx, cam_fy = target_x, target_y
+        else:
+            follow = 1.0 - math.exp(-CAMERA_FOLLOW * elapsed)  # Same glide whatever the frame rate
+            cam_fx += (target_x - cam_fx) * follow
+            cam_fy += (target_y - cam_fy) * follow
+            if abs(target_x - cam_fx) < 0.5 and abs(target_y - cam_fy) < 0.5:
+                cam_fx, cam_fy = target_x, target_y  # Settle, so a still scene has a still camera
+        cam_x, cam_y = round(cam_fx), round(cam_fy)
 
         # Optimized drawing - only draw visible tiles
         start_tile_x = max(0, cam_x // TILE_SIZE)
         start_tile_y = max(0, cam_y // TILE_SIZE)
-        end_tile_x = min(MAP_WIDTH, start_tile_x + SCREEN_TILES_X)
-        end_tile_y = min(MAP_HEIGHT, start_tile_y + SCREEN_TILES_Y)
-        visible_tile_set.clear()
-        for wx in range(start_tile_x, end_tile_x):
-            for wy in range(start_tile_y, end_tile_y):
-                visible_tile_set.add((wx, wy))
-
-        # Draw background tiles efficiently - MOVE GRASS TO BOTTOM LAYER
-        screen.fill((34, 139, 34))  # Green background as base grass color
-        for wx in range(start_tile_x, end_tile_x):
-            for wy in range(start_tile_y, end_tile_y):
-                screen_x = wx * TILE_SIZE - cam_x
-                screen_y = wy * TILE_SIZE - cam_y
-                
-                # First draw grass everywhere as base layer
-                if grass_img:
-                    screen.blit(grass_img, (screen_x, screen_y))
-                
-                # Then draw floor tiles on top where present
-                if (wx, wy) in floors and floor_img:
-                    screen.blit(floor_img, (screen_x, screen_y))
-
-        # Pre-filter all visible entities first (performance: use visible_tile_set)
-        visible_rocks = [r for r in rocks if (r.x, r.y) in visible_tile_set and not r.mined]
-        visible_spikes = [s for s in spikes if (s.x, s.y) in visible_tile_set]
-        visible_trap_pits = [tp for tp in trap_pits if (tp.x, tp.y) in visible_tile_set]
-        visible_workbenches = [wb for wb in workbenches if (wb.x, wb.y) in visible_tile_set]
-        visible_campfires = [cf for cf in campfires if (cf.x, cf.y) in visible_tile_set]
-        visible_walls = [w for w in walls if (w.x, w.y) in visible_tile_set]
-        visible_turrets = [t for t in turrets if (t.x, t.y) in visible_tile_set]
-        visible_doors = [d for d in doors if (d.x, d.y) in visible_tile_set]
-        visible_zombies = [z for z in zombies if (z.x, z.y) in visible_tile_set]
-        visible_bullets = [b for b in bullets if (b.x, b.y) in visible_tile_set]
-        visible_trees = [t for t in trees if (t.x, t.y) in visible_tile_set and not t.cut_down]
-
-        # LAYER 1: Ground-level items (rocks, spikes, trap pits)
-        for rock in visible_rocks:
-            rock.draw(screen, cam_x, cam_y)
-        for spike in visible_spikes:
-            spike.draw(screen, cam_x, cam_y)
-        for trap_pit in visible_trap_pits:
-            trap_pit.draw(screen, cam_x, cam_y)
-
-        # LAYER 2: Structures and workstations
-        for wall in visible_walls:
-            wall.draw(screen, cam_x, cam_y)
-        for turret in visible_turrets:
-            turret.draw(screen, cam_x, cam_y)
-        for door in visible_doors:
-            door.draw(screen, cam_x, cam_y)
-        for workbench in visible_workbenches:
-            workbench.draw(screen, cam_x, cam_y)
-        for campfire in visible_campfires:
-            campfire.draw(screen, cam_x, cam_y)
-
-        # LAYER 3: Trees behind entities
-        for tree in visible_trees:
-            covered = (tree.x == colonist.x and tree.y - 1 == colonist.y) or \
-                     any(tree.x == z.x and tree.y - 1 == z.y for z in visible_zombies)
-            if not covered:
-                tree.draw(screen, cam_x, cam_y)
-
-        # LAYER 4: Moving entities
-        # Always draw colonist (assuming they're always on screen)
-        colonist.draw(screen, cam_x, cam_y)
-        
-        for zombie in visible_zombies:
-            zombie.draw(screen, cam_x, cam_y)
-        
-        for bullet in visible_bullets:
-            bullet.draw(screen, cam_x, cam_y)
-        
-        # LAYER 5: Trees in front of entities
-        for tree in visible_trees:
-            covered = (tree.x == colonist.x and tree.y - 1 == colonist.y) or \
-                     any(tree.x == z.x and tree.y - 1 == z.y for z in visible_zombies)
-            if covered:
-                tree.draw(screen, cam_x, cam_y)
-
-        # Draw QoL overlays
-        minimap.draw(screen, SCREEN_WIDTH, SCREEN_HEIGHT, position="bottomright")
-        construction_planner.draw_plans(screen, cam_x, cam_y, load_image, TILE_SIZE)
-        
-        if show_stats:
-            stats.draw_stats_overlay(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
-
-        # Build preview in HUD
-        build_img = None
-        if not research_menu:
-            unlocked_list = get_unlocked_blueprints(all_blueprints, unlocked_blueprints)
-            if unlocked_list:
-                bp = unlocked_list[selected_blueprint_idx % len(unlocked_list)]
-                img = load_image(bp["img"])
-                if img:
-                    build_img = img.copy()
-
-        # Enhanced HUD with QoL info
-        draw_hud(screen, colonist, wood, stone, build_img)
-        
-        # --- Only create overlays once (performance) ---
-        # Move static overlay creation outside the loop if possible
-        # --- Use pre-created fonts ---
-        xp_text = FONT_28.render(f"XP: {xp}/{xp_to_next}  Level: {level}  SP: {skill_points}", True, (0, 255, 255))
-        screen.blit(xp_text, (10, 35))
-        day_text = FONT_28.render(f"Day: {wave_system.day_count}", True, (255, 255, 255))
-        screen.blit(day_text, (10, 65))
-
-        # Night overlay
-        if is_night:
-            night_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            night_overlay.fill((0, 0, 40, 120))
-            screen.blit(night_overlay, (0, 0))
-        dn_text = FONT_32.render("Night" if is_night else "Day", True, (200, 200, 255) if is_night else (255, 255, 0))
-        screen.blit(dn_text, (SCREEN_WIDTH - 110, 5))
+        end_tile_x = min(sim.map_width, start_tile_x + SCREEN_TILES_X)
+        end_tile_y = min(sim.map_height, start_tile_y + SCREEN_TILES_Y)
+
+        # Visible structures come from the registry's cached view, rebuilt only when the
+        # camera crosses a tile or something is built, destroyed, cut, mined or toggled
+        visible = sim.registry.visible(start_tile_x, start_tile_y, end_tile_x, end_tile_y)
+        if smooth:  # Zombies a tile off screen may be gliding onto it
+            visible_moving = sim.horde.in_rect_smooth(start_tile_x - 1, start_tile_y - 1, end_tile_x + 1, end_tile_y + 1, alpha)
+        else:
+            visible_moving = [(z, 0, 0) for z in sim.horde.in_rect(start_tile_x, start_tile_y - 1, end_tile_x, end_tile_y)]
+        visible_zombies = [z for z, _, _ in visible_moving]
+        visible_workers = [w for w in sim.workers
+                           if start_tile_x - 1 <= w.x <= end_tile_x and start_tile_y - 1 <= w.y <= end_tile_y]
+        visible_bullets = [b for b in sim.bullets
+                           if start_tile_x <= b.x < end_tile_x and start_tile_y <= b.y < end_tile_y]
+        minimap_age += elapsed
+        if not turbo or minimap_age >= TURBO_MINIMAP_INTERVAL:
+            minimap.update(colonist, sim.horde)
+            minimap.render()
+            minimap_age = 0.0
+
+        # Ground and structures come from the scroll buffer; only tiles that scrolled into
+        # view or whose structures changed are redrawn
+        buffer.update(cam_x, cam_y, tile_states(*visible.values()))
+        profiler.mark("terrain draw")
+        # Darkness with campfire light cut out, rebuilt only when the lights or the camera's tile change
+        lighting.update(cam_x, cam_y, sim.time_system.darkness(), sim.registry.items("campfires"))
+        profiler.mark("lighting")
         clock_str = f"{hour:02d}:{minute:02d}"
-        clock_text = FONT_32.render(clock_str, True, (255, 255, 255))
-        screen.blit(clock_text, (SCREEN_WIDTH // 2 - clock_text.get_width() // 2, 5))
-
-        # Additional QoL HUD elements
-        font = pygame.font.SysFont(None, 20)
+        if game_speed.speed > 1:
+            clock_str += f"  >> {game_speed.speed}x"
+        bp = sim.selected_blueprint()
         qol_hints = [
             "P: Pause  B: Plan Mode  Shift+Tab: Stats",
-            f"Auto-save in: {(AUTO_SAVE_INTERVAL - auto_save_timer) // FPS}s"
+            f"Auto-save in: {(AUTO_SAVE_INTERVAL - auto_save_timer) // sim.tick_rate}s"
         ]
-        for i, hint in enumerate(qol_hints):
-            text = FONT_20.render(hint, True, (200, 200, 200))
-            screen.blit(text, (10, SCREEN_HEIGHT - 70 + i * 20))
-
-        # Controls popup
-        if show_controls:
-            draw_controls_popup(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
-
-        # Combat systems
-        CombatSystem.update_turrets(turrets, zombies, bullets, Bullet)
-        CombatSystem.update_bullets(bullets, zombies, MAP_WIDTH, MAP_HEIGHT)
-        CombatSystem.update_spikes(spikes, zombies)
-        CombatSystem.update_trap_pits(trap_pits, zombies)
-
-        # Update workbenches and campfires
-        for workbench in workbenches:
-            if workbench.update():  # Crafting finished
-                # Give bonus resources when crafting completes
-                wood += 1
-                stone += 1
-                xp += 2
-                print("Crafting complete! +1 wood, +1 stone, +2 XP")
-        
-        for campfire in campfires:
-            campfire.update()
-            if campfire.heal_nearby(colonist):
-                print("Healed by campfire!")
-
-        # Update zombies
-        for zombie in zombies:
-            # Pass walls, doors, turrets, and impassable terrain, but NOT spikes or trap_pits
-            zombie.update(colonist, walls + impassable + turrets + [d for d in doors if not d.open])
-            if zombie.x == colonist.x and zombie.y == colonist.y:
-                colonist.hp -= 1
-                stats.increment("damage_taken", 1)
-
-        # Cleanup and XP with statistics
-        zombies_to_remove = [z for z in zombies if z.hp <= 0]
-        for zombie in zombies_to_remove:
-            if (zombie.x, zombie.y) not in last_zombie_killed:
-                xp += 5
-                stats.increment("zombies_killed")
-                last_zombie_killed.add((zombie.x, zombie.y))
-
-        # Remove dead entities
-        zombies = [z for z in zombies if z.hp > 0]
-        walls = [w for w in walls if w.hp > 0]
-        spikes = [s for s in spikes if s.hp > 0]
-        turrets = [t for t in turrets if t.hp > 0]
-        doors = [d for d in doors if d.hp > 0]
-        trap_pits = [tp for tp in trap_pits if tp.hp > 0]
-        workbenches = [wb for wb in workbenches if wb.hp > 0]
-        campfires = [cf for cf in campfires if cf.hp > 0]
-
-        # Process level-ups from accumulated XP
-        xp, level, skill_points, xp_to_next, leveled = ExperienceSystem.check_level_up(xp, level, skill_points, xp_to_next)
-        if leveled:
-            print(f"Level up! Now level {level}. You have {skill_points} skill points.")
-
-        # Count trees and rocks cut/mined for stats before removing them
-        cut_trees = [t for t in trees if t.cut_down]
-        for t in cut_trees:
-            stats.increment("trees_cut")
-            stats.increment("wood_gathered", 2)
-        mined_rocks = [r for r in rocks if r.mined]
-        for r in mined_rocks:
-            stats.increment("rocks_mined")
-            stats.increment("stone_gathered", 2)
-
-        # Update minimap with all trees/rocks (it handles cut_down/mined internally)
-        minimap.update(MAP_WIDTH, MAP_HEIGHT, colonist, zombies, walls, trees, rocks)
-
-        pygame.display.flip()
-        clock.tick(FPS)
+
+        # Dirty-rect mode: work out which parts of the screen changed since the last frame
+        redraw = None  # Screen rects to redraw, or None for the whole screen
+        if dirty is not None:
+            if redraw_all or profiler.enabled:
+                dirty.invalidate()
+            clock_text = TEXT.render(clock_str, 32, (255, 255, 255))
+            countdown = TEXT.render(qol_hints[1], 20, (200, 200, 200))
+            widgets = {
+                "hud": (pygame.Rect(0, 0, SCREEN_WIDTH, 90),
+                        (colonist.hp, sim.wood, sim.stone, bp and bp["name"], sim.xp, sim.xp_to_next,
+                         sim.level, sim.skill_points, sim.wave_system.day_count, len(sim.workers))),
+                "clock": (pygame.Rect(SCREEN_WIDTH // 2 - clock_text.get_width() // 2, 5, *clock_text.get_size()),
+                          clock_str),
+                "countdown": (pygame.Rect(10, SCREEN_HEIGHT - 50, *countdown.get_size()), qol_hints[1]),
+                "minimap": (minimap.screen_rect(SCREEN_WIDTH, SCREEN_HEIGHT, "bottomright"), minimap.rendered_key),
+            }
+            if show_stats:
+                history = sim.stats.history
+                widgets["stats"] = (pygame.Rect(SCREEN_WIDTH - 260, 100, 250, 270),
+                                    (tuple(sim.stats.stats.values()), sim.stats.get_playtime_minutes(sim.now),
+                                     len(history), history[-1] if history else None))
+            redraw = dirty.update((cam_x, cam_y, is_night, lighting.key, sim.job_system.version), cam_x, cam_y,
+                                  tile_states(*visible.values(), visible_zombies, visible_bullets, [colonist],
+                                              visible_workers),
+                                  widgets)
+            profiler.mark("dirty rects")
+
+        # A full frame draws everything once; in dirty-rect mode each changed rect is
+        # redrawn under a clip, with only the entities on (or just below) its tiles
+        for clip in ([None] if redraw is None else redraw):
+            screen.set_clip(clip)
+            if clip is None:
+                x0, y0, x1, y1 = start_tile_x, start_tile_y, end_tile_x, end_tile_y
+                drawn = visible
+                moving = visible_moving
+                workers = visible_workers
+                bullets = visible_bullets
+            else:
+                x0 = max(0, (clip.left + cam_x) // TILE_SIZE)
+                y0 = max(0, (clip.top + cam_y) // TILE_SIZE)
+                x1 = min(sim.map_width, (clip.right - 1 + cam_x) // TILE_SIZE + 1)
+                y1 = min(sim.map_height, (clip.bottom - 1 + cam_y) // TILE_SIZE + 2)  # Trees reach up a tile
+                drawn = sim.registry.occupants(x0, y0, x1, y1)
+                moving = [(z, 0, 0) for z in sim.horde.in_rect(x0, y0 - 1, x1, y1)]
+                workers = [w for w in visible_workers if x0 <= w.x < x1 and y0 - 1 <= w.y < y1]
+                bullets = [b for b in visible_bullets if x0 <= b.x < x1 and y0 <= b.y < y1]
+
+            # LAYERS 1-3: Ground, structures and trees, from the scroll buffer
+            buffer.draw(screen, cam_x, cam_y)
+
+            # LAYER 4: Moving entities, shifted by how far they still have to glide
+            for worker in workers:  # Under the player's colonist when they share a tile
+                dx, dy = worker.draw_offset(alpha) if smooth else (0, 0)
+                worker.draw(screen, cam_x - round(dx * TILE_SIZE), cam_y - round(dy * TILE_SIZE))
+
+            # Always draw colonist (assuming they're always on screen)
+            colonist.draw(screen, cam_x - round(colonist_dx * TILE_SIZE), cam_y - round(colonist_dy * TILE_SIZE))
+
+            for zombie, dx, dy in moving:
+                zombie.draw(screen, cam_x - round(dx * TILE_SIZE), cam_y - round(dy * TILE_SIZE))
+
+            for bullet in bullets:
+                bullet.draw(screen, cam_x, cam_y)
+
+            # LAYER 5: Trees in front of entities (a zombie just above a tree is drawn behind it)
+            mover_tiles = {(z.x, z.y) for z, _, _ in moving} | {(w.x, w.y) for w in workers}
+            for tree in drawn["trees"]:
+                covered = (tree.x == colonist.x and tree.y - 1 == colonist.y) or \
+                         (tree.x, tree.y - 1) in mover_tiles
+                if covered:  # Only the crown overlaps them; the trunk is already drawn, and blending it twice darkens its edges
+                    crown = pygame.Rect(tree.x * TILE_SIZE - cam_x, (tree.y - 1) * TILE_SIZE - cam_y, TILE_SIZE, TILE_SIZE)
+                    screen.set_clip(crown if clip is None else crown.clip(clip))
+                    tree.draw(screen, cam_x, cam_y)
+                    screen.set_clip(clip)
+            lighting.draw(screen, cam_x, cam_y)
+            profiler.mark("entity draw")
+
+            # Draw QoL overlays
+            minimap.blit(screen, SCREEN_WIDTH, SCREEN_HEIGHT, position="bottomright")
+            profiler.mark("minimap")
+            sim.construction_planner.draw_plans(screen, cam_x, cam_y, ASSETS.get, TILE_SIZE)
+            sim.job_system.draw_jobs(screen, cam_x, cam_y, TILE_SIZE)
+
+            if show_stats:
+                sim.stats.draw_stats_overlay(screen, SCREEN_WIDTH, SCREEN_HEIGHT, sim.now)
+
+            # Build preview in HUD
+            build_img = ASSETS.get(bp["img"]) if bp else None
+
+            # Enhanced HUD with QoL info
+            draw_hud(screen, colonist, sim.wood, sim.stone, build_img)
+
+            # Text comes from the shared cache: a line is only re-rendered when its value changes
+            if not turbo:  # Values that change every few ticks aren't worth rendering at turbo speed
+                xp_text = TEXT.render(f"XP: {sim.xp}/{sim.xp_to_next}  Level: {sim.level}  SP: {sim.skill_points}", 28, (0, 255, 255))
+                screen.blit(xp_text, (10, 35))
+                day_text = TEXT.render(f"Day: {sim.wave_system.day_count}  Colonists: {1 + len(sim.workers)}", 28, (255, 255, 255))
+                screen.blit(day_text, (10, 65))
+
+            dn_text = TEXT.render("Night" if is_night else "Day", 32, (200, 200, 255) if is_night else (255, 255, 0))
+            screen.blit(dn_text, (SCREEN_WIDTH - 110, 5))
+            clock_text = TEXT.render(clock_str, 32, (255, 255, 255))
+            screen.blit(clock_text, (SCREEN_WIDTH // 2 - clock_text.get_width() // 2, 5))
+
+            # Additional QoL HUD elements
+            for i, hint in enumerate(qol_hints if not turbo else ()):
+                text = TEXT.render(hint, 20, (200, 200, 200))
+                screen.blit(text, (10, SCREEN_HEIGHT - 70 + i * 20))
+
+            # Controls popup
+            if show_controls:
+                draw_controls_popup(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
+            profiler.mark("HUD")
+        screen.set_clip(None)
+
+        if profiler.enabled:
+            profiler.draw(screen, clock.get_fps())
+        if redraw is None:
+            pygame.display.flip()
+        elif redraw:
+            pygame.display.update(redraw)
+        profiler.mark("flip")
+        if profiler.enabled:
+            on_screen = (len(visible_zombies) + len(visible_bullets)
+                         + sum(len(entities) for entities in visible.values()))
+            profiler.end_frame(speed=game_speed.speed, ticks=ticks, zombies=len(sim.zombies), workers=len(sim.workers), bullets=len(sim.bullets), walls=len(sim.walls),
+                               trees=len(sim.trees), visible=on_screen)
 
         # Place this check at the very end of the while loop, after pygame.display.flip()
-        if colonist.hp <= 0:
+        if sim.game_over:
             print("Colonist died!")
             # Wait for a moment so the user can see the message
             pygame.time.wait(1500)
             running = False
 
+    saver.wait()  # Let any in-flight save finish before exiting
     pygame.quit()
 
-# --- Font objects (performance: create once, reuse) ---
-FONT_28 = pygame.font.SysFont(None, 28)
-FONT_32 = pygame.font.SysFont(None, 32)
-FONT_36 = pygame.font.SysFont(None, 36)
-FONT_22 = pygame.font.SysFont(None, 22)
-FONT_20 = pygame.font.SysFont(None, 20)
-
 def draw_controls_popup(screen, SCREEN_WIDTH, SCREEN_HEIGHT):
-    font = pygame.font.SysFont(None, 28)
-    font2 = pygame.font.SysFont(None, 22)
     controls = [
         "Controls:",
         "Arrows/WASD: Move",
@@ -712,7 +430,10 @@ def draw_controls_popup(screen, SCREEN_WIDTH, SCREEN_HEIGHT):
         "Space: Build   TAB: Cycle Build   R: Research",
         "E: Use Door   F5: Save   F9: Load   Esc: Quit",
         "P: Pause   B: Plan Mode   C: Clear Plans",
-        "Shift+Tab: Stats   H: Toggle Controls Popup"
+        "X: Mark Nearby Trees/Rocks for Colonists",
+        "Shift+Tab: Stats   H: Toggle Controls Popup",
+        "M: Toggle Full Map   F3: Performance Overlay",
+        "1-4: Game Speed (1x, 2x, 4x, 16x)"
     ]
     popup_width = 420
     popup_height = 40 + 32 * len(controls)
@@ -740,17 +461,26 @@ def draw_controls_popup(screen, SCREEN_WIDTH, SCREEN_HEIGHT):
         if popup_y < 0:
             popup_y = 10
 
-    overlay = pygame.Surface((popup_width, popup_height))
-    overlay.fill((30, 30, 40))
-    overlay.set_alpha(230)
-    screen.blit(overlay, (popup_x, popup_y))
-    title = font.render("Key Commands", True, (255, 255, 0))
+    screen.blit(PANELS.get((popup_width, popup_height), (30, 30, 40), 230), (popup_x, popup_y))
+    title = TEXT.render("Key Commands", 28, (255, 255, 0))
     screen.blit(title, (popup_x + 20, popup_y + 10))
     for i, line in enumerate(controls):
-        text = font2.render(line, True, (200, 200, 200))
+        text = TEXT.render(line, 22, (200, 200, 200))
         screen.blit(text, (popup_x + 20, popup_y + 50 + i * 32))
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Play Deadhold")
+    parser.add_argument("--width", type=int, default=MAP_WIDTH, help="map width in tiles (large maps stream in chunks)")
+    parser.add_argument("--height", type=int, default=MAP_HEIGHT, help="map height in tiles")
+    parser.add_argument("--seed", type=int, default=None, help="world seed, for reproducing a map")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw only the parts of the screen that changed (saves CPU while little moves)")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE,
+                        help="game logic ticks per second (the game runs at the same speed either way)")
+    parser.add_argument("--fps", type=int, default=FPS, help="frame rate cap (0 for none)")
+    parser.add_argument("--colonists", type=int, default=COLONISTS, help="AI colonists working alongside you")
+    args = parser.parse_args()
+    main(args.width, args.height, args.seed, args.dirty_rects, args.tick_rate, args.fps, args.colonists)
 
 
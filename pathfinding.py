@@ -0,0 +1,510 @@
+import heapq
+import math
+from collections import OrderedDict
+
+from entities import Wall, Tree, Rock, Turret, Door
+
+ZOMBIE_ATTACK_DAMAGE = 25  # Damage a blocked zombie deals per move (see ZombieHorde.update)
+UNREACHABLE = float("inf")
+DOOR_COST = 3  # Steps a colonist spends on a closed door: open it, step through, shut it (see Worker.DOOR_TIME)
+CLUSTER_SIZE = 16  # Tiles per side of a path search cluster (a chunk is 2x2 clusters)
+SEARCH_RADIUS = 16  # Clusters around its target that a path may cross
+FIELD_RADIUS = 80  # Tiles around the colonist the zombie flow field covers
+
+
+class FlowField:
+    """Colonist-centred Dijkstra map shared by the whole zombie horde.
+
+    One search from the colonist's tile stores, for every tile on the map,
+    the neighbouring tile that is one step closer. Zombies then read their
+    next step in O(1) instead of each running its own chase logic. Entering
+    a tile costs 1, plus the number of hits needed to break whatever blocks
+    it, so zombies route through open doors when they can and only tear
+    through walls when that is genuinely the cheapest way in.
+
+    The field only covers FIELD_RADIUS tiles around the target, clipped to
+    the active chunks on streamed maps; origin and field_width/field_height
+    place it on the map, and zombies outside it fall back to chasing
+    directly. A rebuild is spread over the ticks until the next one may
+    start (rebuild_interval): zombies keep following the previous field
+    until the new search has covered the whole region.
+    """
+
+    def __init__(self, width, height, rebuild_interval=4):
+        self.width = width
+        self.height = height
+        self.rebuild_interval = rebuild_interval  # Ticks between rebuilds (at most once per zombie step)
+        self.dist = None
+        self.next_tile = None  # Flat index (within the region) of the next tile toward the target, -1 if none
+        self.region = (0, 0, width, height)  # x0, y0, x1, y1 of the tiles the field covers
+        self.origin = (0, 0)
+        self.field_width = width
+        self.field_height = height
+        self.target = None
+        self.grid_version = -1
+        self.frames_since_rebuild = 0
+        self.search = None  # State of the rebuild in progress, see start()
+
+    @staticmethod
+    def tile_cost(occupants):
+        """Cost for a zombie to enter a tile, or UNREACHABLE for trees and rocks"""
+        cost = 1
+        for occupant in occupants:
+            if isinstance(occupant, (Tree, Rock)):
+                return UNREACHABLE
+            if isinstance(occupant, (Wall, Turret)) or (isinstance(occupant, Door) and not occupant.open):
+                cost += max(1, math.ceil(occupant.hp / ZOMBIE_ATTACK_DAMAGE))
+        return cost
+
+    def is_stale(self, target_x, target_y, grid, region=None):
+        return (self.dist is None or self.target != (target_x, target_y) or self.grid_version != grid.version
+                or (region is not None and region != self.region))
+
+    def update(self, target, grid, region=None):
+        """Rebuild the field if the target moved or a blocker changed, at most once per interval.
+
+        A rebuild in progress gets its share of the search each tick; the
+        very first one runs to completion, so there is always a field.
+        """
+        self.frames_since_rebuild += 1
+        if self.search is not None:
+            self.advance(self.search[0])
+            return
+        if not self.is_stale(target.x, target.y, grid, self.clip(target.x, target.y, region)):
+            return
+        if self.dist is not None and self.frames_since_rebuild < self.rebuild_interval:
+            return
+        self.start(target.x, target.y, grid, region)
+        self.advance(self.search[0] if self.dist is not None else None)
+
+    def clip(self, target_x, target_y, region=None):
+        """Tiles the field covers around a target: FIELD_RADIUS, inside region (the map by default)"""
+        x0, y0, x1, y1 = region or (0, 0, self.width, self.height)
+        return (max(x0, target_x - FIELD_RADIUS), max(y0, target_y - FIELD_RADIUS),
+                min(x1, target_x + FIELD_RADIUS + 1), min(y1, target_y + FIELD_RADIUS + 1))
+
+    def rebuild(self, target_x, target_y, grid, region=None):
+        """Rebuild the whole field now"""
+        self.start(target_x, target_y, grid, region)
+        self.advance()
+
+    def start(self, target_x, target_y, grid, region=None):
+        """Begin a rebuild; advance() carries out the search"""
+        x0, y0, x1, y1 = self.clip(target_x, target_y, region)
+        width = x1 - x0
+        size = width * (y1 - y0)
+        cost = [1] * size
+        for (x, y), occupants in grid.cells.items():
+            if x0 <= x < x1 and y0 <= y < y1:
+                cost[(y - y0) * width + x - x0] = self.tile_cost(occupants)
+
+        dist = [UNREACHABLE] * size
+        next_tile = [-1] * size
+        start = (target_y - y0) * width + target_x - x0
+        dist[start] = 0
+        budget = size // max(1, self.rebuild_interval - 1) + 1  # Tiles settled per tick, to finish before the next rebuild is due
+        self.search = (budget, (x0, y0, x1, y1), (target_x, target_y), grid.version, cost, dist, next_tile, [(0, start)])
+        self.frames_since_rebuild = 0
+
+    def advance(self, budget=None):
+        """Settle up to budget more tiles of the rebuild in progress (all of them if None), then swap it in"""
+        _, region, target, version, cost, dist, next_tile, heap = self.search
+        x0, y0, x1, y1 = region
+        width = x1 - x0
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        last_row = len(cost) - width
+        settled = 0
+        while heap:
+            if budget is not None and settled >= budget:
+                return
+            d, i = heappop(heap)
+            if d > dist[i]:
+                continue
+            settled += 1
+            # A zombie on a neighbour moving here has to enter (and maybe break into) tile i
+            nd = d + cost[i]
+            x = i % width
+            for j in (i - width if i >= width else -1,
+                      i + width if i < last_row else -1,
+                      i - 1 if x > 0 else -1,
+                      i + 1 if x < width - 1 else -1):
+                if j < 0 or cost[j] == UNREACHABLE:
+                    continue
+                if nd < dist[j]:
+                    dist[j] = nd
+                    next_tile[j] = i
+                    heappush(heap, (nd, j))
+
+        self.search = None
+        self.dist = dist
+        self.next_tile = next_tile
+        self.region = region
+        self.origin = (x0, y0)
+        self.field_width = width
+        self.field_height = y1 - y0
+        self.target = target
+        self.grid_version = version
+
+    def next_step(self, x, y):
+        """Tile a zombie at (x, y) should move to next, or None off the field"""
+        ox, oy = self.origin
+        width = self.field_width
+        if self.next_tile is None or not (0 <= x - ox < width and 0 <= y - oy < self.field_height):
+            return None
+        j = self.next_tile[(y - oy) * width + x - ox]
+        if j < 0:
+            return None
+        return ox + j % width, oy + j // width
+
+
+
+class PathService:
+    """Hierarchical (HPA*) paths for the colonists, cached and answered in batches.
+
+    The map is cut into cluster_size squares. Where walkable tiles face each
+    other across a cluster border, an entrance links the two clusters, and a
+    Dijkstra search inside each cluster gives the cost of walking between
+    its entrances. Those entrances and costs make a small abstract graph,
+    built a cluster at a time as searches reach it. A search runs over the
+    abstract graph and only turns its hops into tiles at the end, each hop a
+    short search confined to one cluster.
+
+    Closed doors cost DOOR_COST to walk through instead of blocking, and the
+    abstract graph counts every door as closed, so opening or shutting one
+    never changes it; only the tile-level hops look at a door's current
+    state. A cluster is rebuilt only when a tile it read changes what it
+    costs to enter (a wall built or destroyed, a tree cut). Finished paths
+    are cached until a cluster they cross is rebuilt.
+
+    find_paths() answers a batch of requests; requests for the same target
+    share one backward search over the abstract graph.
+    """
+
+    def __init__(self, grid, cluster_size=CLUSTER_SIZE, cache_size=256):
+        self.grid = grid
+        self.size = cluster_size
+        self.clusters = {}  # (cx, cy) -> Cluster, built on first use
+        self.generations = {}  # (cx, cy) -> times the cluster was rebuilt, to check cached paths against
+        self.cache = OrderedDict()  # (start, target, adjacent) -> (path, ((cluster, generation), ...)), oldest first
+        self.cache_size = cache_size
+        self.builds = 0
+        self.hits = 0
+        grid.listeners.append(self.tile_changed)
+
+    def tile_cost(self, x, y, doors_closed=False):
+        """Steps it takes to enter (x, y), or None where walls, trees, rocks or the map edge stop a colonist"""
+        if not self.grid.in_bounds(x, y):
+            return None
+        cost = 1
+        for occupant in self.grid.cells.get((x, y), ()):
+            if isinstance(occupant, (Wall, Tree, Rock)):
+                return None
+            if isinstance(occupant, Door) and (doors_closed or not occupant.open):
+                cost = DOOR_COST
+        return cost
+
+    def blocked(self, x, y):
+        return self.tile_cost(x, y) is None
+
+    def cluster_of(self, x, y):
+        return x // self.size, y // self.size
+
+    def cluster(self, key):
+        cluster = self.clusters.get(key)
+        if cluster is None:
+            self.builds += 1
+            cluster = self.clusters[key] = Cluster(self, key)
+        return cluster
+
+    def tile_changed(self, x, y):
+        """Grid listener: drop the clusters that read (x, y) if what it costs to enter has changed"""
+        cost = None
+        for key in {self.cluster_of(x, y), self.cluster_of(x - 1, y), self.cluster_of(x + 1, y),
+                    self.cluster_of(x, y - 1), self.cluster_of(x, y + 1)}:
+            cluster = self.clusters.get(key)
+            if cluster is None:
+                continue
+            if cost is None:
+                cost = self.tile_cost(x, y, True) or 0
+            if cluster.read(x, y) not in (None, cost):
+                del self.clusters[key]
+                self.generations[key] = self.generations.get(key, 0) + 1
+
+    def segment(self, start, goals, bounds):
+        """Cheapest tiles from start to any of goals without leaving bounds (A*, doors at their current cost)"""
+        if start in goals:
+            return []
+        x0, y0, x1, y1 = bounds
+        targets = [goal for goal in goals if x0 <= goal[0] < x1 and y0 <= goal[1] < y1]
+        if not targets:
+            return None
+
+        def estimate(x, y):
+            return min(abs(x - gx) + abs(y - gy) for gx, gy in targets)
+        came_from = {start: None}
+        cost_so_far = {start: 0}
+        heap = [(estimate(*start), 0, start)]  # (estimate, -cost so far, tile): deepest first on ties
+        while heap:
+            _, g, tile = heapq.heappop(heap)
+            g = -g
+            if g > cost_so_far[tile]:
+                continue
+            if tile in goals:
+                path = []
+                while tile != start:
+                    path.append(tile)
+                    tile = came_from[tile]
+                path.reverse()
+                return path
+            x, y = tile
+            for n in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                nx, ny = n
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                step = self.tile_cost(nx, ny)
+                if step is None or g + step >= cost_so_far.get(n, UNREACHABLE):
+                    continue
+                cost_so_far[n] = g + step
+                came_from[n] = tile
+                heapq.heappush(heap, (g + step + estimate(nx, ny), -(g + step), n))
+        return None
+
+    def hop(self, a, b):
+        """Tiles from entrance a to entrance b of the same cluster, refined once and kept until it is rebuilt"""
+        cluster = self.cluster(self.cluster_of(*a))
+        if (a, b) not in cluster.segments:
+            cluster.segments[(a, b)] = self.segment(a, {b}, cluster.bounds)
+        return cluster.segments[(a, b)]
+
+    def find_path(self, start, target, adjacent=False):
+        return self.find_paths([(start, target, adjacent)])[0]
+
+    def find_paths(self, requests):
+        """Paths for a batch of (start, target, adjacent) requests, in order.
+
+        Each path is the tiles to step through to reach target (or a tile
+        next to it, if adjacent), excluding start: [] if already there,
+        None if it can't be reached within SEARCH_RADIUS clusters.
+        """
+        results = [None] * len(requests)
+        groups = {}
+        generations = self.generations
+        for i, request in enumerate(requests):
+            cached = self.cache.get(request)
+            if cached is not None and all(generations.get(key, 0) == generation for key, generation in cached[1]):
+                self.cache.move_to_end(request)
+                self.hits += 1
+                results[i] = list(cached[0])
+            else:
+                groups.setdefault(request[1:], []).append(i)
+        for (target, adjacent), indexes in groups.items():
+            paths = self.search({requests[i][0] for i in indexes}, target, adjacent)
+            for i in indexes:
+                start = requests[i][0]
+                path = paths.get(start)
+                if path is not None:
+                    self.remember(requests[i], path)
+                    results[i] = list(path)
+        return results
+
+    def remember(self, request, path):
+        keys = {self.cluster_of(*request[0])} | {self.cluster_of(x, y) for x, y in path}
+        self.cache[request] = (path, tuple((key, self.generations.get(key, 0)) for key in keys))
+        self.cache.move_to_end(request)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def search(self, starts, target, adjacent):
+        """Paths from each of starts to one target: {start: tiles}, leaving out starts that can't get there"""
+        tx, ty = target
+        if adjacent:
+            goals = {(tx + dx, ty + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                     if self.tile_cost(tx + dx, ty + dy) is not None}
+        else:
+            goals = {target} if self.tile_cost(tx, ty) is not None else set()
+        paths = {start: [] for start in starts if start in goals}
+        if not goals:
+            return paths
+        tcx, tcy = self.cluster_of(tx, ty)
+        radius = SEARCH_RADIUS
+
+        # Seed the backward search with the cost from each entrance of the goals' clusters to the nearest goal
+        dist = {}  # Entrance -> cost of the cheapest walk from it to a goal
+        following = {}  # Entrance -> next entrance on that walk, None for the last
+        heap = []
+        for key in {self.cluster_of(*goal) for goal in goals}:
+            cluster = self.cluster(key)
+            for entrance, d in cluster.distances(dict.fromkeys(goals, 0), cluster.incoming, backward=True).items():
+                if d < dist.get(entrance, UNREACHABLE):
+                    dist[entrance] = d
+                    following[entrance] = None
+                    heap.append((d, entrance))
+
+        # Each start reaches the entrances of its own cluster, or the goals directly if they share it
+        best = {}  # start -> [cost, first entrance or None to walk straight to a goal]
+        exits = {}  # entrance -> [(start, cost from start to it)]
+        closest = {}  # start -> cost to its nearest entrance
+        for start in starts:
+            key = self.cluster_of(*start)
+            if start in paths or max(abs(key[0] - tcx), abs(key[1] - tcy)) > radius:
+                continue
+            cluster = self.cluster(key)
+            reach = cluster.distances({start: 0}, cluster.incoming.keys() | goals)
+            best[start] = [min((reach[goal] for goal in goals if goal in reach), default=UNREACHABLE), None]
+            closest[start] = UNREACHABLE
+            for entrance in cluster.incoming:
+                if entrance in reach:
+                    exits.setdefault(entrance, []).append((start, reach[entrance]))
+                    closest[start] = min(closest[start], reach[entrance])
+
+        # Backward A* over the abstract graph, guided by the distance to the nearest start. Every step
+        # costs at least 1, so a walk from a start through an entrance costs at least that entrance's
+        # estimate (d + distance); once the best estimate left reaches every start's best, none can improve.
+        sources = [start for start in best if closest[start] < UNREACHABLE]
+
+        def estimate(x, y):
+            return min(abs(x - sx) + abs(y - sy) for sx, sy in sources)
+
+        def limit():
+            return max((best[start][0] for start in sources), default=-1)
+        heap = [(d + estimate(*node), d, node) for d, node in heap] if sources else []
+        heapq.heapify(heap)
+        stop = limit()
+        size = self.size
+        while heap and heap[0][0] < stop:
+            _, d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            if node in exits:
+                for start, cost in exits[node]:
+                    if cost + d < best[start][0]:
+                        best[start] = [cost + d, node]
+                stop = limit()
+            for before, cost in self.cluster((node[0] // size, node[1] // size)).incoming[node].items():
+                nd = d + cost
+                if nd < dist.get(before, UNREACHABLE) and \
+                        max(abs(before[0] // size - tcx), abs(before[1] // size - tcy)) <= radius:
+                    dist[before] = nd
+                    following[before] = node
+                    heapq.heappush(heap, (nd + estimate(*before), nd, before))
+
+        # Refine: a hop inside a cluster is a short search there; crossing a border is one step
+        for start, (cost, node) in best.items():
+            if cost == UNREACHABLE:
+                continue
+            bounds = self.cluster(self.cluster_of(*start)).bounds
+            if node is None:
+                paths[start] = self.segment(start, goals, bounds)
+                continue
+            path = self.segment(start, {node}, bounds)
+            while path is not None and following[node] is not None:
+                after = following[node]
+                if self.cluster_of(*after) == self.cluster_of(*node):
+                    hop = self.hop(node, after)
+                    path = path + hop if hop is not None else None
+                else:
+                    path.append(after)
+                node = after
+            if path is not None:
+                last = self.segment(node, goals, self.cluster(self.cluster_of(*node)).bounds)
+                path = path + last if last is not None else None
+            if path is not None:
+                paths[start] = path
+        return paths
+
+
+class Cluster:
+    """One square of the PathService's abstract graph: its entrances, and what it costs to walk between them"""
+
+    def __init__(self, service, key):
+        size = service.size
+        grid = service.grid
+        x0, y0 = key[0] * size, key[1] * size
+        x1, y1 = min(x0 + size, grid.width), min(y0 + size, grid.height)
+        self.bounds = (x0, y0, x1, y1)
+        self.width = x1 - x0
+        # Static cost (every door closed) of each tile, 0 where blocked, and of the tiles just outside it
+        self.cells = [service.tile_cost(x, y, True) or 0 for y in range(y0, y1) for x in range(x0, x1)]
+        self.ring = {}
+        self.segments = {}  # (entrance, entrance) -> tiles between them, see PathService.hop
+
+        def cost(x, y):
+            if x0 <= x < x1 and y0 <= y < y1:
+                return self.cells[(y - y0) * self.width + x - x0]
+            if (x, y) not in self.ring:
+                self.ring[(x, y)] = service.tile_cost(x, y, True) or 0
+            return self.ring[(x, y)]
+
+        # Entrances: one per run of tiles walkable on both sides of a border, one at each end of a long run.
+        # The neighbour scans the same run in the same order, so both sides pick the same tile pairs.
+        self.incoming = {}  # Entrance -> {tile a colonist can come from: cost of that walk}
+        borders = ([((x, y0), (x, y0 - 1)) for x in range(x0, x1)], [((x, y1 - 1), (x, y1)) for x in range(x0, x1)],
+                   [((x0, y), (x0 - 1, y)) for y in range(y0, y1)], [((x1 - 1, y), (x1, y)) for y in range(y0, y1)])
+        for border in borders:
+            run = []
+            for inside, outside in border + [(None, None)]:
+                if inside is not None and cost(*inside) and cost(*outside):
+                    run.append((inside, outside))
+                    continue
+                if not run:
+                    continue
+                for inside_tile, outside_tile in (run[len(run) // 2],) if len(run) < 6 else (run[0], run[-1]):
+                    self.incoming.setdefault(inside_tile, {})[outside_tile] = cost(*inside_tile)
+                run = []
+
+        # Costs between entrances, from a backward search to each
+        for entrance, predecessors in self.incoming.items():
+            for other, d in self.distances({entrance: 0}, self.incoming, backward=True).items():
+                if other != entrance:
+                    predecessors[other] = d
+
+    def read(self, x, y):
+        """Static cost this cluster recorded for (x, y) (0 if blocked), or None if it never read it"""
+        x0, y0, x1, y1 = self.bounds
+        if x0 <= x < x1 and y0 <= y < y1:
+            return self.cells[(y - y0) * self.width + x - x0]
+        return self.ring.get((x, y))
+
+    def distances(self, sources, targets, backward=False):
+        """Dijkstra inside the cluster from sources ({tile: cost so far}) to whichever targets it reaches.
+
+        Returns {target: cost}; with backward, the cost of walking from each
+        target to the nearest source. Sources outside the cluster are ignored.
+        """
+        x0, y0, x1, y1 = self.bounds
+        width = self.width
+        cells = self.cells
+        size = len(cells)
+        dist = [UNREACHABLE] * size
+        heap = []
+        for (x, y), d in sources.items():
+            if x0 <= x < x1 and y0 <= y < y1:
+                i = (y - y0) * width + x - x0
+                dist[i] = d
+                heap.append((d, i))
+        heapq.heapify(heap)
+        wanted = {(y - y0) * width + x - x0: (x, y) for x, y in targets if x0 <= x < x1 and y0 <= y < y1}
+        found = {}
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        last_row = size - width
+        while heap and len(found) < len(wanted):
+            d, i = heappop(heap)
+            if d > dist[i]:
+                continue
+            if i in wanted:
+                found[wanted[i]] = d
+            here = cells[i] if backward else 0
+            x = i % width
+            for j in (i - width if i >= width else -1,
+                      i + width if i < last_row else -1,
+                      i - 1 if x > 0 else -1,
+                      i + 1 if x < width - 1 else -1):
+                if j < 0 or not cells[j]:
+                    continue
+                nd = d + (here or cells[j])
+                if nd < dist[j]:
+                    dist[j] = nd
+                    heappush(heap, (nd, j))
+        return found
@@ -0,0 +1,106 @@
+import time
+from collections import deque
+
+import pygame
+
+from assets import TEXT
+
+
+class FrameProfiler:
+    """Split timer for the game loop, shown as a toggleable overlay (F3).
+
+    Call begin_frame() at the top of each iteration and mark(section) after
+    each piece of work; the time since the previous mark is charged to that
+    section. Charges are totalled per frame and recorded by end_frame(), so
+    a section marked several times in a frame shows what it cost the whole
+    frame, and one a frame never reached shows 0 for it.
+    While disabled every hook returns straight away, so leaving the calls
+    in the loop costs next to nothing.
+    """
+
+    def __init__(self, window=120, refresh_interval=15):
+        self.enabled = False
+        self.window = window  # Frames kept for rolling averages and p99
+        self.refresh_interval = refresh_interval  # Frames between overlay text re-renders
+        self.samples = {}  # section -> deque of milliseconds per frame, in first-seen order
+        self.current = {}  # section -> milliseconds charged so far this frame
+        self.frame_times = deque(maxlen=window)
+        self.counts = {}
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.frames = 0
+        self.surface = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.samples.clear()
+        self.current.clear()
+        self.frame_times.clear()
+        self.surface = None
+        # Usually toggled mid-frame (from the event loop), so start timing from here
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.current.clear()  # Drop charges from a frame that never reached end_frame (paused, menus)
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def mark(self, section):
+        """Charge the time since the previous mark to section"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        current = self.current
+        current[section] = current.get(section, 0.0) + (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self, **counts):
+        """Close the frame (before waiting on the clock) and record entity counts"""
+        if not self.enabled:
+            return
+        self.frame_times.append((time.perf_counter() - self.frame_start) * 1000)
+        current = self.current
+        for section in current:
+            if section not in self.samples:
+                self.samples[section] = deque(maxlen=self.window)
+        for section, samples in self.samples.items():
+            samples.append(current.get(section, 0.0))
+        current.clear()
+        self.counts = counts
+        self.frames += 1
+
+    @staticmethod
+    def summary(samples):
+        """(rolling average, p99) of a window of millisecond samples"""
+        if not samples:
+            return 0.0, 0.0
+        ordered = sorted(samples)
+        return sum(ordered) / len(ordered), ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+    def render(self, fps):
+        avg, p99 = self.summary(self.frame_times)
+        lines = [f"Frame {avg:6.2f} ms  p99 {p99:6.2f} ms  FPS {fps:5.1f}",
+                 f"{'section':<14}{'avg ms':>8}{'p99 ms':>8}"]
+        for section, samples in self.samples.items():
+            avg, p99 = self.summary(samples)
+            lines.append(f"{section:<14}{avg:8.2f}{p99:8.2f}")
+        if self.counts:
+            lines.append("  ".join(f"{name} {count}" for name, count in self.counts.items()))
+        line_height = TEXT.font(14, "monospace").get_linesize()
+        rendered = [TEXT.render(line, 14, (230, 230, 230), "monospace") for line in lines]
+        width = max(text.get_width() for text in rendered) + 12
+        surface = pygame.Surface((width, line_height * len(lines) + 8))
+        surface.fill((10, 10, 20))
+        surface.set_alpha(210)
+        for i, text in enumerate(rendered):
+            surface.blit(text, (6, 4 + i * line_height))
+        return surface
+
+    def draw(self, screen, fps, position=(10, 100)):
+        """Blit the overlay, re-rendering its text every refresh_interval frames"""
+        if not self.enabled:
+            return
+        if self.surface is None or self.frames % self.refresh_interval == 0:
+            self.surface = self.render(fps)
+        screen.blit(self.surface, position)
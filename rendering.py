@@ -0,0 +1,329 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from entities import Rock, Tree
+
+GROUND_COLOR = (34, 139, 34)  # Base grass color behind missing textures and off-map areas
+
+
+class TerrainCache:
+    """Static ground pre-rendered into chunk surfaces.
+
+    Grass, building floors and unmined rocks never move, so each chunk of
+    chunk_size x chunk_size tiles is drawn once and then blitted as a single
+    surface. A chunk is thrown away (and lazily redrawn) only when the
+    occupancy grid reports a change on one of its tiles, e.g. a rock being
+    mined. Only recently drawn chunks are kept to bound memory use.
+    """
+
+    def __init__(self, tile_size, map_width, map_height, grass_img=None, floor_img=None,
+                 chunk_size=8, max_chunks=32):
+        self.tile_size = tile_size
+        self.map_width = map_width
+        self.map_height = map_height
+        self.grass_img = grass_img
+        self.floor_img = floor_img
+        self.chunk_size = chunk_size
+        self.chunk_pixels = chunk_size * tile_size
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (cx, cy) -> Surface, least recently drawn first
+        self.grid = None
+        self.floors = set()
+
+    def attach(self, grid, floors):
+        """Render from a (new) world; call again after loading a save"""
+        self.grid = grid
+        self.map_width = grid.width
+        self.map_height = grid.height
+        self.floors = floors
+        self.chunks.clear()
+        grid.listeners.append(self.invalidate_tile)
+
+    def invalidate_tile(self, x, y):
+        self.chunks.pop((x // self.chunk_size, y // self.chunk_size), None)
+
+    def render_chunk(self, cx, cy):
+        size = self.chunk_pixels
+        tile = self.tile_size
+        surface = pygame.Surface((size, size)).convert()
+        surface.fill(GROUND_COLOR)
+        origin_x = cx * self.chunk_size
+        origin_y = cy * self.chunk_size
+        end_x = min(self.map_width, origin_x + self.chunk_size)
+        end_y = min(self.map_height, origin_y + self.chunk_size)
+        for wx in range(origin_x, end_x):
+            for wy in range(origin_y, end_y):
+                pos = ((wx - origin_x) * tile, (wy - origin_y) * tile)
+                if self.grass_img:
+                    surface.blit(self.grass_img, pos)
+                if self.floor_img and (wx, wy) in self.floors:
+                    surface.blit(self.floor_img, pos)
+                rock = self.grid.find(wx, wy, Rock) if self.grid else None
+                if rock:
+                    rock.draw(surface, origin_x * tile, origin_y * tile)
+        return surface
+
+    def draw(self, screen, cam_x, cam_y):
+        size = self.chunk_pixels
+        first_cx = max(0, cam_x // size)
+        first_cy = max(0, cam_y // size)
+        last_cx = (cam_x + screen.get_width() - 1) // size
+        last_cy = (cam_y + screen.get_height() - 1) // size
+        for cx in range(first_cx, last_cx + 1):
+            for cy in range(first_cy, last_cy + 1):
+                key = (cx, cy)
+                surface = self.chunks.get(key)
+                if surface is None:
+                    surface = self.render_chunk(cx, cy)
+                    self.chunks[key] = surface
+                    if len(self.chunks) > self.max_chunks:
+                        self.chunks.popitem(last=False)
+                else:
+                    self.chunks.move_to_end(key)
+                screen.blit(surface, (cx * size - cam_x, cy * size - cam_y))
+
+
+
+class ScrollBuffer:
+    """Ground and structures under the view, kept in a surface one tile larger than the screen.
+
+    The camera moves in pixels, so the buffer covers every tile the screen
+    can overlap and is blitted at a sub-tile offset. When the camera crosses
+    a tile border the buffer is scrolled by whole tiles and only the newly
+    exposed rows and columns are drawn; a tile whose structures change
+    (tile_states() differs) is redrawn in place. Only moving things are
+    drawn over it every frame.
+    """
+
+    LAYERS = ("spikes", "trap_pits", "walls", "turrets", "doors", "workbenches", "campfires", "trees")  # Back to front
+
+    def __init__(self, tile_size, screen_width, screen_height, terrain, registry):
+        self.tile_size = tile_size
+        self.columns = -(-screen_width // tile_size) + 1
+        self.rows = -(-screen_height // tile_size) + 1
+        self.surface = pygame.Surface((self.columns * tile_size, self.rows * tile_size))
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        self.terrain = terrain
+        self.registry = registry
+        self.origin = None  # Tile at the buffer's top-left corner; None until the first update
+        self.states = {}  # tile_states() the buffer was drawn from
+
+    def attach(self, terrain, registry):
+        """Draw from a (new) world, e.g. after loading"""
+        self.terrain = terrain
+        self.registry = registry
+        self.invalidate()
+
+    def invalidate(self):
+        self.origin = None
+
+    def update(self, cam_x, cam_y, states):
+        """Scroll to the camera and redraw exposed or changed tiles"""
+        size = self.tile_size
+        ox, oy = cam_x // size, cam_y // size
+        columns, rows = self.columns, self.rows
+        fresh = []  # Buffer tile rects drawn from scratch this frame
+        if self.origin is None or abs(ox - self.origin[0]) >= columns or abs(oy - self.origin[1]) >= rows:
+            self.origin = (ox, oy)
+            fresh.append((0, 0, columns, rows))
+        elif (ox, oy) != self.origin:
+            dx, dy = ox - self.origin[0], oy - self.origin[1]
+            self.origin = (ox, oy)
+            self.surface.scroll(-dx * size, -dy * size)
+            if dx:
+                fresh.append((columns - dx, 0, columns, rows) if dx > 0 else (0, 0, -dx, rows))
+            if dy:
+                fresh.append((0, rows - dy, columns, rows) if dy > 0 else (0, 0, columns, -dy))
+        for x0, y0, x1, y1 in fresh:
+            self.redraw(ox + x0, oy + y0, ox + x1, oy + y1)
+        old = self.states
+        self.states = states
+        for x, y in (old.keys() ^ states.keys()) | {tile for tile, state in states.items() if old.get(tile, state) != state}:
+            bx, by = x - ox, y - oy
+            if 0 <= bx < columns and 0 <= by < rows and not any(
+                    x0 <= bx < x1 and y0 <= by < y1 for x0, y0, x1, y1 in fresh):
+                self.redraw(x, y, x + 1, y + 1)
+
+    def redraw(self, x0, y0, x1, y1):
+        """Draw the tiles x0 <= x < x1, y0 <= y < y1 (world coordinates) into the buffer"""
+        size = self.tile_size
+        left, top = self.origin[0] * size, self.origin[1] * size
+        surface = self.surface
+        surface.set_clip(pygame.Rect(x0 * size - left, y0 * size - top, (x1 - x0) * size, (y1 - y0) * size))
+        surface.fill(GROUND_COLOR)
+        self.terrain.draw(surface, left, top)
+        grid = self.registry.grid
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(grid.width, x1), min(grid.height, y1 + 1)  # A tree's top reaches into the tile above it
+        drawn = self.registry.occupants(x0, y0, x1, y1)
+        for name in self.LAYERS:
+            for entity in drawn[name]:
+                entity.draw(surface, left, top)
+        surface.set_clip(None)
+
+    def draw(self, screen, cam_x, cam_y):
+        size = self.tile_size
+        screen.blit(self.surface, (self.origin[0] * size - cam_x, self.origin[1] * size - cam_y))
+
+
+class LightingSystem:
+    """Night darkness with the light of campfires cut out of it.
+
+    Instead of a flat full-screen overlay, a darkness map with a few cells
+    per tile is built for the tiles under the view. Each light subtracts a
+    precomputed radial falloff sprite from the map's alpha and adds a warm
+    glow at the edge of its light, then the map is smoothscaled to pixels
+    once. The map overhangs the screen by snap tiles and its corner moves
+    in steps of snap tiles, so it is only rebuilt when the darkness level or
+    the lights in range change, or every few tiles of scrolling; other
+    frames blit the same surface at an offset.
+    """
+
+    NIGHT_COLOR = (0, 0, 40)
+    NIGHT_ALPHA = 150  # Alpha of the darkness at full night
+    GLOW_COLOR = (110, 55, 0)  # Added at full light strength; only shows where some darkness remains
+
+    def __init__(self, tile_size, screen_width, screen_height, cells_per_tile=4, snap=4):
+        self.tile_size = tile_size
+        self.cells_per_tile = cells_per_tile
+        self.snap = snap
+        self.columns = -(-screen_width // tile_size) + snap
+        self.rows = -(-screen_height // tile_size) + snap
+        self.sprites = {}  # radius in tiles -> (alpha cut-out, glow) sprites
+        self.origin = (0, 0)  # Tile at the map's top-left corner
+        self.key = None  # (origin, alpha, lights) the surface was built for
+        self.surface = None  # Upscaled darkness, or None by day
+
+    def falloff(self, radius):
+        """The cut-out and glow sprites for a light of the given radius, built on first use"""
+        sprites = self.sprites.get(radius)
+        if sprites is None:
+            size = 2 * radius * self.cells_per_tile
+            centre = np.arange(size) + 0.5 - size / 2
+            distance = np.hypot(centre[:, None], centre[None, :]) / (size / 2)
+            strength = np.clip(1.0 - distance ** 2, 0.0, 1.0) ** 1.5
+            cut = pygame.Surface((size, size), pygame.SRCALPHA)
+            cut.fill((0, 0, 0, 0))
+            pygame.surfarray.pixels_alpha(cut)[:] = (strength * 255).astype(np.uint8)
+            glow = pygame.Surface((size, size))
+            pygame.surfarray.blit_array(glow, (strength[:, :, None] * self.GLOW_COLOR).astype(np.uint8))
+            sprites = self.sprites[radius] = (cut, glow)
+        return sprites
+
+    def update(self, cam_x, cam_y, darkness, sources):
+        """Rebuild the darkness map if needed; sources are entities with a light_radius() method"""
+        size = self.tile_size
+        snap = self.snap
+        ox, oy = cam_x // size // snap * snap, cam_y // size // snap * snap
+        alpha = round(self.NIGHT_ALPHA * darkness)
+        lights = []
+        if alpha:
+            for source in sources:
+                radius = source.light_radius()
+                if radius and ox - radius <= source.x < ox + self.columns + radius \
+                        and oy - radius <= source.y < oy + self.rows + radius:
+                    lights.append((source.x, source.y, radius))
+        key = ((ox, oy), alpha, tuple(lights))
+        if key == self.key:
+            return
+        self.key = key
+        self.origin = (ox, oy)
+        if not alpha:
+            self.surface = None
+            return
+        cells = self.cells_per_tile
+        darkness_map = pygame.Surface((self.columns * cells, self.rows * cells), pygame.SRCALPHA)
+        darkness_map.fill(self.NIGHT_COLOR + (alpha,))
+        for x, y, radius in lights:
+            cut, glow = self.falloff(radius)
+            position = ((x - ox - radius) * cells + cells // 2, (y - oy - radius) * cells + cells // 2)
+            darkness_map.blit(cut, position, special_flags=pygame.BLEND_RGBA_SUB)
+            darkness_map.blit(glow, position, special_flags=pygame.BLEND_RGB_ADD)
+        self.surface = pygame.transform.smoothscale(darkness_map, (self.columns * size, self.rows * size))
+
+    def draw(self, screen, cam_x, cam_y):
+        if self.surface is not None:
+            size = self.tile_size
+            screen.blit(self.surface, (self.origin[0] * size - cam_x, self.origin[1] * size - cam_y))
+
+class DirtyRects:
+    """Which parts of the screen changed since the last frame, for the --dirty-rects mode.
+
+    Each frame the caller reports a view key (camera position and anything
+    else that changes the whole picture, like night falling), what is drawn
+    on every visible tile (tile_states()) and a (rect, key) pair per HUD
+    widget. A new view key or an invalidate() asks for a full redraw;
+    otherwise only tiles whose drawn state changed and widgets whose key
+    changed are returned, merged into a few rectangles that the caller
+    redraws under a clip and hands to pygame.display.update().
+    """
+
+    def __init__(self, tile_size):
+        self.tile_size = tile_size
+        self.view = None
+        self.tiles = {}  # (x, y) -> drawn state, as of the last frame
+        self.widgets = {}  # name -> (screen rect, key), as of the last frame
+        self.full = True
+
+    def invalidate(self):
+        """Force a full redraw next frame (input, menus, overlays toggled)"""
+        self.full = True
+
+    def update(self, view, cam_x, cam_y, tiles, widgets):
+        """Screen rects to redraw this frame, or None for the whole screen"""
+        old_tiles, old_widgets = self.tiles, self.widgets
+        full = self.full or view != self.view
+        self.view, self.tiles, self.widgets, self.full = view, tiles, widgets, False
+        if full:
+            return None
+        size = self.tile_size
+        changed = old_tiles.keys() ^ tiles.keys()
+        changed.update(tile for tile, state in tiles.items() if old_tiles.get(tile, state) != state)
+        rects = [pygame.Rect(x * size - cam_x, y * size - cam_y, size, size) for x, y in changed]
+        for name in old_widgets.keys() | widgets.keys():
+            old = old_widgets.get(name)
+            new = widgets.get(name)
+            if old != new:
+                rects.extend(entry[0] for entry in (old, new) if entry is not None)
+        return self.merge(rects)
+
+    @staticmethod
+    def merge(rects):
+        """Union overlapping or touching rects, so neighbouring tiles are redrawn in one pass"""
+        merged = []
+        for rect in rects:
+            rect = pygame.Rect(rect)
+            grown = True
+            while grown:
+                grown = False
+                for other in merged:
+                    if rect.inflate(2, 2).colliderect(other):
+                        merged.remove(other)
+                        rect.union_ip(other)
+                        grown = True
+                        break
+            merged.append(rect)
+        return merged
+
+
+DRAWN_STATE = ("hp", "facing", "open", "lit", "in_use")  # Attributes that change how an entity is drawn
+
+
+def tile_states(*entity_lists):
+    """(x, y) -> what is drawn on that tile, for DirtyRects.update().
+
+    Trees are two tiles tall, so they are listed on the tile above theirs too.
+    """
+    states = {}
+    for entities in entity_lists:
+        for entity in entities:
+            state = (type(entity),) + tuple(getattr(entity, name, None) for name in DRAWN_STATE)
+            if hasattr(entity, "fuel"):
+                state += (int(entity.fuel),)  # The fuel bar
+            states.setdefault((entity.x, entity.y), []).append(state)
+            if isinstance(entity, Tree):
+                states.setdefault((entity.x, entity.y - 1), []).append(state)
+    return states
@@ -1,7 +1,216 @@
 import os
+import sys
 import json
+import queue
+import threading
+import struct
+import zlib
+from array import array
+from itertools import chain
+
+from entities import Colonist, Worker, Zombie, Wall, Tree, Rock, Spike, Turret, Door, TrapPit, Workbench, Campfire
 
 SAVE_FILE = os.path.join(os.path.dirname(__file__), "savegame.json")
+BINARY_SAVE_FILE = os.path.join(os.path.dirname(__file__), "savegame.dhs")
+AUTOSAVE_SLOTS = 3
+
+# Binary save layout: header, then a zlib stream of sections. Each section is
+# one entity type stored column-wise (struct of arrays), so saving and loading
+# is a handful of array conversions instead of a dict per entity.
+BINARY_MAGIC = b"DHSV"
+BINARY_VERSION = 1  # Bump when the layout changes and add an entry to MIGRATIONS
+HEADER = struct.Struct("<4sH")
+SECTION_HEADER = struct.Struct("<IB")  # entity count, column count
+COLUMN_HEADER = struct.Struct("<cI")  # array typecode, byte length
+
+# Columns per section: (name, array typecode, getter)
+BINARY_SECTIONS = {
+    "zombies": [
+        ("x", "H", lambda z: z.x),
+        ("y", "H", lambda z: z.y),
+        ("hp", "f", lambda z: z.hp),
+        ("facing_x", "b", lambda z: getattr(z, "facing", (0, 1))[0]),
+        ("facing_y", "b", lambda z: getattr(z, "facing", (0, 1))[1]),
+    ],
+    "walls": [
+        ("x", "H", lambda w: w.x),
+        ("y", "H", lambda w: w.y),
+        ("hp", "f", lambda w: w.hp),
+        ("stone", "B", lambda w: getattr(w, "type", "wood") == "stone"),
+    ],
+    "trees": [
+        ("x", "H", lambda t: t.x),
+        ("y", "H", lambda t: t.y),
+        ("cut_down", "B", lambda t: getattr(t, "cut_down", False)),
+        ("designated", "B", lambda t: getattr(t, "designated", False)),
+    ],
+    "rocks": [
+        ("x", "H", lambda r: r.x),
+        ("y", "H", lambda r: r.y),
+        ("mined", "B", lambda r: getattr(r, "mined", False)),
+        ("designated", "B", lambda r: getattr(r, "designated", False)),
+    ],
+    "spikes": [
+        ("x", "H", lambda s: s.x),
+        ("y", "H", lambda s: s.y),
+        ("hp", "f", lambda s: s.hp),
+    ],
+    "turrets": [
+        ("x", "H", lambda t: t.x),
+        ("y", "H", lambda t: t.y),
+        ("hp", "f", lambda t: t.hp),
+        ("cooldown", "f", lambda t: getattr(t, "cooldown", 0)),
+    ],
+    "doors": [
+        ("x", "H", lambda d: d.x),
+        ("y", "H", lambda d: d.y),
+        ("hp", "f", lambda d: d.hp),
+        ("open", "B", lambda d: getattr(d, "open", False)),
+    ],
+    "trap_pits": [
+        ("x", "H", lambda tp: tp.x),
+        ("y", "H", lambda tp: tp.y),
+        ("hp", "f", lambda tp: tp.hp),
+    ],
+    "workbenches": [
+        ("x", "H", lambda wb: wb.x),
+        ("y", "H", lambda wb: wb.y),
+        ("hp", "f", lambda wb: wb.hp),
+        ("in_use", "B", lambda wb: wb.in_use),
+        ("craft_timer", "f", lambda wb: wb.craft_timer),
+    ],
+    "campfires": [
+        ("x", "H", lambda cf: cf.x),
+        ("y", "H", lambda cf: cf.y),
+        ("hp", "f", lambda cf: cf.hp),
+        ("lit", "B", lambda cf: cf.lit),
+        ("fuel", "f", lambda cf: cf.fuel),
+    ],
+    "floors": [
+        ("x", "H", lambda f: f[0]),
+        ("y", "H", lambda f: f[1]),
+    ],
+    "workers": [
+        ("x", "H", lambda w: w.x),
+        ("y", "H", lambda w: w.y),
+        ("hp", "f", lambda w: w.hp),
+        ("wood", "H", lambda w: w.carrying.get("wood", 0)),
+        ("stone", "H", lambda w: w.carrying.get("stone", 0)),
+    ],
+    "piles": [  # Resources waiting to be hauled: (x, y, wood, stone)
+        ("x", "H", lambda p: p[0]),
+        ("y", "H", lambda p: p[1]),
+        ("wood", "H", lambda p: p[2]),
+        ("stone", "H", lambda p: p[3]),
+    ],
+}
+
+
+def _hp(value):
+    # Stored as float32; keep whole numbers as ints so HP displays stay tidy
+    return int(value) if value == int(value) else value
+
+
+def _build_entities(name, columns, count):
+    """Construct a section's entities straight from its column arrays"""
+    def col(key, default=0):
+        return columns.get(key) or [default] * count
+
+    xs, ys = col("x"), col("y")
+    entities = []
+    if name == "zombies":
+        for x, y, hp, fx, fy in zip(xs, ys, col("hp", 100), col("facing_x", 0), col("facing_y", 1)):
+            zombie = Zombie(x, y)
+            zombie.hp = _hp(hp)
+            zombie.facing = (fx, fy)
+            entities.append(zombie)
+    elif name == "walls":
+        for x, y, hp, stone in zip(xs, ys, col("hp", 100), col("stone")):
+            wall = Wall(x, y, wall_type="stone" if stone else "wood")
+            wall.hp = _hp(hp)
+            entities.append(wall)
+    elif name == "trees":
+        for x, y, cut_down, designated in zip(xs, ys, col("cut_down"), col("designated")):
+            tree = Tree(x, y)
+            tree.cut_down = bool(cut_down)
+            tree.designated = bool(designated)
+            entities.append(tree)
+    elif name == "rocks":
+        for x, y, mined, designated in zip(xs, ys, col("mined"), col("designated")):
+            rock = Rock(x, y)
+            rock.mined = bool(mined)
+            rock.designated = bool(designated)
+            entities.append(rock)
+    elif name == "spikes":
+        for x, y, hp in zip(xs, ys, col("hp", 50)):
+            spike = Spike(x, y)
+            spike.hp = _hp(hp)
+            entities.append(spike)
+    elif name == "turrets":
+        for x, y, hp, cooldown in zip(xs, ys, col("hp", 100), col("cooldown")):
+            turret = Turret(x, y)
+            turret.hp = _hp(hp)
+            turret.cooldown = cooldown
+            entities.append(turret)
+    elif name == "doors":
+        for x, y, hp, is_open in zip(xs, ys, col("hp", 100), col("open")):
+            door = Door(x, y)
+            door.hp = _hp(hp)
+            door.open = bool(is_open)
+            entities.append(door)
+    elif name == "trap_pits":
+        for x, y, hp in zip(xs, ys, col("hp", 75)):
+            trap_pit = TrapPit(x, y)
+            trap_pit.hp = _hp(hp)
+            entities.append(trap_pit)
+    elif name == "workbenches":
+        for x, y, hp, in_use, craft_timer in zip(xs, ys, col("hp", 150), col("in_use"), col("craft_timer")):
+            workbench = Workbench(x, y)
+            workbench.hp = _hp(hp)
+            workbench.in_use = bool(in_use)
+            workbench.craft_timer = craft_timer
+            entities.append(workbench)
+    elif name == "campfires":
+        for x, y, hp, lit, fuel in zip(xs, ys, col("hp", 75), col("lit"), col("fuel", 100)):
+            campfire = Campfire(x, y)
+            campfire.hp = _hp(hp)
+            campfire.lit = bool(lit)
+            campfire.fuel = fuel
+            entities.append(campfire)
+    elif name == "floors":
+        entities = list(zip(xs, ys))
+    elif name == "workers":
+        for x, y, hp, wood, stone in zip(xs, ys, col("hp", 100), col("wood"), col("stone")):
+            worker = Worker(x, y)
+            worker.hp = _hp(hp)
+            worker.carrying = {resource: amount for resource, amount in (("wood", wood), ("stone", stone)) if amount}
+            entities.append(worker)
+    elif name == "piles":
+        entities = list(zip(xs, ys, col("wood"), col("stone")))
+    return entities
+
+
+def _legacy_json(world):
+    # Version 0 is a JSON save from before saves were versioned, when turret
+    # cooldowns and craft timers counted 60 Hz frames
+    for turret in world.get("turrets", []):
+        turret.cooldown /= 60
+    for workbench in world.get("workbenches", []):
+        workbench.craft_timer /= 60
+    return world
+
+
+# Upgrades a decoded world dict from the keyed version to the next one.
+# Version 0 is the legacy JSON layout; binary files start at version 1, and
+# JSON saves have carried BINARY_VERSION in a "version" key since.
+MIGRATIONS = {0: _legacy_json}
+
+
+def migrate(world, version):
+    """Bring a world dict decoded from a version `version` save up to BINARY_VERSION"""
+    for from_version in range(version, BINARY_VERSION):
+        world = MIGRATIONS[from_version](world)
+    return world
 
 class SaveGame:
     @staticmethod
@@ -13,6 +222,15 @@ class SaveGame:
             "facing": tuple(colonist.facing)
         }
 
+    @staticmethod
+    def serialize_worker(worker):
+        return {
+            "x": worker.x,
+            "y": worker.y,
+            "hp": worker.hp,
+            "carrying": dict(worker.carrying)
+        }
+
     @staticmethod
     def serialize_zombie(zombie):
         return {
@@ -36,7 +254,8 @@ class SaveGame:
         return {
             "x": tree.x,
             "y": tree.y,
-            "cut_down": getattr(tree, "cut_down", False)
+            "cut_down": getattr(tree, "cut_down", False),
+            "designated": getattr(tree, "designated", False)
         }
 
     @staticmethod
@@ -44,7 +263,8 @@ class SaveGame:
         return {
             "x": rock.x,
             "y": rock.y,
-            "mined": getattr(rock, "mined", False)
+            "mined": getattr(rock, "mined", False),
+            "designated": getattr(rock, "designated", False)
         }
 
     @staticmethod
@@ -104,37 +324,371 @@ class SaveGame:
     @classmethod
     def save(cls, colonist, zombies, walls, trees, wood, rocks=None, stone=0,
              xp=0, level=1, skill_points=0, xp_to_next=10, unlocked_blueprints=None, selected_blueprint_idx=0,
-             spikes=None, turrets=None, doors=None, floors=None, trap_pits=None, workbenches=None, campfires=None):
+             spikes=None, turrets=None, doors=None, floors=None, trap_pits=None, workbenches=None, campfires=None,
+             world=None, paged_chunks=(), workers=None, piles=None):
+        try:
+            cls.write_atomic(SAVE_FILE, cls.encode_json(colonist, zombies, walls, trees, wood, rocks, stone,
+                                                        xp, level, skill_points, xp_to_next, unlocked_blueprints,
+                                                        selected_blueprint_idx, spikes, turrets, doors, floors,
+                                                        trap_pits, workbenches, campfires, world, paged_chunks,
+                                                        workers, piles))
+            return True
+        except Exception as e:
+            print(f"Error saving game: {e}")
+            return False
+
+    @classmethod
+    def encode_json(cls, colonist, zombies, walls, trees, wood, rocks=None, stone=0,
+                    xp=0, level=1, skill_points=0, xp_to_next=10, unlocked_blueprints=None, selected_blueprint_idx=0,
+                    spikes=None, turrets=None, doors=None, floors=None, trap_pits=None, workbenches=None, campfires=None,
+                    world=None, paged_chunks=(), workers=None, piles=None):
+        """The text of a JSON save of these entities"""
+        # Paged-out chunks are written inline, as if they were loaded
+        paged = {}
+        for page in paged_chunks:
+            for name, entities in cls.unpack_page(page.read()).items():
+                paged.setdefault(name, []).extend(entities)
+
+        def with_paged(name, entities):
+            return chain(entities or [], paged.get(name, ()))
+        data = {
+            "version": BINARY_VERSION,
+            "colonist": cls.serialize_colonist(colonist),
+            "zombies": [cls.serialize_zombie(z) for z in zombies],
+            "walls": [cls.serialize_wall(w) for w in with_paged("walls", walls)],
+            "trees": [cls.serialize_tree(t) for t in with_paged("trees", trees)],
+            "rocks": [cls.serialize_rock(r) for r in with_paged("rocks", rocks)],
+            "spikes": [cls.serialize_spike(s) for s in with_paged("spikes", spikes)],
+            "turrets": [cls.serialize_turret(t) for t in with_paged("turrets", turrets)],
+            "doors": [cls.serialize_door(d) for d in with_paged("doors", doors)],
+            "trap_pits": [cls.serialize_trap_pit(tp) for tp in with_paged("trap_pits", trap_pits)],
+            "workbenches": [cls.serialize_workbench(wb) for wb in with_paged("workbenches", workbenches)],
+            "campfires": [cls.serialize_campfire(cf) for cf in with_paged("campfires", campfires)],
+            "floors": list(with_paged("floors", floors)),
+            "workers": [cls.serialize_worker(w) for w in workers or []],
+            "piles": [list(p) for p in piles or []],
+            "wood": wood,
+            "stone": stone,
+            "xp": xp,
+            "level": level,
+            "skill_points": skill_points,
+            "xp_to_next": xp_to_next,
+            "unlocked_blueprints": list(unlocked_blueprints) if unlocked_blueprints else [],
+            "selected_blueprint_idx": selected_blueprint_idx
+        }
+        if world:
+            data["world"] = world
+        return json.dumps(data, indent=2)
+
+    @classmethod
+    def snapshot(cls, world):
+        """Copy a world dict into plain tuples that are safe to encode on another thread.
+
+        Paged-out chunks are only referenced here; encode_snapshot reads and
+        merges them, so a save of a well-explored map doesn't stall the frame.
+        """
+        meta = {key: world[key] for key in ("wood", "stone", "xp", "level", "skill_points",
+                                             "xp_to_next", "selected_blueprint_idx")}
+        meta["colonist"] = cls.serialize_colonist(world["colonist"])
+        meta["unlocked_blueprints"] = sorted(world["unlocked_blueprints"])
+        if world.get("world"):
+            meta["world"] = world["world"]
+        sections = {}
+        for name, columns in BINARY_SECTIONS.items():
+            entities = world.get(name) or []
+            if hasattr(entities, "columns"):
+                # Array-backed collections (the zombie horde) hand over whole columns at once
+                data = entities.columns()
+                sections[name] = (len(entities), [data[col_name] for col_name, _, _ in columns])
+                continue
+            entities = list(entities)
+            sections[name] = (len(entities), [tuple(getter(e) for e in entities) for _, _, getter in columns])
+        return meta, sections, list(world.get("paged_chunks") or ())
+
+    @classmethod
+    def merge_pages(cls, sections, pages):
+        """Append paged-out chunks to the sections column by column, without building their entities"""
+        for page in pages:
+            for name, (count, page_columns) in cls.page_sections(page.read()).items():
+                total, values = sections[name]
+                sections[name] = (total + count, [tuple(column) + tuple(page_columns[col_name])
+                                                  for column, (col_name, _, _) in zip(values, BINARY_SECTIONS[name])])
+
+    @staticmethod
+    def encode_sections(sections):
+        """Yield the uncompressed bytes of each section, then the end-of-stream marker"""
+        for name, columns in BINARY_SECTIONS.items():
+            if name not in sections:
+                continue
+            count, values = sections[name]
+            encoded_name = name.encode("ascii")
+            parts = [struct.pack("<B", len(encoded_name)), encoded_name,
+                     SECTION_HEADER.pack(count, len(columns))]
+            for (col_name, typecode, _), column in zip(columns, values):
+                data = array(typecode, column)
+                if sys.byteorder == "big":
+                    data.byteswap()
+                raw = data.tobytes()
+                encoded_col = col_name.encode("ascii")
+                parts.append(struct.pack("<B", len(encoded_col)) + encoded_col)
+                parts.append(COLUMN_HEADER.pack(typecode.encode("ascii"), len(raw)))
+                parts.append(raw)
+            yield b"".join(parts)
+        yield b"\x00"  # Empty section name ends the stream
+
+    @staticmethod
+    def decode_sections(payload, pos=0):
+        """Read sections from pos until the end marker: {name: (count, {column: array})}"""
+        sections = {}
+        while True:
+            name_len = payload[pos]
+            pos += 1
+            if name_len == 0:
+                return sections
+            name = bytes(payload[pos:pos + name_len]).decode("ascii")
+            pos += name_len
+            count, column_count = SECTION_HEADER.unpack_from(payload, pos)
+            pos += SECTION_HEADER.size
+            columns = {}
+            for _ in range(column_count):
+                col_len = payload[pos]
+                pos += 1
+                col_name = bytes(payload[pos:pos + col_len]).decode("ascii")
+                pos += col_len
+                typecode, nbytes = COLUMN_HEADER.unpack_from(payload, pos)
+                pos += COLUMN_HEADER.size
+                data = array(typecode.decode("ascii"))
+                data.frombytes(payload[pos:pos + nbytes])
+                if sys.byteorder == "big":
+                    data.byteswap()
+                pos += nbytes
+                columns[col_name] = data
+            sections[name] = (count, columns)
+
+    @classmethod
+    def encode_snapshot(cls, snapshot):
+        """Pack and compress a snapshot into the binary save format"""
+        meta, sections, pages = snapshot
+        cls.merge_pages(sections, pages)
+        compressor = zlib.compressobj(6)
+        chunks = [HEADER.pack(BINARY_MAGIC, BINARY_VERSION)]
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        chunks.append(compressor.compress(struct.pack("<I", len(meta_bytes)) + meta_bytes))
+        for part in cls.encode_sections(sections):
+            chunks.append(compressor.compress(part))
+        chunks.append(compressor.flush())
+        return b"".join(chunks)
+
+    @classmethod
+    def encode_json_snapshot(cls, snapshot):
+        """The text of a JSON save of a snapshot, rebuilding its entities on the calling thread"""
+        meta, sections, pages = snapshot
+        cls.merge_pages(sections, pages)
+        entities = {name: _build_entities(name, {col_name: column for (col_name, _, _), column
+                                                 in zip(BINARY_SECTIONS[name], values)}, count)
+                    for name, (count, values) in sections.items()}
+        c = meta["colonist"]
+        colonist = Colonist(c["x"], c["y"])
+        colonist.hp = c["hp"]
+        colonist.facing = tuple(c.get("facing", (0, -1)))
+        return cls.encode_json(colonist, entities["zombies"], entities["walls"], entities["trees"], meta["wood"],
+                               entities["rocks"], meta["stone"], meta["xp"], meta["level"], meta["skill_points"],
+                               meta["xp_to_next"], meta["unlocked_blueprints"], meta["selected_blueprint_idx"],
+                               entities["spikes"], entities["turrets"], entities["doors"], entities["floors"],
+                               entities["trap_pits"], entities["workbenches"], entities["campfires"],
+                               world=meta.get("world"), workers=entities["workers"], piles=entities["piles"])
+
+    # --- Chunk pages: one paged-out chunk's entities, in the same column layout ---
+    @classmethod
+    def pack_page(cls, entities):
+        """Compress a chunk's entities ({section name: list}) into a page blob"""
+        sections = {name: (len(items), [tuple(getter(e) for e in items) for _, _, getter in BINARY_SECTIONS[name]])
+                    for name, items in entities.items()}
+        return zlib.compress(b"".join(cls.encode_sections(sections)), 1)
+
+    @classmethod
+    def page_sections(cls, blob):
+        return cls.decode_sections(memoryview(zlib.decompress(blob)))
+
+    @classmethod
+    def unpack_page(cls, blob):
+        """Entities of a page blob, as {section name: list}"""
+        return {name: _build_entities(name, columns, count)
+                for name, (count, columns) in cls.page_sections(blob).items()}
+
+    @staticmethod
+    def write_atomic(path, data):
+        """Write to a temp file and rename it over path, so a crash never leaves a half-written save"""
+        tmp_path = path + ".tmp"
+        mode = "wb" if isinstance(data, bytes) else "w"
+        with open(tmp_path, mode) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def save_binary(cls, world, path=None):
+        """Write a world dict (see Simulation.world_state) in the compact binary format"""
+        path = path or BINARY_SAVE_FILE
         try:
-            data = {
-                "colonist": cls.serialize_colonist(colonist),
-                "zombies": [cls.serialize_zombie(z) for z in zombies],
-                "walls": [cls.serialize_wall(w) for w in walls],
-                "trees": [cls.serialize_tree(t) for t in trees],
-                "rocks": [cls.serialize_rock(r) for r in (rocks or [])],
-                "spikes": [cls.serialize_spike(s) for s in (spikes or [])],
-                "turrets": [cls.serialize_turret(t) for t in (turrets or [])],
-                "doors": [cls.serialize_door(d) for d in (doors or [])],
-                "trap_pits": [cls.serialize_trap_pit(tp) for tp in (trap_pits or [])],
-                "workbenches": [cls.serialize_workbench(wb) for wb in (workbenches or [])],
-                "campfires": [cls.serialize_campfire(cf) for cf in (campfires or [])],
-                "floors": list(floors or []),
-                "wood": wood,
-                "stone": stone,
-                "xp": xp,
-                "level": level,
-                "skill_points": skill_points,
-                "xp_to_next": xp_to_next,
-                "unlocked_blueprints": list(unlocked_blueprints) if unlocked_blueprints else [],
-                "selected_blueprint_idx": selected_blueprint_idx
-            }
-            with open(SAVE_FILE, "w") as f:
-                json.dump(data, f, indent=2)
+            cls.write_atomic(path, cls.encode_snapshot(cls.snapshot(world)))
             return True
         except Exception as e:
             print(f"Error saving game: {e}")
             return False
 
+    @classmethod
+    def load_binary(cls, path=None):
+        """Read a binary save into a world dict of ready-to-use entities"""
+        path = path or BINARY_SAVE_FILE
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                header = f.read(HEADER.size)
+                magic, version = HEADER.unpack(header)
+                if magic != BINARY_MAGIC:
+                    print("Not a Deadhold save file.")
+                    return None
+                if version > BINARY_VERSION:
+                    print(f"Save file version {version} is newer than this game supports.")
+                    return None
+                payload = memoryview(zlib.decompress(f.read()))
+
+            (meta_len,) = struct.unpack_from("<I", payload, 0)
+            pos = 4 + meta_len
+            meta = json.loads(bytes(payload[4:pos]).decode("utf-8"))
+            world = dict(meta)
+            c = meta["colonist"]
+            colonist = Colonist(c["x"], c["y"])
+            colonist.hp = c["hp"]
+            colonist.facing = tuple(c.get("facing", (0, -1)))
+            world["colonist"] = colonist
+            world["unlocked_blueprints"] = set(meta.get("unlocked_blueprints", ["wood_wall"]))
+
+            for name, (count, columns) in cls.decode_sections(payload, pos).items():
+                world[name] = _build_entities(name, columns, count)
+
+            return migrate(world, version)
+        except Exception as e:
+            print(f"Error loading save file: {e}")
+            return None
+
+    @staticmethod
+    def world_from_dict(data):
+        """Turn a JSON save into a world dict of entities, migrated from its version (0 if it has none)"""
+        colonist = Colonist(data["colonist"]["x"], data["colonist"]["y"])
+        colonist.hp = data["colonist"]["hp"]
+        colonist.facing = tuple(data["colonist"].get("facing", (0, -1)))
+        zombies = []
+        for z in data["zombies"]:
+            zombie = Zombie(z["x"], z["y"])
+            zombie.hp = z["hp"]
+            zombie.facing = tuple(z.get("facing", (0, 1)))
+            zombies.append(zombie)
+        walls = []
+        for w in data["walls"]:
+            wall_type = w.get("type", "wood")
+            wall = Wall(w["x"], w["y"], wall_type=wall_type)
+            wall.hp = w["hp"]
+            walls.append(wall)
+        trees = []
+        for t in data["trees"]:
+            tree = Tree(t["x"], t["y"])
+            tree.cut_down = t.get("cut_down", False)
+            tree.designated = t.get("designated", False)
+            trees.append(tree)
+        rocks = []
+        for r in data.get("rocks", []):
+            rock = Rock(r["x"], r["y"])
+            rock.mined = r.get("mined", False)
+            rock.designated = r.get("designated", False)
+            rocks.append(rock)
+        spikes = []
+        for s in data.get("spikes", []):
+            spike = Spike(s["x"], s["y"])
+            spike.hp = s.get("hp", 50)
+            spikes.append(spike)
+        turrets = []
+        for t in data.get("turrets", []):
+            turret = Turret(t["x"], t["y"])
+            turret.hp = t.get("hp", 100)
+            turret.cooldown = t.get("cooldown", 0)
+            turrets.append(turret)
+        doors = []
+        for d in data.get("doors", []):
+            door = Door(d["x"], d["y"])
+            door.hp = d.get("hp", 100)
+            door.open = d.get("open", False)
+            doors.append(door)
+        trap_pits = []
+        for tp in data.get("trap_pits", []):
+            trap_pit = TrapPit(tp["x"], tp["y"])
+            trap_pit.hp = tp.get("hp", 1)
+            trap_pits.append(trap_pit)
+        workbenches = []
+        for wb in data.get("workbenches", []):
+            workbench = Workbench(wb["x"], wb["y"])
+            workbench.hp = wb.get("hp", 1)
+            workbench.in_use = wb.get("in_use", False)
+            workbench.craft_timer = wb.get("craft_timer", 0)
+            workbenches.append(workbench)
+        campfires = []
+        for cf in data.get("campfires", []):
+            campfire = Campfire(cf["x"], cf["y"])
+            campfire.hp = cf.get("hp", 1)
+            campfire.lit = cf.get("lit", False)
+            campfire.fuel = cf.get("fuel", 100)
+            campfires.append(campfire)
+        workers = []
+        for w in data.get("workers", []):
+            worker = Worker(w["x"], w["y"])
+            worker.hp = w.get("hp", 100)
+            worker.carrying = dict(w.get("carrying", {}))
+            workers.append(worker)
+        world = {
+            "colonist": colonist,
+            "zombies": zombies,
+            "walls": walls,
+            "trees": trees,
+            "rocks": rocks,
+            "spikes": spikes,
+            "turrets": turrets,
+            "doors": doors,
+            "trap_pits": trap_pits,
+            "workbenches": workbenches,
+            "campfires": campfires,
+            "workers": workers,
+            "piles": [tuple(p) for p in data.get("piles", [])],
+            "wood": data.get("wood", 5),  # Default to 5 if not present
+            "stone": data.get("stone", 0),
+            "xp": data.get("xp", 0),
+            "level": data.get("level", 1),
+            "skill_points": data.get("skill_points", 0),
+            "xp_to_next": data.get("xp_to_next", 10),
+            "unlocked_blueprints": set(data.get("unlocked_blueprints", ["wood_wall"])),
+            "selected_blueprint_idx": data.get("selected_blueprint_idx", 0)
+        }
+        if "floors" in data:
+            world["floors"] = [tuple(f) for f in data["floors"]]
+        if "world" in data:
+            world["world"] = data["world"]
+        return migrate(world, data.get("version", 0))
+
+    @classmethod
+    def load_latest(cls):
+        """Load whichever save (manual, autosave or JSON) was written most recently, as a world dict"""
+        candidates = [p for p in [BINARY_SAVE_FILE, SAVE_FILE] + autosave_paths() if os.path.exists(p)]
+        if not candidates:
+            print("No save file found.")
+            return None
+        newest = max(candidates, key=os.path.getmtime)
+        if newest != SAVE_FILE:
+            return cls.load_binary(newest)
+        data = cls.load()
+        return cls.world_from_dict(data) if data else None
+
     @classmethod
     def load(cls):
         if not os.path.exists(SAVE_FILE):
@@ -147,18 +701,82 @@ class SaveGame:
             if "colonist" not in data or "zombies" not in data or "walls" not in data or "trees" not in data:
                 print("Save file is missing required data.")
                 return None
+            if data.get("version", 0) > BINARY_VERSION:
+                print(f"Save file version {data['version']} is newer than this game supports.")
+                return None
             return data
         except Exception as e:
             print(f"Error loading save file: {e}")
             return None
 
+def autosave_paths(slots=AUTOSAVE_SLOTS):
+    directory = os.path.dirname(BINARY_SAVE_FILE)
+    return [os.path.join(directory, f"autosave_{i}.dhs") for i in range(slots)]
+
+
+class BackgroundSaver:
+    """Writes saves on a worker thread so the game loop never waits on disk.
+
+    save() only takes a snapshot of the world on the calling thread; packing,
+    compression and the atomic write happen on the worker. Autosaves rotate
+    through a few slots, so even a corrupted write leaves older good saves.
+    """
+
+    def __init__(self, slots=AUTOSAVE_SLOTS):
+        self.slots = slots
+        self.jobs = queue.Queue()
+        self.worker = threading.Thread(target=self._run, name="save-writer", daemon=True)
+        self.worker.start()
+        # Continue the rotation by overwriting the oldest (or a missing) slot first
+        paths = autosave_paths(slots)
+        self.next_slot = min(range(slots), key=lambda i: os.path.getmtime(paths[i]) if os.path.exists(paths[i]) else -1)
+
+    def save(self, world, path=None, binary=True):
+        """Queue a save of the world; with no path it goes to the next autosave slot"""
+        if path is None:
+            path = autosave_paths(self.slots)[self.next_slot]
+            self.next_slot = (self.next_slot + 1) % self.slots
+        self.jobs.put((SaveGame.snapshot(world), path, binary))
+        return path
+
+    def busy(self):
+        return self.jobs.unfinished_tasks > 0
+
+    def wait(self):
+        """Block until every queued save has been written (call before quitting)"""
+        self.jobs.join()
+
+    def _run(self):
+        while True:
+            snapshot, path, binary = self.jobs.get()
+            try:
+                encode = SaveGame.encode_snapshot if binary else SaveGame.encode_json_snapshot
+                SaveGame.write_atomic(path, encode(snapshot))
+                print(f"Game saved to {os.path.basename(path)}.")
+            except Exception as e:
+                print(f"Error saving game: {e}")
+            finally:
+                snapshot = None  # Let go of its chunk pages, so their files can be deleted
+                self.jobs.task_done()
+
 # For backward compatibility with existing code
 def save_game(colonist, zombies, walls, trees, wood, rocks=None, stone=0,
               xp=0, level=1, skill_points=0, xp_to_next=10, unlocked_blueprints=None, selected_blueprint_idx=0,
-              spikes=None, turrets=None, doors=None, floors=None, trap_pits=None, workbenches=None, campfires=None):
+              spikes=None, turrets=None, doors=None, floors=None, trap_pits=None, workbenches=None, campfires=None,
+              world=None, paged_chunks=(), workers=None, piles=None):
     return SaveGame.save(colonist, zombies, walls, trees, wood, rocks, stone,
                          xp, level, skill_points, xp_to_next, unlocked_blueprints, selected_blueprint_idx,
-                         spikes, turrets, doors, floors, trap_pits, workbenches, campfires)
+                         spikes, turrets, doors, floors, trap_pits, workbenches, campfires, world, paged_chunks,
+                         workers, piles)
 
 def load_game():
     return SaveGame.load()
+
+def save_binary(world, path=None):
+    return SaveGame.save_binary(world, path)
+
+def load_binary(path=None):
+    return SaveGame.load_binary(path)
+
+def load_latest():
+    return SaveGame.load_latest()
@@ -0,0 +1,741 @@
+import random
+import time
+
+import pygame
+
+from entities import (Colonist, Worker, Wall, Tree, Rock, Spike, Turret, Bullet, Door, TrapPit,
+                      Workbench, Campfire, MAP_WIDTH, MAP_HEIGHT)
+from game_systems import (TimeSystem, WaveSystem, ExperienceSystem,
+                          CombatSystem, ConstructionPlanningSystem, JobSystem, GameStatistics)
+from world import WorldGrid, SpatialHash, EntityRegistry
+from horde import ZombieHorde, BITE_INTERVAL, BITE_DAMAGE
+from chunks import ChunkManager, CHUNK_SIZE
+from pathfinding import FlowField, PathService
+from profiler import FrameProfiler
+from savegame import SaveGame, save_game, save_binary, load_latest
+
+TICK_RATE = 15  # Default logic ticks per simulated second; the renderer interpolates between ticks
+DESIGNATE_RADIUS = 3  # Tiles around the colonist whose trees and rocks a designation covers
+JOB_RETRY = 5000  # Simulated ms before a job a worker gave up on is offered again
+IDLE_RECHECK = 1000  # Simulated ms between an idle worker's looks at the job queue
+
+DIRECTION_KEYS = (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT)
+
+
+# --- Modular: Blueprints ---
+def get_all_blueprints():
+    return [
+        {"name": "wood_wall", "display": "Wood Wall", "img": "wall.png", "cost": {"wood": 1}, "required": set()},
+        {"name": "stone_wall", "display": "Stone Wall", "img": "stone_wall.png", "cost": {"stone": 2}, "required": set()},
+        {"name": "spike", "display": "Spike Trap", "img": "spike.png", "cost": {"wood": 2, "stone": 1}, "required": set()},
+        {"name": "turret", "display": "Turret", "img": "turret.png", "cost": {"stone": 5}, "required": set()},
+        {"name": "door", "display": "Door", "img": "door.png", "cost": {"wood": 2}, "required": set()},
+        {"name": "campfire", "display": "Campfire", "img": "campfire.png", "cost": {"wood": 1, "stone": 1}, "required": set()},
+        {"name": "workbench", "display": "Workbench", "img": "workbench.png", "cost": {"wood": 3}, "required": set()},
+        {"name": "trap_pit", "display": "Trap Pit", "img": "trap_pit.png", "cost": {"stone": 3}, "required": set()},
+    ]
+
+
+def get_unlocked_blueprints(all_blueprints, unlocked_set):
+    return [bp for bp in all_blueprints if bp["name"] in unlocked_set]
+
+
+BUILDINGS = {
+    "wood_wall": lambda x, y: Wall(x, y, wall_type="wood"),
+    "stone_wall": lambda x, y: Wall(x, y, wall_type="stone"),
+    "spike": Spike,
+    "turret": Turret,
+    "door": Door,
+    "trap_pit": TrapPit,
+    "workbench": Workbench,
+    "campfire": Campfire,
+}
+
+
+class SimInput:
+    """Player input for one logic tick.
+
+    held: direction key codes currently held down (pygame.K_UP etc.)
+    actions: discrete commands issued this tick - "build", "action", "use",
+             "designate", "cycle_blueprint" and "clear_plans"
+    """
+
+    def __init__(self, held=(), actions=()):
+        self.held = set(held)
+        self.actions = list(actions)
+
+
+def registry_category(name):
+    """Simulation attribute backed by one EntityRegistry category (read-only live view; assign to replace)"""
+    def get(self):
+        return self.registry.items(name)
+
+    def set(self, entities):
+        self.registry.replace(name, entities)
+    return property(get, set)
+
+
+class Simulation:
+    """The whole game world, advanced one fixed logic tick at a time.
+
+    Owns every entity list, the occupancy grid, the flow field and the game
+    systems, and never touches the display, fonts or the wall clock, so it can
+    run headless and as fast as the CPU allows. main.py renders it. Timers,
+    movement, bullets and damage are measured in seconds or simulated ms, so
+    a different tick rate keeps speeds and damage per second the same; only
+    when things happen is rounded to whole ticks (a zombie step every 0.8 s
+    is 12 ticks at 15 Hz but 6 ticks, 0.86 s, at 7 Hz). The world
+    itself is generated chunk by chunk from world_seed (see ChunkManager), so
+    large maps only keep the area around the colonist in memory. AI workers
+    (more colonists) take jobs from job_system: construction plans, trees and
+    rocks the player designated, and hauling what they gathered home.
+    """
+
+    walls = registry_category("walls")
+    doors = registry_category("doors")
+    trees = registry_category("trees")
+    rocks = registry_category("rocks")
+    spikes = registry_category("spikes")
+    turrets = registry_category("turrets")
+    trap_pits = registry_category("trap_pits")
+    workbenches = registry_category("workbenches")
+    campfires = registry_category("campfires")
+
+    def __init__(self, map_width=MAP_WIDTH, map_height=MAP_HEIGHT, seed=None, verbose=True, streaming=None,
+                 tick_rate=TICK_RATE, colonists=0):
+        if seed is not None:
+            random.seed(seed)
+        self.world_seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.map_width = map_width
+        self.map_height = map_height
+        self.verbose = verbose
+        self.tick_rate = tick_rate
+        self.tick_time = 1.0 / tick_rate  # Seconds of game time per step()
+        self.tick = 0
+        self.game_over = False
+        self.profiler = FrameProfiler()  # Disabled unless the renderer swaps in its own
+
+        self.colonist = Colonist(map_width // 2, map_height // 2)
+        self.registry = EntityRegistry()  # Structures and resources, updated by events
+        self.grid = None
+
+        # Generate the world around the colonist (all of it, on maps small enough not to stream)
+        self.chunks = ChunkManager(map_width, map_height, self.world_seed, self.registry, streaming=streaming)
+        self.chunks.update(self.colonist.x, self.colonist.y)
+
+        self.horde = ZombieHorde(map_width, map_height, tick_rate=tick_rate)  # Zombies are simulated as arrays, in bulk
+        x0, y0, x1, y1 = self.chunks.resident_rect()
+        for _ in range(10):
+            self.horde.spawn(random.randint(x0, x1 - 1), random.randint(y0, y1 - 1))
+
+        # Game systems
+        self.time_system = TimeSystem(tick_rate=tick_rate)
+        self.wave_system = WaveSystem(tick_rate)
+        self.job_system = JobSystem()
+        self.construction_planner = ConstructionPlanningSystem(self.job_system)
+        self.stats = GameStatistics(self.now)
+        self.stats.subscribe(self.registry, self.wave_system)
+        # A designated tree or rock the player harvests by hand is no longer a job
+        self.registry.subscribe("cut", lambda tree: self.job_system.cancel_job(tree.x, tree.y, "woodcutting"))
+        self.registry.subscribe("mine", lambda rock: self.job_system.cancel_job(rock.x, rock.y, "mining"))
+
+        self.bullets = []
+        self.wood = 5
+        self.stone = 0
+
+        # XP/Research system
+        self.xp = 0
+        self.level = 1
+        self.skill_points = 0
+        self.xp_to_next = 10
+        self.unlocked_blueprints = {"wood_wall"}
+        self.all_blueprints = get_all_blueprints()
+        self.selected_blueprint_idx = 0
+
+        # Tracking sets for XP
+        self.last_tree_cut = set()
+        self.last_rock_mined = set()
+        self.last_zombie_killed = set()
+        self.last_build_positions = set()
+
+        self.rebuild_indexes()
+
+        self.workers = []  # AI colonists
+        for _ in range(colonists):
+            self.add_worker()
+
+    @property
+    def zombies(self):
+        """A ZombieView per living zombie, for drawing and saving"""
+        return self.horde.views
+
+    @zombies.setter
+    def zombies(self, zombies):
+        self.horde.replace(zombies)
+
+    @property
+    def floors(self):
+        """Floor tiles, a set so per-tile floor checks are O(1); grows as chunks are generated"""
+        return self.chunks.floors
+
+    @floors.setter
+    def floors(self, floors):
+        self.chunks.floors = set(floors)
+
+    @property
+    def now(self):
+        """Simulated time in milliseconds"""
+        return self.tick * 1000 // self.tick_rate
+
+    def bite(self, x, y):
+        """Damage the zombies on tile (x, y) deal this tick.
+
+        Each bites BITE_DAMAGE whenever the simulated clock passes a multiple
+        of BITE_INTERVAL, so contact damage per second is the same at any
+        tick rate.
+        """
+        bites = self.now // BITE_INTERVAL - (self.tick - 1) * 1000 // self.tick_rate // BITE_INTERVAL
+        if not bites:
+            return 0
+        return self.horde.count_at(x, y) * bites * BITE_DAMAGE
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def rebuild_indexes(self):
+        """Rebuild the occupancy grid and flow field from the entity lists"""
+        self.grid = WorldGrid(self.map_width, self.map_height)
+        self.registry.attach(self.grid)
+        self.horde.attach(self.grid, self.chunks.resident_rect())
+        self.flow_field = FlowField(self.map_width, self.map_height, rebuild_interval=self.horde.move_interval)
+        self.paths = PathService(self.grid)  # Shared by the workers, invalidated through the grid's listeners
+        self.zombie_index = SpatialHash()
+
+    def unlocked_list(self):
+        return get_unlocked_blueprints(self.all_blueprints, self.unlocked_blueprints)
+
+    def selected_blueprint(self):
+        unlocked_list = self.unlocked_list()
+        if not unlocked_list:
+            return None
+        return unlocked_list[self.selected_blueprint_idx % len(unlocked_list)]
+
+    def unlock_blueprint(self, idx):
+        """Spend a skill point on a research menu entry"""
+        bp = self.all_blueprints[idx]
+        if bp["name"] not in self.unlocked_blueprints and self.skill_points > 0:
+            self.unlocked_blueprints.add(bp["name"])
+            self.skill_points -= 1
+
+    def add_worker(self):
+        """Put a new AI colonist on the nearest free tile around the colonist; returns it, or None if there is no room"""
+        cx, cy = self.colonist.x, self.colonist.y
+        taken = {(worker.x, worker.y) for worker in self.workers}
+        for r in range(1, 20):
+            for x, y in JobSystem.ring(cx, cy, r):
+                if (self.grid.in_bounds(x, y) and not self.grid.blocks_colonist(x, y)
+                        and (x, y) not in taken):
+                    worker = Worker(x, y)
+                    self.workers.append(worker)
+                    return worker
+        return None
+
+    def spawn_zombie(self, x, y):
+        zombie = self.horde.spawn(x, y)
+        self.registry.emit("spawn", zombie)
+        return zombie
+
+    # --- Player actions ---
+    def handle_action(self, action):
+        if action == "build":
+            if self.construction_planner.planning_mode:
+                bp = self.selected_blueprint()
+                if bp:
+                    self.construction_planner.add_planned_building(self.colonist.x, self.colonist.y, bp["name"])
+            else:
+                self.build()
+        elif action == "cycle_blueprint":
+            unlocked_list = self.unlocked_list()
+            self.selected_blueprint_idx = (self.selected_blueprint_idx + 1) % len(unlocked_list)
+        elif action == "clear_plans":
+            self.construction_planner.clear_all_plans()
+        elif action == "use":
+            self.use()
+        elif action == "action":
+            self.act()
+        elif action == "designate":
+            self.designate()
+
+    def can_afford(self, cost):
+        return all((self.wood if res == "wood" else self.stone) >= amt for res, amt in cost.items())
+
+    def construct(self, bp, x, y):
+        """Put up a blueprint's building at (x, y) and pay for it (the caller checks cost and space)"""
+        built = BUILDINGS[bp["name"]](x, y)
+        self.registry.spawn(built)
+        self.registry.emit("build", built)
+        if "wood" in bp["cost"]:
+            self.wood -= bp["cost"]["wood"]
+        if "stone" in bp["cost"]:
+            self.stone -= bp["cost"]["stone"]
+        build_pos = (x, y, bp["name"])
+        if build_pos not in self.last_build_positions:
+            self.xp += 1
+            self.last_build_positions.add(build_pos)
+        return built
+
+    def build(self):
+        bp = self.selected_blueprint()
+        if not bp:
+            return
+        colonist = self.colonist
+        if not self.can_afford(bp["cost"]) or self.grid.has_structure(colonist.x, colonist.y):
+            return
+        self.construct(bp, colonist.x, colonist.y)
+
+    def designate(self):
+        """Mark the trees and rocks around the colonist for the workers to harvest, or unmark them all if they already are"""
+        x, y = self.colonist.x, self.colonist.y
+        r = DESIGNATE_RADIUS
+        nearby = self.registry.occupants(x - r, y - r, x + r + 1, y + r + 1)
+        targets = nearby["trees"] + nearby["rocks"]
+        mark = not all(target.designated for target in targets)
+        for target in targets:
+            target.designated = mark
+            job_type = "woodcutting" if isinstance(target, Tree) else "mining"
+            if mark:
+                self.job_system.add_job(job_type, target.x, target.y)
+            else:
+                self.job_system.cancel_job(target.x, target.y, job_type)
+
+    def use(self):
+        """Interact with a door, workbench, or campfire under the colonist"""
+        grid = self.grid
+        x, y = self.colonist.x, self.colonist.y
+        door = grid.find(x, y, Door)
+        workbench = grid.find(x, y, Workbench)
+        campfire = grid.find(x, y, Campfire)
+        if door:
+            self.registry.toggle_door(door)
+        elif workbench:
+            if workbench.start_crafting():
+                self.log("Started crafting at workbench...")
+        elif campfire:
+            campfire.toggle_light()
+            self.log(f"Campfire {'lit' if campfire.lit else 'extinguished'}")
+
+    def act(self):
+        """Attack or harvest anything 1 tile away (zombie, tree, rock), or open/close a door"""
+        grid = self.grid
+        fx, fy = self.colonist.facing
+        target_x = self.colonist.x + fx
+        target_y = self.colonist.y + fy
+        zombie = self.horde.first_at(target_x, target_y)
+        if zombie:
+            zombie.hp -= 50
+        # Try to harvest tree or rock even if no zombie was found
+        tree = grid.find(target_x, target_y, Tree)
+        rock = grid.find(target_x, target_y, Rock)
+        door = grid.find(target_x, target_y, Door)
+        if tree:
+            self.stock(wood=self.registry.cut(tree))
+            if (tree.x, tree.y) not in self.last_tree_cut:
+                self.xp += 1
+                self.last_tree_cut.add((tree.x, tree.y))
+        elif rock:
+            self.stock(stone=self.registry.mine(rock))
+            if (rock.x, rock.y) not in self.last_rock_mined:
+                self.xp += 1
+                self.last_rock_mined.add((rock.x, rock.y))
+        elif door:
+            self.registry.toggle_door(door)
+
+    # --- Tick ---
+    def step(self, inputs=None):
+        """Advance the world by one logic tick"""
+        if self.game_over:
+            return
+        if inputs is None:
+            inputs = SimInput()
+        self.tick += 1
+        colonist = self.colonist
+        grid = self.grid
+        mark = self.profiler.mark
+
+        self.time_system.update()
+
+        # Zombie wave spawning, anywhere in the loaded part of the world
+        new_zombies = self.wave_system.update(self.time_system)
+        if new_zombies:
+            x0, y0, x1, y1 = self.chunks.resident_rect()
+            for _ in range(new_zombies):
+                self.spawn_zombie(random.randint(x0, x1 - 1), random.randint(y0, y1 - 1))
+
+        for action in inputs.actions:
+            self.handle_action(action)
+
+        # Movement (walls, closed doors, rocks, and trees block; open doors do not)
+        dx, dy = colonist.update_movement(inputs.held, self.tick_time)
+        if dx != 0 or dy != 0:
+            colonist.move(dx, dy, grid)
+        mark("movement")
+
+        # Stream chunks in and out as the colonist crosses chunk borders
+        self.chunks.update(colonist.x, colonist.y)
+        self.horde.cover(self.chunks.resident_rect())
+        active = self.chunks.active_rect()
+        mark("streaming")
+
+        # Combat systems share one spatial hash of living zombies per tick
+        self.zombie_index.rebuild_positions(*self.horde.living())
+        CombatSystem.update_turrets(self.turrets, self.zombie_index, self.bullets, Bullet, self.tick_time)
+        CombatSystem.update_bullets(self.bullets, self.zombie_index, self.map_width, self.map_height, self.tick_time)
+        damaged = CombatSystem.update_spikes(self.spikes, self.zombie_index, self.now)
+        damaged += CombatSystem.update_trap_pits(self.trap_pits, self.zombie_index, self.now)
+        mark("combat")
+
+        # Update workbenches and campfires
+        for workbench in self.workbenches:
+            if workbench.update(self.tick_time):  # Crafting finished
+                # Give bonus resources when crafting completes
+                self.wood += 1
+                self.stone += 1
+                self.xp += 2
+                self.log("Crafting complete! +1 wood, +1 stone, +2 XP")
+
+        for campfire in self.campfires:
+            campfire.update(self.tick_time)
+            if campfire.heal_nearby(colonist, self.now):
+                self.log("Healed by campfire!")
+        mark("structures")
+
+        self.update_workers()
+        mark("workers")
+
+        # Update zombies - one shared flow field, and the whole horde moves as one batch
+        self.flow_field.update(colonist, grid, active)
+        damaged += self.horde.update(colonist, grid, self.flow_field, active)
+        damage = self.bite(colonist.x, colonist.y)
+        if damage:
+            colonist.hp -= damage
+            self.stats.increment("damage_taken", damage)
+        mark("zombie update")
+
+        # Cleanup and XP with statistics
+        for zombie in self.horde.dead():
+            self.registry.emit("death", zombie)
+            position = (zombie.x, zombie.y)
+            if position not in self.last_zombie_killed:
+                self.xp += 5
+                self.last_zombie_killed.add(position)
+
+        # Remove dead entities - only what was damaged this tick can have died
+        self.horde.cull()
+        self.registry.reap(damaged)
+
+        # Process level-ups from accumulated XP
+        self.xp, self.level, self.skill_points, self.xp_to_next, leveled = ExperienceSystem.check_level_up(
+            self.xp, self.level, self.skill_points, self.xp_to_next)
+        if leveled:
+            self.log(f"Level up! Now level {self.level}. You have {self.skill_points} skill points.")
+
+        # Counters are event-driven (see GameStatistics.subscribe); only the graph history is sampled
+        self.stats.sample(self.now, len(self.horde))
+
+        if colonist.hp <= 0:
+            self.game_over = True
+        mark("cleanup")
+
+    # --- Workers ---
+    def update_workers(self):
+        """Take damage, claim jobs, walk and work for every AI colonist"""
+        now = self.now
+        lost = []  # (worker, goal, adjacent) of workers needing a new path, searched for as one batch
+        for worker in list(self.workers):
+            worker.tick(self.tick_time)
+            damage = self.bite(worker.x, worker.y)
+            if damage:
+                worker.hp -= damage
+                if worker.hp <= 0:
+                    self.lose_worker(worker)
+                    continue
+            job = worker.job
+            if job is not None and job.get("cancelled"):
+                worker.job = job = None
+                worker.path = []
+                worker.work_timer = None
+            if job is None and not worker.carrying:
+                if now < worker.idle_until:
+                    continue
+                job = worker.job = self.job_system.claim(worker.x, worker.y, now)
+                if job is None:
+                    worker.idle_until = now + IDLE_RECHECK
+                    continue
+                worker.path = []
+            if job is not None:
+                goal = (job["x"], job["y"])
+                adjacent = job["type"] != "hauling"
+            else:
+                workbench = min(self.workbenches, default=None,
+                                key=lambda bench: abs(bench.x - worker.x) + abs(bench.y - worker.y))
+                if workbench is not None:
+                    goal, adjacent = (workbench.x, workbench.y), False
+                else:
+                    goal, adjacent = (self.colonist.x, self.colonist.y), True
+            distance = abs(goal[0] - worker.x) + abs(goal[1] - worker.y)
+            if distance != (1 if adjacent else 0):
+                worker.work_timer = None
+                if worker.step_timer <= 0:
+                    if worker.path and not self.paths.blocked(*worker.path[-1]):
+                        self.walk(worker)
+                    else:
+                        lost.append((worker, goal, adjacent))
+                continue
+            if adjacent:
+                worker.facing = (goal[0] - worker.x, goal[1] - worker.y)
+            if worker.work_timer is None:
+                worker.work_timer = worker.WORK_TIME if job is not None and job["type"] != "hauling" else 0.0
+            worker.work_timer -= self.tick_time
+            if worker.work_timer > 0:
+                continue
+            worker.work_timer = None
+            if job is not None:
+                self.finish_job(worker, job)
+            else:
+                self.deliver(worker)
+
+        if lost:
+            paths = self.paths.find_paths([((worker.x, worker.y), goal, adjacent) for worker, goal, adjacent in lost])
+            for (worker, _, _), path in zip(lost, paths):
+                if path is None:
+                    self.give_up(worker)
+                    continue
+                worker.path = path[::-1]  # Next tile last, so each step pops it
+                if worker.path:
+                    self.walk(worker)
+
+    def walk(self, worker):
+        """Step a worker to the next tile of its path"""
+        nx, ny = worker.path.pop()
+        worker.facing = (nx - worker.x, ny - worker.y)
+        worker.move(nx - worker.x, ny - worker.y, self.grid)
+
+    def give_up(self, worker):
+        """A worker can't reach its goal: offer its job again later, drop what it carries, and rest a while"""
+        now = self.now
+        if worker.job is not None:
+            self.job_system.release(worker.job, now + JOB_RETRY)
+            worker.job = None
+        elif worker.carrying:
+            self.drop(worker.x, worker.y, worker.carrying)
+            worker.carrying = {}
+        worker.path = []
+        worker.idle_until = now + JOB_RETRY
+
+    def finish_job(self, worker, job):
+        """Do the work a worker stands next to (or on, for hauling)"""
+        x, y = job["x"], job["y"]
+        job_type = job["type"]
+        worker.job = None
+        if job_type == "woodcutting":
+            tree = self.grid.find(x, y, Tree)
+            if tree is None:  # In a chunk that is paged out; the job stays queued
+                self.job_system.release(job, self.now + JOB_RETRY)
+                return
+            tree.designated = False
+            self.drop(x, y, {"wood": self.registry.cut(tree)})
+        elif job_type == "mining":
+            rock = self.grid.find(x, y, Rock)
+            if rock is None:
+                self.job_system.release(job, self.now + JOB_RETRY)
+                return
+            rock.designated = False
+            self.drop(x, y, {"stone": self.registry.mine(rock)})
+        elif job_type == "construction":
+            if self.grid.has_structure(x, y):
+                self.construction_planner.remove_planned_building(x, y)
+                return
+            bp = next(bp for bp in self.all_blueprints if bp["name"] == job["blueprint"])
+            standing = (self.colonist.x, self.colonist.y) == (x, y) or any(
+                (other.x, other.y) == (x, y) for other in self.workers)
+            if standing or not self.can_afford(bp["cost"]):
+                self.job_system.release(job, self.now + JOB_RETRY)
+                return
+            self.construct(bp, x, y)
+            self.construction_planner.remove_planned_building(x, y)
+        elif job_type == "hauling":
+            for resource in ("wood", "stone"):
+                if job.get(resource):
+                    worker.carrying[resource] = worker.carrying.get(resource, 0) + job[resource]
+        self.job_system.complete_job(job)
+
+    def drop(self, x, y, resources):
+        """Leave resources on a tile as a pile for the workers to haul"""
+        job = self.job_system.add_job("hauling", x, y)
+        for resource, amount in resources.items():
+            job[resource] = job.get(resource, 0) + amount
+
+    def deliver(self, worker):
+        """Hand what a worker carries in to the stockpile"""
+        self.stock(worker.carrying.get("wood", 0), worker.carrying.get("stone", 0))
+        worker.carrying = {}
+
+    def stock(self, wood=0, stone=0):
+        """Add gathered resources to the stockpile (wood still lying in a pile isn't gathered yet)"""
+        self.wood += wood
+        self.stone += stone
+        self.stats.increment("wood_gathered", wood)
+        self.stats.increment("stone_gathered", stone)
+
+    def lose_worker(self, worker):
+        if worker.job is not None:
+            self.job_system.release(worker.job)
+        if worker.carrying:
+            self.drop(worker.x, worker.y, worker.carrying)
+        self.workers.remove(worker)
+        self.log(f"A colonist was killed! {len(self.workers)} left.")
+
+    def rebuild_jobs(self, piles=()):
+        """Requeue the jobs implied by a loaded world: plans, designated trees and rocks, and piles to haul"""
+        self.job_system = JobSystem()
+        self.construction_planner.attach(self.job_system)
+        for tree in self.trees:
+            if tree.designated and not tree.cut_down:
+                self.job_system.add_job("woodcutting", tree.x, tree.y)
+        for rock in self.rocks:
+            if rock.designated and not rock.mined:
+                self.job_system.add_job("mining", rock.x, rock.y)
+        for x, y, wood, stone in piles:
+            self.drop(x, y, {"wood": wood, "stone": stone})
+
+    # --- Save/Load ---
+    def world_state(self):
+        """Everything a save file needs, keyed like save_game's arguments"""
+        return {
+            "colonist": self.colonist,
+            "zombies": self.horde,
+            "walls": self.walls,
+            "trees": self.trees,
+            "wood": self.wood,
+            "rocks": self.rocks,
+            "stone": self.stone,
+            "xp": self.xp,
+            "level": self.level,
+            "skill_points": self.skill_points,
+            "xp_to_next": self.xp_to_next,
+            "unlocked_blueprints": self.unlocked_blueprints,
+            "selected_blueprint_idx": self.selected_blueprint_idx,
+            "spikes": self.spikes,
+            "turrets": self.turrets,
+            "doors": self.doors,
+            "floors": self.floors,
+            "trap_pits": self.trap_pits,
+            "workbenches": self.workbenches,
+            "campfires": self.campfires,
+            "world": self.chunks.describe(),
+            "paged_chunks": self.chunks.paged(),
+            "workers": self.workers,
+            "piles": [(job["x"], job["y"], job.get("wood", 0), job.get("stone", 0))
+                      for job in self.job_system.jobs.values() if job["type"] == "hauling"],
+        }
+
+    def save(self, binary=True):
+        """Save in the compact binary format, or as readable JSON"""
+        if binary:
+            return save_binary(self.world_state())
+        return save_game(**self.world_state())
+
+    def load(self):
+        """Load the most recent save; returns False if there is none"""
+        world = load_latest()
+        if not world:
+            return False
+        self.load_world(world)
+        return True
+
+    def load_state(self, data):
+        """Replace the world with the contents of a loaded JSON save dict"""
+        self.load_world(SaveGame.world_from_dict(data))
+
+    def load_world(self, world):
+        """Replace the world with a decoded save (see SaveGame.load_binary)"""
+        self.registry.detach()  # The old grid is discarded; don't patch it entity by entity
+        # Saves from before chunked worlds have no world info: they are this size and fully generated
+        info = world.get("world") or {}
+        width = info.get("width", self.map_width)
+        height = info.get("height", self.map_height)
+        if (width, height) != (self.map_width, self.map_height):
+            self.map_width, self.map_height = width, height
+            self.horde = ZombieHorde(width, height, tick_rate=self.tick_rate)
+        self.world_seed = info.get("seed", self.world_seed)
+        floors = world.get("floors", self.floors)
+        self.chunks.close()
+        self.chunks = ChunkManager(width, height, self.world_seed, self.registry,
+                                   chunk_size=info.get("chunk_size", CHUNK_SIZE))
+        self.floors = floors
+        generated = info.get("generated")
+        self.chunks.adopt([tuple(chunk) for chunk in generated] if generated is not None else None)
+        self.colonist = world["colonist"]
+        self.zombies = world["zombies"]
+        self.walls = world["walls"]
+        self.trees = world["trees"]
+        self.rocks = world.get("rocks", [])
+        self.spikes = world.get("spikes", [])
+        self.turrets = world.get("turrets", [])
+        self.doors = world.get("doors", [])
+        self.trap_pits = world.get("trap_pits", [])
+        self.workbenches = world.get("workbenches", [])
+        self.campfires = world.get("campfires", [])
+        self.wood = world["wood"]
+        self.stone = world["stone"]
+        self.xp = world["xp"]
+        self.level = world["level"]
+        self.skill_points = world["skill_points"]
+        self.xp_to_next = world["xp_to_next"]
+        self.unlocked_blueprints = set(world["unlocked_blueprints"])
+        self.selected_blueprint_idx = world["selected_blueprint_idx"]
+        self.workers = world.get("workers", [])
+        self.game_over = False
+        self.rebuild_indexes()
+        self.construction_planner.clear_all_plans()  # Plans aren't saved; the loaded world must not build this session's
+        self.rebuild_jobs(world.get("piles", ()))
+        self.chunks.update(self.colonist.x, self.colonist.y)
+
+
+def run_headless(days, seed=None, immortal=False, map_width=MAP_WIDTH, map_height=MAP_HEIGHT, tick_rate=TICK_RATE,
+                 colonists=0):
+    """Run an idle colony until the given day or until the colonist dies.
+
+    With immortal set the colonist is healed after every tick, and a death
+    within it undone, so soak tests can keep waves spawning for as many
+    nights as requested.
+    """
+    sim = Simulation(map_width, map_height, seed=seed, verbose=False, tick_rate=tick_rate, colonists=colonists)
+    started = time.perf_counter()
+    while not sim.game_over and sim.wave_system.day_count <= days:
+        sim.step()
+        if immortal:
+            sim.colonist.hp = 100
+            sim.game_over = False
+    elapsed = time.perf_counter() - started
+    simulated = sim.now / 1000
+    print(f"World seed {sim.world_seed}")
+    print(f"Day {sim.wave_system.day_count}, tick {sim.tick}: {'colonist died' if sim.game_over else 'survived'}, "
+          f"{len(sim.zombies)} zombies alive, {sim.stats.stats['zombies_killed']} killed")
+    print(f"Simulated {simulated:.0f}s in {elapsed:.2f}s ({simulated / max(elapsed, 1e-9):.0f}x real time)")
+    return sim
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run Deadhold headless (no display) for soak and balance tests")
+    parser.add_argument("days", type=int, nargs="?", default=1, help="stop once this many days have passed")
+    parser.add_argument("--seed", type=int, default=None, help="seed for world generation and spawns")
+    parser.add_argument("--immortal", action="store_true", help="keep the colonist alive for the whole run")
+    parser.add_argument("--width", type=int, default=MAP_WIDTH, help="map width in tiles")
+    parser.add_argument("--height", type=int, default=MAP_HEIGHT, help="map height in tiles")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="logic ticks per simulated second")
+    parser.add_argument("--colonists", type=int, default=0, help="AI colonists working alongside the player")
+    args = parser.parse_args()
+    run_headless(args.days, args.seed, args.immortal, args.width, args.height, args.tick_rate, args.colonists)
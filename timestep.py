@@ -0,0 +1,67 @@
+from collections import deque
+
+
+class GameSpeed:
+    """Fixed-timestep driver for the logic ticks, with fast-forward.
+
+    Each frame, advance() adds the real time since the previous frame,
+    scaled by the speed multiplier, to an accumulator and returns how many
+    whole ticks are due; alpha is how far rendering is into the next tick.
+    The caller times every tick it runs and reports it with charge(): once
+    the recent ticks average more than their share of real time at this
+    speed, the multiplier drops a step rather than letting the game fall
+    behind the clock and the frame rate collapse.
+    """
+
+    SPEEDS = (1, 2, 4, 16)
+    TURBO = 4  # From this multiplier up, the renderer drops to a reduced rate and skips extras
+    BUDGET_SHARE = 0.5  # Fraction of real time the logic may use; the rest is left for rendering
+
+    def __init__(self, tick_time, window=30):
+        self.tick_time = tick_time  # Seconds of game time per tick
+        self.speed = 1
+        self.accumulator = 0.0  # Game seconds owed to the simulation, less than one tick after advance()
+        self.costs = deque(maxlen=window)  # Real seconds taken by the latest ticks
+
+    @property
+    def turbo(self):
+        return self.speed >= self.TURBO
+
+    @property
+    def alpha(self):
+        """How far the game clock is from the latest tick towards the next (0-1)"""
+        return min(1.0, self.accumulator / self.tick_time)
+
+    @property
+    def tick_budget(self):
+        """Real seconds a tick may take on average at the current speed"""
+        return self.tick_time / self.speed * self.BUDGET_SHARE
+
+    def set_speed(self, speed):
+        self.speed = speed
+        self.costs.clear()
+
+    def advance(self, elapsed):
+        """Add elapsed real seconds and return the number of ticks now due"""
+        self.accumulator += elapsed * self.speed
+        ticks = int(self.accumulator // self.tick_time)
+        self.accumulator -= ticks * self.tick_time
+        return ticks
+
+    def defer(self, ticks, speed):
+        """Hand back ticks advance() returned at an earlier speed but that were not run.
+
+        The real time they stood for is owed again at the current speed, so
+        after a slowdown the rest of the frame's ticks shrink to match.
+        """
+        self.accumulator += ticks * self.tick_time * self.speed / speed
+
+    def charge(self, cost):
+        """Record one tick's real cost in seconds; returns True if that slowed the game down"""
+        self.costs.append(cost)
+        if self.speed == 1 or len(self.costs) < self.costs.maxlen:
+            return False
+        if sum(self.costs) / len(self.costs) <= self.tick_budget:
+            return False
+        self.set_speed(self.SPEEDS[self.SPEEDS.index(self.speed) - 1])
+        return True
@@ -0,0 +1,312 @@
+from entities import Wall, Tree, Rock, Turret, Door, Spike, TrapPit, Workbench, Campfire
+
+
+class WorldGrid:
+    """Persistent (x, y) -> occupants index covering the whole map.
+
+    Structures and resources are registered when they are created and
+    removed when they are destroyed, cut or mined, so every occupancy or
+    collision check is a dict lookup instead of a scan over an entity list.
+    The colonist is not stored here, and zombies live in the ZombieHorde.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = {}  # (x, y) -> list of occupants
+        self.version = 0  # Bumped whenever an occupant is added, removed or changes state
+        self.listeners = []  # Callbacks taking (x, y), fired on blocker changes
+
+    @staticmethod
+    def occupies(entity):
+        """Cut trees, mined rocks and destroyed entities no longer take up a tile"""
+        if isinstance(entity, Tree):
+            return not entity.cut_down
+        if isinstance(entity, Rock):
+            return not entity.mined
+        return getattr(entity, "hp", 1) > 0
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def add(self, entity):
+        self.cells.setdefault((entity.x, entity.y), []).append(entity)
+        self.mark_changed(entity.x, entity.y)
+
+    def add_all(self, *entity_lists):
+        """Register every live entity from the given lists"""
+        for entities in entity_lists:
+            for entity in entities:
+                if self.occupies(entity):
+                    self.add(entity)
+
+    def remove(self, entity, notify=True):
+        """Unregister an entity; notify=False skips listeners (chunk paging, nothing changed)"""
+        key = (entity.x, entity.y)
+        occupants = self.cells.get(key)
+        if not occupants:
+            return
+        try:
+            occupants.remove(entity)
+        except ValueError:
+            return
+        if not occupants:
+            del self.cells[key]
+        if notify:
+            self.mark_changed(entity.x, entity.y)
+
+    def mark_changed(self, x, y):
+        """Record an in-place state change (door toggled, tree cut) at a tile"""
+        self.version += 1
+        for listener in self.listeners:
+            listener(x, y)
+
+    def at(self, x, y):
+        return self.cells.get((x, y), ())
+
+    def find(self, x, y, kind):
+        """First occupant of the given class at (x, y), or None"""
+        for occupant in self.cells.get((x, y), ()):
+            if isinstance(occupant, kind):
+                return occupant
+        return None
+
+    def has_structure(self, x, y):
+        """True if anything occupies the tile (blocks building)"""
+        return (x, y) in self.cells
+
+    def blocks_colonist(self, x, y):
+        """Walls, closed doors, uncut trees and unmined rocks stop the colonist"""
+        for occupant in self.cells.get((x, y), ()):
+            if isinstance(occupant, (Wall, Tree, Rock)):
+                return True
+            if isinstance(occupant, Door) and not occupant.open:
+                return True
+        return False
+
+    def zombie_blocker(self, x, y):
+        """The entity a zombie must break through to enter (x, y), or None.
+
+        Spikes and trap pits are walked over, so they never block.
+        """
+        for occupant in self.cells.get((x, y), ()):
+            if isinstance(occupant, (Wall, Tree, Rock, Turret)):
+                return occupant
+            if isinstance(occupant, Door) and not occupant.open:
+                return occupant
+        return None
+
+
+class EntityRegistry:
+    """The world's live structures and resources, kept by category.
+
+    Entities enter and leave through spawn(), kill(), cut(), mine() and
+    toggle_door(), which update the category collections and the WorldGrid
+    in place and notify subscribers ("spawn", "death", "cut", "mine",
+    "door_toggle"; the simulation adds "build" for player construction), so
+    nothing needs to rebuild or filter entity lists per frame. Collections
+    are insertion-ordered dicts used as sets: O(1) add and remove, stable
+    iteration order for drawing and saves. Zombies live in the ZombieHorde,
+    but the simulation emits spawn and death for them too.
+    """
+
+    CATEGORIES = {
+        Wall: "walls",
+        Door: "doors",
+        Tree: "trees",
+        Rock: "rocks",
+        Spike: "spikes",
+        Turret: "turrets",
+        TrapPit: "trap_pits",
+        Workbench: "workbenches",
+        Campfire: "campfires",
+    }
+
+    def __init__(self):
+        self.collections = {name: {} for name in self.CATEGORIES.values()}
+        self.listeners = {}  # event -> callbacks taking the entity
+        self.grid = None
+        self.version = 0  # Bumped on every event; cached views compare against it
+        self.visible_key = None
+        self.visible_cache = None
+
+    def category(self, entity):
+        return self.CATEGORIES[type(entity)]
+
+    def items(self, name):
+        """Live read-only view of one category"""
+        return self.collections[name].keys()
+
+    def attach(self, grid):
+        """Index every registered entity in a (new) grid"""
+        self.grid = grid
+        grid.add_all(*(collection.keys() for collection in self.collections.values()))
+        self.version += 1
+
+    def detach(self):
+        self.grid = None
+
+    def replace(self, name, entities):
+        """Swap a whole category, e.g. after generating or loading a world"""
+        old = self.collections[name]
+        if self.grid:
+            for entity in old:
+                self.grid.remove(entity)
+        self.collections[name] = dict.fromkeys(entities)
+        if self.grid:
+            self.grid.add_all(self.collections[name])
+        self.version += 1
+
+    def load(self, entities):
+        """Register entities from a generated or paged-in chunk (no events: nothing happened)"""
+        collections = self.collections
+        categories = self.CATEGORIES
+        for entity in entities:
+            collections[categories[type(entity)]][entity] = None
+        if self.grid:
+            self.grid.add_all(entities)
+        self.version += 1
+
+    def unload(self, entities):
+        """Drop entities whose chunk is paged out.
+
+        Grid listeners are not told, so the minimap keeps showing explored
+        ground and the horde's blocker grid keeps its last known state.
+        """
+        collections = self.collections
+        categories = self.CATEGORIES
+        for entity in entities:
+            collections[categories[type(entity)]].pop(entity, None)
+            if self.grid:
+                self.grid.remove(entity, notify=False)
+        self.version += 1
+
+    # --- Events ---
+    def subscribe(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def emit(self, event, entity):
+        self.version += 1
+        for callback in self.listeners.get(event, ()):
+            callback(entity)
+
+    def spawn(self, entity):
+        self.collections[self.category(entity)][entity] = None
+        if self.grid:
+            self.grid.add(entity)
+        self.emit("spawn", entity)
+        return entity
+
+    def kill(self, entity):
+        """Remove a destroyed entity from its category and the grid"""
+        collection = self.collections[self.category(entity)]
+        if entity not in collection:
+            return
+        del collection[entity]
+        if self.grid:
+            self.grid.remove(entity)
+        self.emit("death", entity)
+
+    def reap(self, candidates):
+        """Kill whichever of the candidates (entities damaged this tick) have no HP left"""
+        for entity in candidates:
+            if getattr(entity, "hp", 1) <= 0:
+                self.kill(entity)
+
+    def cut(self, tree):
+        """Cut a tree down (it stays registered for saving, but stops occupying its tile)"""
+        wood = tree.cut()
+        self.grid.remove(tree)
+        self.emit("cut", tree)
+        return wood
+
+    def mine(self, rock):
+        stone = rock.mine()
+        self.grid.remove(rock)
+        self.emit("mine", rock)
+        return stone
+
+    def toggle_door(self, door):
+        door.toggle()
+        self.grid.mark_changed(door.x, door.y)
+        self.emit("door_toggle", door)
+
+    # --- Cached views ---
+    def visible(self, x0, y0, x1, y1):
+        """Occupants of the tile rectangle x0 <= x < x1, y0 <= y < y1, by category.
+
+        Built from the grid, so cut trees, mined rocks and destroyed
+        structures are already left out. The result is reused until the
+        rectangle changes or an event happens.
+        """
+        key = (x0, y0, x1, y1, self.version, self.grid.version)
+        if key == self.visible_key:
+            return self.visible_cache
+        visible = self.occupants(x0, y0, x1, y1)
+        self.visible_key = key
+        self.visible_cache = visible
+        return visible
+
+    def occupants(self, x0, y0, x1, y1):
+        """Uncached visible(), for small one-off rectangles that shouldn't evict the camera's view"""
+        visible = {name: [] for name in self.collections}
+        cells = self.grid.cells
+        categories = self.CATEGORIES
+        for x in range(x0, x1):
+            for y in range(y0, y1):
+                for occupant in cells.get((x, y), ()):
+                    visible[categories[type(occupant)]].append(occupant)
+        return visible
+
+
+class SpatialHash:
+    """Per-tick bucket index of living entities (zombies) for combat queries.
+
+    Rebuilt once per tick and shared by turrets, bullets, spikes and trap
+    pits: exact-tile hits are a dict lookup and range queries only visit the
+    cell_size x cell_size buckets that overlap the range.
+    """
+
+    def __init__(self, cell_size=8):
+        self.cell_size = cell_size
+        self.buckets = {}  # (cx, cy) -> entities
+        self.tiles = {}  # (x, y) -> entities
+
+    def rebuild(self, entities):
+        living = [entity for entity in entities if entity.hp > 0]
+        self.rebuild_positions(living, [e.x for e in living], [e.y for e in living])
+
+    def rebuild_positions(self, entities, xs, ys):
+        """Rebuild from living entities and their positions (see ZombieHorde.living)"""
+        size = self.cell_size
+        buckets = {}
+        tiles = {}
+        for entity, x, y in zip(entities, xs, ys):
+            bucket = buckets.get((x // size, y // size))
+            if bucket is None:
+                buckets[(x // size, y // size)] = [entity]
+            else:
+                bucket.append(entity)
+            tile = tiles.get((x, y))
+            if tile is None:
+                tiles[(x, y)] = [entity]
+            else:
+                tile.append(entity)
+        self.buckets = buckets
+        self.tiles = tiles
+
+    def first_at(self, x, y):
+        """First entity at (x, y) that is still alive, or None"""
+        for entity in self.tiles.get((x, y), ()):
+            if entity.hp > 0:
+                return entity
+        return None
+
+    def query(self, x, y, radius):
+        """Living entities within a square of the given radius around (x, y)"""
+        size = self.cell_size
+        for cx in range((x - radius) // size, (x + radius) // size + 1):
+            for cy in range((y - radius) // size, (y + radius) // size + 1):
+                for entity in self.buckets.get((cx, cy), ()):
+                    if entity.hp > 0 and abs(entity.x - x) <= radius and abs(entity.y - y) <= radius:
+                        yield entity